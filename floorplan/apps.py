@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.core import checks
+from django.db.backends.signals import connection_created
 
 
 class FloorplanConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "floorplan"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .database import configure_sqlite_connection
+        from .versions import check_shared_cache
+
+        checks.register(check_shared_cache, checks.Tags.caches)
+
+        connection_created.connect(
+            configure_sqlite_connection,
+            dispatch_uid="floorplan.configure_sqlite_connection",
+        )
@@ -0,0 +1,258 @@
+"""Conservative minifiers for the hand-written static bundles.
+
+They only remove comments and whitespace. Line breaks between statements are
+kept wherever dropping them could change how automatic semicolon insertion
+reads the code, and string, template and regular expression literals are
+copied untouched.
+"""
+
+from __future__ import annotations
+
+import re
+
+_IDENTIFIER = re.compile(r"[A-Za-z0-9_$\\]")
+_REGEX_PRECEDING_KEYWORDS = frozenset(
+    {
+        "await",
+        "case",
+        "delete",
+        "do",
+        "else",
+        "in",
+        "instanceof",
+        "new",
+        "of",
+        "return",
+        "throw",
+        "typeof",
+        "void",
+        "yield",
+    }
+)
+# A regular expression literal, rather than division, follows these characters.
+_REGEX_PRECEDING_CHARACTERS = frozenset("(,=:[!&|?{};+-*%<>~^")
+# Line breaks after these can go: no statement can end on them.
+_JOINS_NEXT_LINE = frozenset("{([,;:=?&|<>!*%^~")
+# Line breaks before these can go: they never start a statement.
+_JOINS_PREVIOUS_LINE = frozenset(")]},;.?:")
+
+
+def _is_digit_at(source: str, index: int) -> bool:
+    return index < len(source) and source[index].isdigit()
+
+
+def _is_identifier_char(char: str) -> bool:
+    return bool(char) and (bool(_IDENTIFIER.match(char)) or ord(char) > 127)
+
+
+class _JavaScriptMinifier:
+    def __init__(self, source: str):
+        self.source = source
+        self.length = len(source)
+        self.out: list[str] = []
+
+    def last_char(self, skip_spaces: bool = False) -> str:
+        for chunk in reversed(self.out):
+            if skip_spaces:
+                chunk = chunk.rstrip(" \n")
+            if chunk:
+                return chunk[-1]
+        return ""
+
+    def last_word(self) -> str:
+        text = "".join(self.out[-32:]).rstrip(" \n")
+        match = re.search(r"([A-Za-z_$][A-Za-z0-9_$]*)$", text)
+        return match.group(1) if match else ""
+
+    def regex_allowed(self) -> bool:
+        last = self.last_char(skip_spaces=True)
+        if not last:
+            return True
+        if last in _REGEX_PRECEDING_CHARACTERS:
+            return True
+        if _is_identifier_char(last):
+            return self.last_word() in _REGEX_PRECEDING_KEYWORDS
+        return False
+
+    def copy_string(self, index: int) -> int:
+        quote = self.source[index]
+        end = index + 1
+        while end < self.length:
+            char = self.source[end]
+            if char == "\\":
+                end += 2
+                continue
+            end += 1
+            if char == quote:
+                break
+        self.out.append(self.source[index:end])
+        return end
+
+    def skip_template(self, index: int) -> int:
+        """Return the index just past the template literal starting at ``index``."""
+
+        end = index + 1
+        while end < self.length:
+            char = self.source[end]
+            if char == "\\":
+                end += 2
+                continue
+            if char == "`":
+                return end + 1
+            if char == "$" and self.source.startswith("{", end + 1):
+                end = self.skip_expression(end + 2)
+                continue
+            end += 1
+        return end
+
+    def skip_expression(self, index: int) -> int:
+        """Return the index just past the ``}`` closing a ``${`` substitution."""
+
+        depth = 0
+        end = index
+        while end < self.length:
+            char = self.source[end]
+            if char in "'\"":
+                quote = char
+                end += 1
+                while end < self.length and self.source[end] != quote:
+                    end += 2 if self.source[end] == "\\" else 1
+                end += 1
+                continue
+            if char == "`":
+                end = self.skip_template(end)
+                continue
+            if char == "{":
+                depth += 1
+            elif char == "}":
+                if depth == 0:
+                    return end + 1
+                depth -= 1
+            end += 1
+        return end
+
+    def copy_regex(self, index: int) -> int:
+        end = index + 1
+        in_class = False
+        while end < self.length:
+            char = self.source[end]
+            if char == "\\":
+                end += 2
+                continue
+            if char == "\n":
+                break
+            if char == "[":
+                in_class = True
+            elif char == "]":
+                in_class = False
+            elif char == "/" and not in_class:
+                end += 1
+                break
+            end += 1
+        while end < self.length and self.source[end].isalpha():
+            end += 1
+        self.out.append(self.source[index:end])
+        return end
+
+    def emit_whitespace(self, index: int, saw_newline: bool) -> None:
+        last = self.last_char()
+        following = self.source[index] if index < self.length else ""
+        if not last or not following:
+            return
+        if saw_newline:
+            joins_previous = following in _JOINS_PREVIOUS_LINE and not (
+                following == "." and _is_digit_at(self.source, index + 1)
+            )
+            if last in _JOINS_NEXT_LINE or joins_previous:
+                if _is_identifier_char(last) and _is_identifier_char(following):
+                    self.out.append(" ")
+                return
+            self.out.append("\n")
+            return
+        if _is_identifier_char(last) and _is_identifier_char(following):
+            self.out.append(" ")
+        elif last == following and last in "+-":
+            self.out.append(" ")
+        elif last == "/" or following == "/":
+            # Keep a space next to a slash so division and regex stay distinct.
+            self.out.append(" ")
+
+    def run(self) -> str:
+        source = self.source
+        index = 0
+        while index < self.length:
+            char = source[index]
+            if char in " \t\r\n\f\v﻿" or (char == "/" and source.startswith(("//", "/*"), index)):
+                saw_newline = False
+                while index < self.length:
+                    char = source[index]
+                    if char in " \t\r\f\v﻿":
+                        index += 1
+                    elif char == "\n":
+                        saw_newline = True
+                        index += 1
+                    elif source.startswith("//", index):
+                        newline = source.find("\n", index)
+                        index = self.length if newline < 0 else newline
+                    elif source.startswith("/*", index):
+                        close = source.find("*/", index + 2)
+                        close = self.length if close < 0 else close + 2
+                        saw_newline = saw_newline or "\n" in source[index:close]
+                        index = close
+                    else:
+                        break
+                self.emit_whitespace(index, saw_newline)
+                continue
+            if char in "'\"":
+                index = self.copy_string(index)
+            elif char == "`":
+                end = self.skip_template(index)
+                self.out.append(source[index:end])
+                index = end
+            elif char == "/" and self.regex_allowed():
+                index = self.copy_regex(index)
+            else:
+                self.out.append(char)
+                index += 1
+        return "".join(self.out).strip() + "\n"
+
+
+def minify_js(source: str) -> str:
+    return _JavaScriptMinifier(source).run()
+
+
+_CSS_TOKENS = re.compile(
+    r"""
+    (?P<string>"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')
+    | (?P<comment>/\*.*?\*/)
+    | (?P<space>\s+)
+    | (?P<other>[^"'/\s]+|/)
+    """,
+    re.DOTALL | re.VERBOSE,
+)
+_CSS_TIGHT = frozenset("{};,")
+
+
+def minify_css(source: str) -> str:
+    parts: list[str] = []
+    pending_space = False
+    for match in _CSS_TOKENS.finditer(source):
+        kind = match.lastgroup
+        if kind == "comment":
+            pending_space = True
+            continue
+        if kind == "space":
+            pending_space = True
+            continue
+        text = match.group()
+        if pending_space and parts:
+            previous = parts[-1][-1]
+            if previous not in _CSS_TIGHT and text[0] not in _CSS_TIGHT:
+                parts.append(" ")
+        pending_space = False
+        if text[0] == "}" and parts and parts[-1].endswith(";"):
+            parts[-1] = parts[-1][:-1]
+            if not parts[-1]:
+                parts.pop()
+        parts.append(text)
+    return "".join(parts) + "\n"
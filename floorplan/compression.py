@@ -0,0 +1,145 @@
+"""Compressed responses for the floor plan and the desk APIs.
+
+WhiteNoise compresses static files ahead of time; this covers the responses
+the views build. :class:`CompressionMiddleware` compresses JSON and HTML
+responses per request, and :class:`EncodedBody` holds a body already
+compressed in every supported encoding so a cached payload is served without
+serializing or compressing it again. Brotli is used when the ``brotli``
+package is installed and the client accepts it; gzip otherwise.
+"""
+
+from __future__ import annotations
+
+import gzip
+from dataclasses import dataclass, field
+
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip alone still covers every browser.
+    brotli = None
+
+GZIP = "gzip"
+BROTLI = "br"
+# Bodies shorter than this gain less from compression than its headers cost.
+MIN_COMPRESS_LENGTH = 200
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = {"application/json", "text/html"}
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Encodings this process can produce, most preferred first."""
+
+    return (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+
+def accepted_encodings(request) -> set[str]:
+    """Content codings the client lists in ``Accept-Encoding``, minus any with ``q=0``."""
+
+    accepted = set()
+    for item in request.headers.get("Accept-Encoding", "").split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = params.strip().lower()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+    return accepted
+
+
+def preferred_encoding(request, offered) -> str | None:
+    """The first of ``offered`` the client accepts, or ``None`` to send the body as is."""
+
+    accepted = accepted_encodings(request)
+    for encoding in offered:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+def compress(content: bytes, encoding: str) -> bytes:
+    if encoding == BROTLI:
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+    # A fixed mtime keeps the output identical for identical content.
+    return gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+@dataclass(frozen=True)
+class EncodedBody:
+    """A response body together with its compressed forms, ready to cache."""
+
+    content: bytes
+    content_type: str = "application/json"
+    encodings: dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, content: bytes, content_type: str = "application/json") -> "EncodedBody":
+        encodings = {}
+        if len(content) >= MIN_COMPRESS_LENGTH:
+            encodings = {encoding: compress(content, encoding) for encoding in available_encodings()}
+        return cls(content, content_type, encodings)
+
+    def response(self, request) -> HttpResponse:
+        encoding = preferred_encoding(request, self.encodings)
+        response = HttpResponse(
+            self.encodings[encoding] if encoding else self.content,
+            content_type=self.content_type,
+        )
+        if encoding:
+            response["Content-Encoding"] = encoding
+        if self.encodings:
+            patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+
+class CompressionMiddleware:
+    """Compress JSON and HTML responses for clients that accept it.
+
+    Responses that already carry a ``Content-Encoding``, such as those built
+    from an :class:`EncodedBody`, pass through untouched. HTML pages embed the
+    CSRF token, so they only get gzip with Django's random padding against
+    BREACH.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        if (
+            response.streaming
+            or response.has_header("Content-Encoding")
+            or content_type not in COMPRESSIBLE_TYPES
+            or len(response.content) < MIN_COMPRESS_LENGTH
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if content_type == "text/html":
+            encoding = preferred_encoding(request, (GZIP,))
+        else:
+            encoding = preferred_encoding(request, available_encodings())
+        if encoding is None:
+            return response
+
+        if content_type == "text/html":
+            compressed = compress_string(response.content, max_random_bytes=100)
+        else:
+            compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        return response
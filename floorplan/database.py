@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import sqlite3
+import tempfile
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .versions import bump_floor_version, bump_layout_version
+
+
+def sqlite_pragmas() -> dict[str, object]:
+    """Return the PRAGMA values applied to every new SQLite connection."""
+
+    return dict(getattr(settings, "SQLITE_PRAGMAS", None) or {})
+
+
+def configure_sqlite_connection(sender, connection, **kwargs) -> None:
+    """Apply the configured PRAGMAs when Django opens a SQLite connection.
+
+    Connected to ``connection_created`` so the statements run once per
+    physical connection rather than once per request.
+    """
+
+    if connection.vendor != "sqlite":
+        return
+    pragmas = sqlite_pragmas()
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@contextmanager
+def scratch_database(alias: str = DEFAULT_DB_ALIAS):
+    """Point ``alias`` at a temporary backup of its SQLite database until the block exits.
+
+    Load tests write reservations and may switch the journal mode, which
+    SQLite stores in the file, so they run against the copy and only read the
+    real database. An in-memory database, as in the test suite, is already
+    disposable and is used as is.
+    """
+
+    connection = connections[alias]
+    if connection.is_in_memory_db():
+        yield
+        return
+    settings_dict = connection.settings_dict
+    original_name = settings_dict["NAME"]
+    with tempfile.TemporaryDirectory() as directory:
+        scratch = Path(directory) / "scratch.sqlite3"
+        connection.ensure_connection()
+        with closing(sqlite3.connect(scratch)) as target:
+            connection.connection.backup(target)
+        # Every connection opened from here on, in any thread, uses the copy.
+        connections.close_all()
+        settings_dict["NAME"] = scratch
+        try:
+            yield
+        finally:
+            connections.close_all()
+            settings_dict["NAME"] = original_name
+            # Retire anything cached from the copy under the shared versions.
+            bump_floor_version()
+            bump_layout_version()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import csv
+from bisect import bisect_left
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
@@ -34,9 +35,27 @@ def _last_four_digits(value: str) -> str:
     return digits[-4:]
 
 
-@lru_cache(maxsize=1)
+def _directory_signature(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
 def load_employee_records() -> tuple[EmployeeRecord, ...]:
+    """Return the roster, re-reading the CSV whenever the file changes."""
+
     path = _default_employee_path()
+    return _read_employee_records(path, _directory_signature(path))
+
+
+@lru_cache(maxsize=1)
+def _read_employee_records(
+    path: Path, signature: tuple[int, int] | None
+) -> tuple[EmployeeRecord, ...]:
+    if signature is None:
+        return tuple()
     try:
         with path.open(newline="", encoding="utf-8") as handle:
             reader = csv.DictReader(handle)
@@ -63,7 +82,8 @@ def load_employee_records() -> tuple[EmployeeRecord, ...]:
 
 
 def clear_employee_cache() -> None:
-    load_employee_records.cache_clear()
+    _read_employee_records.cache_clear()
+    _build_employee_index.cache_clear()
 
 
 def normalize_last_name(value: str) -> str:
@@ -89,3 +109,81 @@ def match_employee(last_name: str, extension: str) -> EmployeeRecord | None:
         if normalize_last_name(record.last_name) == normalized_last and record.extension_last4 == normalized_extension:
             return record
     return None
+
+
+@dataclass(frozen=True)
+class EmployeeIndex:
+    """Sorted-array prefix index over the roster for typeahead lookups.
+
+    Each key list is sorted alongside the position of its record, so a prefix
+    lookup is a binary search followed by a scan of the matching run.
+    """
+
+    records: tuple[EmployeeRecord, ...]
+    last_name_keys: tuple[str, ...]
+    last_name_positions: tuple[int, ...]
+    name_keys: tuple[str, ...]
+    name_positions: tuple[int, ...]
+
+    @classmethod
+    def from_records(cls, records: tuple[EmployeeRecord, ...]) -> "EmployeeIndex":
+        last_names = sorted(
+            (normalize_last_name(record.last_name), position)
+            for position, record in enumerate(records)
+        )
+        names = sorted(
+            (normalize_last_name(value), position)
+            for position, record in enumerate(records)
+            for value in (record.first_name, record.full_name)
+            if value.strip()
+        )
+        return cls(
+            records=records,
+            last_name_keys=tuple(key for key, _ in last_names),
+            last_name_positions=tuple(position for _, position in last_names),
+            name_keys=tuple(key for key, _ in names),
+            name_positions=tuple(position for _, position in names),
+        )
+
+    def suggest(self, query: str, limit: int = 8) -> list[EmployeeRecord]:
+        """Return up to ``limit`` records whose last, first or full name starts with ``query``.
+
+        Last-name matches come first because that is what kiosk users type.
+        """
+
+        prefix = normalize_last_name(query)
+        if not prefix or limit <= 0:
+            return []
+        seen: set[int] = set()
+        matches: list[EmployeeRecord] = []
+        for keys, positions in (
+            (self.last_name_keys, self.last_name_positions),
+            (self.name_keys, self.name_positions),
+        ):
+            index = bisect_left(keys, prefix)
+            while index < len(keys) and keys[index].startswith(prefix):
+                position = positions[index]
+                index += 1
+                if position in seen:
+                    continue
+                seen.add(position)
+                matches.append(self.records[position])
+                if len(matches) >= limit:
+                    return matches
+        return matches
+
+
+@lru_cache(maxsize=1)
+def _build_employee_index(path: Path, signature: tuple[int, int] | None) -> EmployeeIndex:
+    return EmployeeIndex.from_records(_read_employee_records(path, signature))
+
+
+def employee_index() -> EmployeeIndex:
+    """Return the typeahead index, rebuilt when the roster file changes."""
+
+    path = _default_employee_path()
+    return _build_employee_index(path, _directory_signature(path))
+
+
+def suggest_employees(query: str, limit: int = 8) -> list[EmployeeRecord]:
+    return employee_index().suggest(query, limit)
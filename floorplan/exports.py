@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import csv
+from datetime import date, datetime, time, timedelta
+from typing import Iterator
+
+from django.db import models
+from django.utils import timezone
+
+from .models import Assignment
+from .recurrence import WEEKDAY_NAMES, mask_weekdays
+
+ASSIGNMENT_EXPORT_CHUNK_SIZE = 2000
+ASSIGNMENT_EXPORT_COLUMNS = (
+    "id",
+    "assignee_name",
+    "assignment_type",
+    "desk_identifier",
+    "desk_label",
+    "department",
+    "start",
+    "end",
+    "is_permanent",
+    "recurrence_days",
+    "recurrence_until",
+    "note",
+    "created_by",
+    "created_at",
+)
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the formatted line straight back."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _day_start(value: date) -> datetime:
+    return timezone.make_aware(datetime.combine(value, time.min), timezone.get_current_timezone())
+
+
+def assignment_history(
+    *,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    department_id: int | None = None,
+    assignment_type: str | None = None,
+):
+    """Assignments that overlap the given local dates, oldest first.
+
+    A permanent, open-ended or unbounded recurring assignment overlaps every
+    day after it starts.
+    Filtering by department leaves out work-from-home rows, which have no desk.
+    """
+
+    queryset = Assignment.objects.order_by("start", "pk")
+    if end_date:
+        queryset = queryset.filter(start__lt=_day_start(end_date + timedelta(days=1)))
+    if start_date:
+        queryset = queryset.filter(
+            models.Q(is_permanent=True)
+            | models.Q(end__isnull=True)
+            | models.Q(end__gte=_day_start(start_date))
+            | models.Q(recurrence_days__gt=0, recurrence_until__isnull=True)
+            | models.Q(recurrence_days__gt=0, recurrence_until__gte=start_date)
+        )
+    if department_id:
+        queryset = queryset.filter(desk__department_id=department_id)
+    if assignment_type:
+        queryset = queryset.filter(assignment_type=assignment_type)
+    return queryset
+
+
+def _timestamp(value: datetime | None) -> str:
+    return timezone.localtime(value).isoformat(timespec="seconds") if value else ""
+
+
+def iter_assignment_csv(queryset) -> Iterator[str]:
+    """Yield CSV lines for ``queryset`` while holding only one chunk of rows in memory."""
+
+    writer = csv.writer(_Echo())
+    yield writer.writerow(ASSIGNMENT_EXPORT_COLUMNS)
+    rows = queryset.values_list(
+        "pk",
+        "assignee_name",
+        "assignment_type",
+        "desk__identifier",
+        "desk__label",
+        "desk__department__name",
+        "start",
+        "end",
+        "is_permanent",
+        "recurrence_days",
+        "recurrence_until",
+        "note",
+        "created_by",
+        "created_at",
+    )
+    for (
+        pk,
+        assignee_name,
+        assignment_type,
+        desk_identifier,
+        desk_label,
+        department,
+        start,
+        end,
+        is_permanent,
+        recurrence_days,
+        recurrence_until,
+        note,
+        created_by,
+        created_at,
+    ) in rows.iterator(chunk_size=ASSIGNMENT_EXPORT_CHUNK_SIZE):
+        yield writer.writerow(
+            (
+                pk,
+                assignee_name,
+                assignment_type,
+                desk_identifier or "",
+                desk_label or "",
+                department or "",
+                _timestamp(start),
+                _timestamp(end),
+                "yes" if is_permanent else "no",
+                " ".join(WEEKDAY_NAMES[day] for day in mask_weekdays(recurrence_days)),
+                recurrence_until.isoformat() if recurrence_until else "",
+                note,
+                created_by,
+                _timestamp(created_at),
+            )
+        )
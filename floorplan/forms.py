@@ -1,7 +1,14 @@
+from datetime import timedelta
+
 from django import forms
+from django.db import models, transaction
 from django.utils import timezone
 
 from .models import Assignment, BlockOutZone
+from .recurrence import WEEKDAY_CHOICES, weekday_mask
+from .reservations import ADVANCE_BOOKING_DAYS, booked_intervals, desk_bookings
+from .status import refresh_desk_status
+from .versions import bump_floor_version
 
 
 class AssignmentForm(forms.ModelForm):
@@ -13,6 +20,13 @@ class AssignmentForm(forms.ModelForm):
         label="Assignment Duration",
         initial="temporary",
     )
+    recurrence_weekdays = forms.TypedMultipleChoiceField(
+        choices=WEEKDAY_CHOICES,
+        coerce=int,
+        required=False,
+        label="Repeats on",
+        widget=forms.CheckboxSelectMultiple(),
+    )
 
     class Meta:
         model = Assignment
@@ -22,12 +36,14 @@ class AssignmentForm(forms.ModelForm):
             "assignment_type",
             "start",
             "end",
+            "recurrence_until",
             "note",
             "created_by",
         ]
         widgets = {
             "start": forms.DateTimeInput(attrs={"type": "datetime-local"}),
             "end": forms.DateTimeInput(attrs={"type": "datetime-local"}),
+            "recurrence_until": forms.DateInput(attrs={"type": "date"}),
         }
 
     def clean(self):
@@ -55,25 +71,99 @@ class AssignmentForm(forms.ModelForm):
             and end < start
         ):
             self.add_error("end", "End time must be after the start time.")
+        cleaned["recurrence_days"] = weekday_mask(cleaned.get("recurrence_weekdays") or [])
+        if cleaned["recurrence_days"]:
+            if cleaned.get("is_permanent"):
+                self.add_error(
+                    "duration_choice", "Recurring assignments must use a temporary duration."
+                )
+            if start and end and end - start >= timedelta(days=1):
+                self.add_error("end", "Each occurrence of a recurring assignment must be under a day.")
+            until = cleaned.get("recurrence_until")
+            if start and until and until < timezone.localtime(start).date():
+                self.add_error("recurrence_until", "The recurrence cannot end before it starts.")
+        else:
+            cleaned["recurrence_until"] = None
+        if not self.errors and cleaned.get("desk") and assignment_type == Assignment.TYPE_DESK:
+            self._check_later_bookings(cleaned)
         return cleaned
 
+    def _check_later_bookings(self, cleaned):
+        """Reject overlaps with bookings that start at or after this assignment.
+
+        Assignments already under way when this one starts are taken over in
+        ``save()``; later bookings were made for their own time and are kept.
+        A recurring assignment takes nothing over, so it may overlap no
+        booking at all.
+        """
+
+        start = cleaned["start"]
+        end = None if cleaned["is_permanent"] else cleaned.get("end")
+        mask = cleaned["recurrence_days"]
+        if mask:
+            # Kiosks book at most ADVANCE_BOOKING_DAYS ahead; checking that far
+            # keeps an open-ended recurrence to a bounded number of occurrences.
+            horizon = start + timedelta(days=ADVANCE_BOOKING_DAYS)
+            occurrence_probe = Assignment(
+                start=start,
+                end=end,
+                recurrence_days=mask,
+                recurrence_until=cleaned.get("recurrence_until"),
+            )
+            windows = list(occurrence_probe.occurrences(start, horizon))
+            schedule_end = horizon
+        else:
+            windows = [(start, end)]
+            schedule_end = end
+        # One query covers every occurrence.
+        bookings = desk_bookings(cleaned["desk"], start, schedule_end, exclude_pk=self.instance.pk)
+        if not mask:
+            bookings = bookings.filter(start__gte=start)
+        for booking in bookings:
+            for window_start, window_end in windows:
+                if booked_intervals(booking, window_start, window_end):
+                    booked_from = timezone.localtime(booking.start).strftime("%b %d, %I:%M %p")
+                    self.add_error(
+                        "start",
+                        f"{booking.assignee_name} has this desk booked from {booked_from}.",
+                    )
+                    return
+
     def save(self, commit=True):
         instance = super().save(commit=False)
         instance.is_permanent = self.cleaned_data.get("is_permanent", False)
         if instance.is_permanent:
             instance.end = None
+        instance.recurrence_days = self.cleaned_data.get("recurrence_days", 0)
+        instance.recurrence_until = self.cleaned_data.get("recurrence_until")
         if commit:
             instance.save()
             self.save_m2m()
-            if instance.assignment_type == Assignment.TYPE_DESK and instance.desk:
-                (
-                    Assignment.objects.filter(
-                        desk=instance.desk,
-                        assignment_type=Assignment.TYPE_DESK,
-                    )
-                    .exclude(pk=instance.pk)
-                    .update(end=instance.start, is_permanent=False)
-                )
+            # A recurring assignment shares its desk on other days, so only a
+            # one-off or permanent assignment takes the desk over.
+            if (
+                instance.assignment_type == Assignment.TYPE_DESK
+                and instance.desk
+                and not instance.is_recurring
+            ):
+                # Only what is under way gets cut short; clean() already
+                # ruled out overlaps with later bookings.
+                others = Assignment.objects.filter(
+                    desk=instance.desk,
+                    assignment_type=Assignment.TYPE_DESK,
+                    start__lt=instance.start,
+                ).exclude(pk=instance.pk)
+                others.filter(recurrence_days=0).filter(
+                    models.Q(end__gt=instance.start)
+                    | models.Q(end__isnull=True)
+                    | models.Q(is_permanent=True)
+                ).update(end=instance.start, is_permanent=False, is_open=False)
+                last_day = timezone.localtime(instance.start).date() - timedelta(days=1)
+                others.filter(recurrence_days__gt=0).filter(
+                    models.Q(recurrence_until__isnull=True) | models.Q(recurrence_until__gt=last_day)
+                ).update(recurrence_until=last_day)
+                # The updates above skip the signal that refreshed the desk's status.
+                refresh_desk_status([instance.desk_id])
         return instance
 
 
@@ -120,3 +210,28 @@ class BlockOutZoneForm(forms.ModelForm):
             instance.save()
             self.save_m2m()
         return instance
+
+
+class DeskSetBlockOutForm(BlockOutZoneForm):
+    """Block-out zone for a set of desks the caller has already resolved.
+
+    The desks are not validated as form choices; ``save_for_desks`` attaches
+    them with one bulk insert into the through table, so blocking a whole
+    wing costs the same few queries as blocking one desk.
+    """
+
+    class Meta(BlockOutZoneForm.Meta):
+        fields = ["name", "start", "end", "duration_choice", "reason", "created_by"]
+
+    def save_for_desks(self, desk_ids) -> BlockOutZone:
+        zone = self.save()
+        through = BlockOutZone.desks.through
+        through.objects.bulk_create(
+            [through(blockoutzone_id=zone.pk, desk_id=desk_id) for desk_id in desk_ids]
+        )
+        # bulk_create skips the m2m_changed signals that keep the floor version
+        # and the desks' stored status in step.
+        refresh_desk_status(desk_ids)
+        bump_floor_version()
+        transaction.on_commit(bump_floor_version)
+        return zone
@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Callable, Iterable, Iterator
+
+from django.db import models, router
+
+from .layout import GRID_COLUMNS, GRID_ROWS, is_assignable, is_kiosk
+from .models import Assignment, BlockOutZone, Desk, active_assignment_q
+from .versions import layout_version
+
+
+class LayoutConflict(Exception):
+    """Raised when desk placements overlap each other or leave the grid."""
+
+
+@dataclass(frozen=True)
+class GridDesk:
+    """The parts of a desk needed to reason about the grid, without its payload."""
+
+    pk: int
+    identifier: str
+    label: str
+    row: int
+    column: int
+    row_span: int
+    column_span: int
+    department_id: int
+    department: str
+    is_assignable: bool
+
+    def cells(self, rows: int = GRID_ROWS, columns: int = GRID_COLUMNS) -> Iterator[tuple[int, int]]:
+        """Yield every in-bounds grid cell the desk covers."""
+
+        last_row = min(self.row + max(self.row_span, 1) - 1, rows)
+        last_column = min(self.column + max(self.column_span, 1) - 1, columns)
+        for row in range(max(self.row, 1), last_row + 1):
+            for column in range(max(self.column, 1), last_column + 1):
+                yield row, column
+
+
+class FloorGrid:
+    """Occupancy bitmap of the floor: which desk, if any, covers each cell.
+
+    ``cells`` is a flat row-major array of unsigned shorts holding a 1-based
+    slot into ``desks`` (0 for an empty cell), so span-aware lookups are a
+    single index operation.
+    """
+
+    def __init__(self, desks, rows: int = GRID_ROWS, columns: int = GRID_COLUMNS):
+        self.rows = rows
+        self.columns = columns
+        self.desks: tuple[GridDesk, ...] = tuple(desks)
+        self.cells = array("H", [0]) * (rows * columns)
+        self.slots: dict[str, int] = {}
+        for slot, desk in enumerate(self.desks, start=1):
+            self.slots[desk.identifier] = slot
+            for row, column in desk.cells(rows, columns):
+                self.cells[self._offset(row, column)] = slot
+
+    def _offset(self, row: int, column: int) -> int:
+        return (row - 1) * self.columns + (column - 1)
+
+    def desk_at(self, row: int, column: int) -> GridDesk | None:
+        if not (1 <= row <= self.rows and 1 <= column <= self.columns):
+            return None
+        slot = self.cells[self._offset(row, column)]
+        return self.desks[slot - 1] if slot else None
+
+    def get(self, identifier: str) -> GridDesk | None:
+        slot = self.slots.get(identifier)
+        return self.desks[slot - 1] if slot else None
+
+    def select(self, cells: Iterable[tuple[int, int]]) -> list[GridDesk]:
+        """Return each desk covering any of ``cells`` once, in the order first reached."""
+
+        seen: set[int] = set()
+        desks: list[GridDesk] = []
+        for row, column in cells:
+            if not (1 <= row <= self.rows and 1 <= column <= self.columns):
+                continue
+            slot = self.cells[self._offset(row, column)]
+            if slot and slot not in seen:
+                seen.add(slot)
+                desks.append(self.desks[slot - 1])
+        return desks
+
+    def overlapping(
+        self, row: int, column: int, row_span: int = 1, column_span: int = 1
+    ) -> list[GridDesk]:
+        """Return the desks that cover any cell of the given rectangle."""
+
+        # Only the part of the rectangle on the grid is walked, however large the spans.
+        return self.select(
+            (cell_row, cell_column)
+            for cell_row in range(max(row, 1), min(row + max(row_span, 1), self.rows + 1))
+            for cell_column in range(
+                max(column, 1), min(column + max(column_span, 1), self.columns + 1)
+            )
+        )
+
+    def place(self, placements: Iterable[tuple[int | None, int, int, int, int]]) -> None:
+        """Check ``(pk, row, column, row_span, column_span)`` placements against the floor.
+
+        Desks being placed are lifted off the grid first, so a desk may be
+        moved or resized over its own cells. Raises ``LayoutConflict`` when a
+        placement leaves the grid, covers a desk that is not being placed, or
+        covers another placement.
+        """
+
+        placements = list(placements)
+        moving = {pk for pk, *_ in placements if pk is not None}
+        cells = array("H", self.cells)
+        if moving:
+            for desk in self.desks:
+                if desk.pk in moving:
+                    for row, column in desk.cells(self.rows, self.columns):
+                        cells[self._offset(row, column)] = 0
+
+        first_placement_slot = len(self.desks) + 1
+        for index, (pk, row, column, row_span, column_span) in enumerate(placements):
+            if row_span < 1 or column_span < 1:
+                raise LayoutConflict("Desk spans must be at least one cell.")
+            last_row = row + row_span - 1
+            last_column = column + column_span - 1
+            if row < 1 or column < 1 or last_row > self.rows or last_column > self.columns:
+                raise LayoutConflict(
+                    f"A desk at r{row:02d}c{column:02d} spanning {row_span}x{column_span} "
+                    f"would extend beyond the {self.columns}x{self.rows} grid."
+                )
+            marker = first_placement_slot + index
+            for cell_row in range(row, last_row + 1):
+                for cell_column in range(column, last_column + 1):
+                    offset = self._offset(cell_row, cell_column)
+                    slot = cells[offset]
+                    if slot and slot < first_placement_slot:
+                        raise LayoutConflict(
+                            f"Cell r{cell_row:02d}c{cell_column:02d} is already covered by "
+                            f"{self.desks[slot - 1].label}."
+                        )
+                    if slot:
+                        raise LayoutConflict(
+                            f"Cell r{cell_row:02d}c{cell_column:02d} would be covered by "
+                            "more than one of the selected desks."
+                        )
+                    cells[offset] = marker
+
+    def nearest(
+        self,
+        origin: GridDesk,
+        is_candidate: Callable[[GridDesk], bool],
+        limit: int,
+        preferred_department_id: int | None = None,
+    ) -> list[tuple[GridDesk, int]]:
+        """Breadth-first search outward from every cell ``origin`` covers.
+
+        Returns up to ``limit`` ``(desk, distance)`` pairs, where distance is
+        the number of grid steps to the nearest cell of that desk. The grid
+        does not model walls, so walkways, utility space and other desks are
+        all walked through; only assignable desks accepted by
+        ``is_candidate`` are returned. Desks in the preferred department are
+        listed before desks elsewhere on the floor.
+        """
+
+        if limit <= 0:
+            return []
+        origin_slot = self.slots.get(origin.identifier)
+        distances = array("h", [-1]) * len(self.cells)
+        queue: deque[int] = deque()
+        for row, column in origin.cells(self.rows, self.columns):
+            offset = self._offset(row, column)
+            distances[offset] = 0
+            queue.append(offset)
+
+        seen_slots = {origin_slot}
+        preferred: list[tuple[GridDesk, int]] = []
+        others: list[tuple[GridDesk, int]] = []
+        columns = self.columns
+        while queue:
+            offset = queue.popleft()
+            distance = distances[offset]
+            slot = self.cells[offset]
+            if slot and slot not in seen_slots:
+                seen_slots.add(slot)
+                desk = self.desks[slot - 1]
+                if desk.is_assignable and is_candidate(desk):
+                    if preferred_department_id is None or desk.department_id == preferred_department_id:
+                        preferred.append((desk, distance))
+                        if len(preferred) >= limit:
+                            break
+                    elif len(others) < limit:
+                        others.append((desk, distance))
+            row, column = divmod(offset, columns)
+            for neighbour, allowed in (
+                (offset - columns, row > 0),
+                (offset + columns, row < self.rows - 1),
+                (offset - 1, column > 0),
+                (offset + 1, column < columns - 1),
+            ):
+                if allowed and distances[neighbour] < 0:
+                    distances[neighbour] = distance + 1
+                    queue.append(neighbour)
+        return (preferred + others)[:limit]
+
+
+def load_floor_grid() -> FloorGrid:
+    """Build the grid from one query over desks and their department names."""
+
+    rows = Desk.objects.values_list(
+        "pk",
+        "identifier",
+        "label",
+        "notes",
+        "row_index",
+        "column_index",
+        "row_span",
+        "column_span",
+        "department_id",
+        "department__name",
+    )
+    desks = []
+    for (
+        pk,
+        identifier,
+        label,
+        notes,
+        row,
+        column,
+        row_span,
+        column_span,
+        department_id,
+        department,
+    ) in rows:
+        desks.append(
+            GridDesk(
+                pk=pk,
+                identifier=identifier,
+                label=label,
+                row=row,
+                column=column,
+                row_span=row_span,
+                column_span=column_span,
+                department_id=department_id,
+                department=department,
+                is_assignable=is_assignable(department, is_kiosk(identifier, label, notes)),
+            )
+        )
+    return FloorGrid(desks)
+
+
+_grid_lock = Lock()
+# One grid per database alias: a grid built from a lagging replica must not
+# be used to validate placements on the primary.
+_cached_grids: dict[str, tuple[int, FloorGrid]] = {}
+
+
+def floor_grid() -> FloorGrid:
+    """Return the process-wide grid, rebuilt only when desks or departments change."""
+
+    alias = router.db_for_read(Desk)
+    version = layout_version()
+    cached = _cached_grids.get(alias)
+    if cached and cached[0] == version:
+        return cached[1]
+    with _grid_lock:
+        cached = _cached_grids.get(alias)
+        if cached and cached[0] == version:
+            return cached[1]
+        grid = load_floor_grid()
+        _cached_grids[alias] = (version, grid)
+        return grid
+
+
+def unavailable_desk_ids(now: datetime) -> set[int]:
+    """Return the pks of desks that are occupied or blocked at ``now``."""
+
+    candidates = Assignment.objects.filter(
+        assignment_type=Assignment.TYPE_DESK,
+        desk__isnull=False,
+    ).filter(active_assignment_q(now))
+    occupied = set(candidates.filter(recurrence_days=0).values_list("desk_id", flat=True))
+    # Recurring assignments only occupy their desk on their days and hours.
+    occupied.update(
+        assignment.desk_id
+        for assignment in candidates.filter(recurrence_days__gt=0)
+        if assignment.is_active(now)
+    )
+    blocked = (
+        BlockOutZone.desks.through.objects.filter(blockoutzone__start__lte=now)
+        .filter(
+            models.Q(blockoutzone__is_permanent=True)
+            | models.Q(blockoutzone__end__isnull=True)
+            | models.Q(blockoutzone__end__gte=now)
+        )
+        .values_list("desk_id", flat=True)
+    )
+    return occupied | set(blocked)
+
+
+def nearest_free_desks(
+    grid: FloorGrid,
+    origin: GridDesk,
+    now: datetime,
+    limit: int = 3,
+    preferred_department_id: int | None = None,
+) -> list[tuple[GridDesk, int]]:
+    unavailable = unavailable_desk_ids(now)
+    return grid.nearest(
+        origin,
+        lambda desk: desk.pk not in unavailable,
+        limit,
+        preferred_department_id,
+    )
@@ -23,3 +23,15 @@ def grid_to_percentages(
     width = max(column_span, 1) * CELL_WIDTH_PERCENT
     height = max(row_span, 1) * CELL_HEIGHT_PERCENT
     return left, top, width, height
+
+
+NON_ASSIGNABLE_DEPARTMENTS = frozenset({"Utility/Resource", "Walkway"})
+
+
+def is_kiosk(identifier: str, label: str, notes: str) -> bool:
+    """Kiosks are flagged by mentioning "kiosk" in the identifier, label or notes."""
+    return any("kiosk" in (value or "").strip().casefold() for value in (identifier, label, notes))
+
+
+def is_assignable(department_name: str, kiosk: bool) -> bool:
+    return kiosk or department_name not in NON_ASSIGNABLE_DEPARTMENTS
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import csv
+import json
+from dataclasses import dataclass
+from typing import IO, Iterable, Iterator
+
+from django.db import transaction
+
+from .grid import FloorGrid, LayoutConflict, load_floor_grid
+from .layout import grid_to_percentages
+from .models import Department, Desk
+from .versions import bump_floor_version, bump_layout_version
+
+FORMATS = ("jsonl", "csv")
+DEPARTMENT_FIELDS = ("name", "color", "description")
+DESK_FIELDS = (
+    "identifier",
+    "label",
+    "department",
+    "fill_color",
+    "row",
+    "column",
+    "row_span",
+    "column_span",
+    "notes",
+)
+CSV_FIELDS = ("record", *DEPARTMENT_FIELDS, *DESK_FIELDS)
+EXPORT_CHUNK_SIZE = 500
+
+
+class LayoutImportError(Exception):
+    """Raised when an import file is malformed or describes an impossible floor."""
+
+
+def format_for_path(path: str | None, default: str = "jsonl") -> str:
+    if path and path.lower().endswith(".csv"):
+        return "csv"
+    return default
+
+
+def iter_layout_records() -> Iterator[dict]:
+    """Yield departments, then desks, straight from the database cursor."""
+
+    for name, color, description in (
+        Department.objects.order_by("name")
+        .values_list("name", "color", "description")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    ):
+        yield {"record": "department", "name": name, "color": color, "description": description}
+
+    desks = Desk.objects.order_by("row_index", "column_index").values_list(
+        "identifier",
+        "label",
+        "department__name",
+        "fill_color",
+        "row_index",
+        "column_index",
+        "row_span",
+        "column_span",
+        "notes",
+    )
+    for values in desks.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield {"record": "desk", **dict(zip(DESK_FIELDS, values))}
+
+
+def write_layout(stream: IO[str], fmt: str = "jsonl", records: Iterable[dict] | None = None) -> int:
+    """Write ``records`` (the current layout by default) one line at a time and return the count."""
+
+    records = iter_layout_records() if records is None else records
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(stream, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            count += 1
+    else:
+        for record in records:
+            stream.write(json.dumps(record, separators=(",", ":")))
+            stream.write("\n")
+            count += 1
+    return count
+
+
+def read_layout(stream: IO[str], fmt: str = "jsonl") -> Iterator[tuple[int, dict]]:
+    """Yield ``(line_number, record)`` pairs without reading the whole file first."""
+
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise LayoutImportError(f"Line {line_number}: invalid JSON ({exc.msg}).") from exc
+        if not isinstance(record, dict):
+            raise LayoutImportError(f"Line {line_number}: expected an object.")
+        yield line_number, record
+
+
+def _text(record: dict, key: str) -> str:
+    value = record.get(key)
+    return "" if value is None else str(value).strip()
+
+
+def _number(record: dict, key: str, line_number: int, default: int | None = None) -> int:
+    value = _text(record, key)
+    if not value and default is not None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise LayoutImportError(f"Line {line_number}: {key} must be a whole number.") from None
+    if number < 1:
+        raise LayoutImportError(f"Line {line_number}: {key} must be at least 1.")
+    return number
+
+
+@dataclass
+class LayoutImportResult:
+    departments_created: int = 0
+    departments_updated: int = 0
+    departments_deleted: int = 0
+    desks_created: int = 0
+    desks_updated: int = 0
+    desks_deleted: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return any(
+            (
+                self.departments_created,
+                self.departments_updated,
+                self.departments_deleted,
+                self.desks_created,
+                self.desks_updated,
+                self.desks_deleted,
+            )
+        )
+
+    def summary(self) -> str:
+        return (
+            f"Departments: {self.departments_created} created, {self.departments_updated} updated, "
+            f"{self.departments_deleted} deleted. Desks: {self.desks_created} created, "
+            f"{self.desks_updated} updated, {self.desks_deleted} deleted."
+        )
+
+
+class _DryRun(Exception):
+    pass
+
+
+def import_layout(
+    records: Iterable[tuple[int, dict]],
+    *,
+    prune: bool = False,
+    dry_run: bool = False,
+) -> LayoutImportResult:
+    """Apply the layout in ``records`` as a diff against the database.
+
+    Everything is written in one transaction with bulk queries: unchanged
+    rows are not touched, and with ``prune`` desks and departments missing
+    from the file are deleted (along with their assignments). Placements are
+    checked on the floor grid before anything is written.
+    """
+
+    departments: dict[str, dict] = {}
+    desks: dict[str, dict] = {}
+    for line_number, record in records:
+        kind = _text(record, "record").lower()
+        if kind == "department":
+            name = _text(record, "name")
+            if not name:
+                raise LayoutImportError(f"Line {line_number}: department name is required.")
+            departments[name] = {
+                "color": _text(record, "color"),
+                "description": _text(record, "description"),
+            }
+        elif kind == "desk":
+            identifier = _text(record, "identifier")
+            if not identifier:
+                raise LayoutImportError(f"Line {line_number}: desk identifier is required.")
+            desks[identifier] = {
+                "label": _text(record, "label") or identifier,
+                "department": _text(record, "department"),
+                "fill_color": _text(record, "fill_color"),
+                "notes": _text(record, "notes"),
+                "row_index": _number(record, "row", line_number),
+                "column_index": _number(record, "column", line_number),
+                "row_span": _number(record, "row_span", line_number, default=1),
+                "column_span": _number(record, "column_span", line_number, default=1),
+                "line": line_number,
+            }
+        else:
+            raise LayoutImportError(
+                f"Line {line_number}: record must be \"department\" or \"desk\"."
+            )
+
+    result = LayoutImportResult()
+    try:
+        with transaction.atomic():
+            _apply_departments(departments, desks, result)
+            _apply_desks(desks, prune, result)
+            if prune:
+                used = set(departments) | {values["department"] for values in desks.values()}
+                # Every desk left in these departments was pruned above.
+                _, deleted = Department.objects.exclude(name__in=used).delete()
+                result.departments_deleted = deleted.get(Department._meta.label, 0)
+            if dry_run:
+                raise _DryRun
+    except _DryRun:
+        return result
+    except LayoutConflict as exc:
+        raise LayoutImportError(str(exc)) from exc
+
+    if result.changed:
+        # Bulk queries skip model signals, so invalidate cached floor state here.
+        bump_floor_version()
+        bump_layout_version()
+    return result
+
+
+def _apply_departments(departments: dict, desks: dict, result: LayoutImportResult):
+    existing = {department.name: department for department in Department.objects.all()}
+    for identifier, values in desks.items():
+        if values["department"] not in departments and values["department"] not in existing:
+            raise LayoutImportError(
+                f"Line {values['line']}: unknown department {values['department']!r} "
+                f"for desk {identifier}."
+            )
+
+    to_create = []
+    to_update = []
+    for name, values in departments.items():
+        department = existing.get(name)
+        if department is None:
+            to_create.append(Department(name=name, **values))
+        elif (department.color, department.description) != (values["color"], values["description"]):
+            department.color = values["color"]
+            department.description = values["description"]
+            to_update.append(department)
+    Department.objects.bulk_create(to_create)
+    Department.objects.bulk_update(to_update, ["color", "description"])
+    result.departments_created = len(to_create)
+    result.departments_updated = len(to_update)
+
+
+def _apply_desks(desks: dict, prune: bool, result: LayoutImportResult):
+    department_ids = dict(Department.objects.values_list("name", "id"))
+    existing = Desk.objects.in_bulk(list(desks), field_name="identifier")
+
+    if prune:
+        _, deleted = Desk.objects.exclude(identifier__in=desks).delete()
+        result.desks_deleted = deleted.get(Desk._meta.label, 0)
+        grid = FloorGrid([])
+    else:
+        grid = load_floor_grid()
+    grid.place(
+        (
+            existing[identifier].pk if identifier in existing else None,
+            values["row_index"],
+            values["column_index"],
+            values["row_span"],
+            values["column_span"],
+        )
+        for identifier, values in desks.items()
+    )
+
+    fields = (
+        "label",
+        "department_id",
+        "fill_color",
+        "notes",
+        "row_index",
+        "column_index",
+        "row_span",
+        "column_span",
+        "left_percentage",
+        "top_percentage",
+        "width_percentage",
+        "height_percentage",
+    )
+    to_create = []
+    to_update = []
+    moved = []
+    for identifier, values in desks.items():
+        left, top, width, height = grid_to_percentages(
+            values["row_index"], values["column_index"], values["row_span"], values["column_span"]
+        )
+        desired = {
+            "label": values["label"],
+            "department_id": department_ids[values["department"]],
+            "fill_color": values["fill_color"],
+            "notes": values["notes"],
+            "row_index": values["row_index"],
+            "column_index": values["column_index"],
+            "row_span": values["row_span"],
+            "column_span": values["column_span"],
+            "left_percentage": left,
+            "top_percentage": top,
+            "width_percentage": width,
+            "height_percentage": height,
+        }
+        desk = existing.get(identifier)
+        if desk is None:
+            to_create.append(Desk(identifier=identifier, **desired))
+            continue
+        if all(getattr(desk, name) == value for name, value in desired.items()):
+            continue
+        if (desk.row_index, desk.column_index) != (values["row_index"], values["column_index"]):
+            moved.append(desk)
+        for name, value in desired.items():
+            setattr(desk, name, value)
+        to_update.append(desk)
+
+    # The top-left cell is unique and checked row by row, so desks that swap
+    # places are first parked below the grid before taking their new cells.
+    if moved:
+        parking_row = 10_000
+        final_rows = {desk.pk: desk.row_index for desk in moved}
+        for offset, desk in enumerate(moved):
+            desk.row_index = parking_row + offset
+        Desk.objects.bulk_update(moved, ["row_index"])
+        for desk in moved:
+            desk.row_index = final_rows[desk.pk]
+    Desk.objects.bulk_update(to_update, fields)
+    Desk.objects.bulk_create(to_create)
+    result.desks_created = len(to_create)
+    result.desks_updated = len(to_update)
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+
+from django.db import models, router
+from django.utils import timezone
+
+from .models import Assignment, active_assignment_q
+from .versions import floor_version
+
+
+@dataclass(frozen=True)
+class PersonLocation:
+    assignee: str
+    assignment_type: str
+    desk_identifier: str | None
+    desk_label: str | None
+    department: str | None
+
+    def as_dict(self) -> dict:
+        return {
+            "assignee": self.assignee,
+            "assignment_type": self.assignment_type,
+            "desk_identifier": self.desk_identifier,
+            "desk": self.desk_label,
+            "department": self.department,
+        }
+
+
+def _normalize(value: str) -> str:
+    return " ".join(value.casefold().split())
+
+
+class PeopleLocator:
+    """In-memory index from assignee name to where that person is sitting now.
+
+    Full names and the individual words in them are kept in sorted arrays, so
+    prefix lookups are binary searches. Partial matches fall back to a scan of
+    the current occupants, which is a small set compared to all assignments.
+    """
+
+    def __init__(self, locations, valid_until: datetime | None = None):
+        ordered = sorted(locations, key=lambda location: _normalize(location.assignee))
+        self.locations = tuple(ordered)
+        self.names = tuple(_normalize(location.assignee) for location in self.locations)
+        words = sorted(
+            (word, position)
+            for position, name in enumerate(self.names)
+            for word in name.split()
+        )
+        self.word_keys = tuple(word for word, _ in words)
+        self.word_positions = tuple(position for _, position in words)
+        self.valid_until = valid_until
+
+    def is_current(self, now: datetime) -> bool:
+        return self.valid_until is None or now < self.valid_until
+
+    def search(self, query: str, limit: int = 10) -> list[PersonLocation]:
+        """Return people whose name starts with, has a word starting with, or contains ``query``."""
+
+        needle = _normalize(query)
+        if not needle or limit <= 0:
+            return []
+        positions: list[int] = []
+        seen: set[int] = set()
+
+        def collect(candidates) -> bool:
+            for position in candidates:
+                if position not in seen:
+                    seen.add(position)
+                    positions.append(position)
+                    if len(positions) >= limit:
+                        return True
+            return False
+
+        for candidates in (
+            self._prefix_positions(self.names, range(len(self.names)), needle),
+            self._prefix_positions(self.word_keys, self.word_positions, needle),
+            (position for position, name in enumerate(self.names) if needle in name),
+        ):
+            if collect(candidates):
+                break
+        return [self.locations[position] for position in positions]
+
+    @staticmethod
+    def _prefix_positions(keys, positions, prefix: str):
+        index = bisect_left(keys, prefix)
+        while index < len(keys) and keys[index].startswith(prefix):
+            yield positions[index]
+            index += 1
+
+
+def build_people_locator(now: datetime | None = None) -> PeopleLocator:
+    """Snapshot who is assigned where at ``now``.
+
+    The locator records when the snapshot stops being accurate: the earliest
+    end of an active assignment or start of a future one.
+    """
+
+    now = now or timezone.now()
+    assignments = (
+        Assignment.objects.select_related("desk", "desk__department")
+        .filter(active_assignment_q(now))
+        .order_by("-start", "-created_at")
+    )
+    locations: dict[str, PersonLocation] = {}
+    valid_until = (
+        Assignment.objects.filter(start__gt=now)
+        .aggregate(next_start=models.Min("start"))
+        .get("next_start")
+    )
+    for assignment in assignments:
+        if assignment.is_recurring:
+            occurrence = next(assignment.occurrences(now, now), None)
+            # The snapshot changes when this occurrence ends or the next one starts.
+            change = occurrence[1] if occurrence else assignment.next_occurrence_start(now)
+            if change is not None and (valid_until is None or change < valid_until):
+                valid_until = change
+            if occurrence is None:
+                continue
+        elif not assignment.is_permanent and assignment.end is not None:
+            if valid_until is None or assignment.end < valid_until:
+                valid_until = assignment.end
+        key = _normalize(assignment.assignee_name)
+        if key in locations:
+            # The most recent active assignment wins, as in assignment_info.
+            continue
+        desk = assignment.desk if assignment.assignment_type == Assignment.TYPE_DESK else None
+        locations[key] = PersonLocation(
+            assignee=assignment.assignee_name,
+            assignment_type=assignment.assignment_type,
+            desk_identifier=desk.identifier if desk else None,
+            desk_label=desk.label if desk else None,
+            department=desk.department.name if desk else None,
+        )
+    return PeopleLocator(locations.values(), valid_until)
+
+
+_locator_lock = Lock()
+# Keyed by database alias, like the floor grid, so replica reads never stand
+# in for the primary.
+_cached_locators: dict[str, tuple[int, PeopleLocator]] = {}
+
+
+def people_locator(now: datetime | None = None) -> PeopleLocator:
+    """Return the process-wide locator, rebuilt after writes or when an assignment starts or ends."""
+
+    now = now or timezone.now()
+    alias = router.db_for_read(Assignment)
+    version = floor_version()
+    cached = _cached_locators.get(alias)
+    if cached and cached[0] == version and cached[1].is_current(now):
+        return cached[1]
+    with _locator_lock:
+        cached = _cached_locators.get(alias)
+        if cached and cached[0] == version and cached[1].is_current(now):
+            return cached[1]
+        locator = build_people_locator(now)
+        _cached_locators[alias] = (version, locator)
+        return locator
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.test import Client
+from django.urls import reverse
+
+from floorplan.models import Assignment, Desk
+
+
+def _request_host() -> str:
+    for host in settings.ALLOWED_HOSTS:
+        if host and host != "*" and not host.startswith("."):
+            return host
+    return "localhost"
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request latency of desk_detail and assignment_info with a new "
+        "database connection per request versus a persistent connection."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--desk", help="Desk identifier to request (defaults to the first desk).")
+        parser.add_argument("--name", help="Assignee name to look up (defaults to the latest assignee).")
+        parser.add_argument(
+            "--max-age",
+            type=int,
+            default=None,
+            help="CONN_MAX_AGE for the persistent run (defaults to the configured value, or 60).",
+        )
+
+    def handle(self, *args, **options):
+        count = options["requests"]
+        if count < 1:
+            raise CommandError("--requests must be positive.")
+
+        identifier = options["desk"] or Desk.objects.values_list("identifier", flat=True).first()
+        if not identifier:
+            raise CommandError("Create at least one desk before running the benchmark.")
+        name = options["name"] or (
+            Assignment.objects.order_by("-start").values_list("assignee_name", flat=True).first()
+            or "Benchmark Visitor"
+        )
+
+        settings_dict = connections["default"].settings_dict
+        original_max_age = settings_dict["CONN_MAX_AGE"]
+        persistent_max_age = options["max_age"]
+        if persistent_max_age is None:
+            persistent_max_age = original_max_age or 60
+
+        endpoints = [
+            ("desk_detail", "get", reverse("floorplan:desk-detail", args=[identifier]), None),
+            ("assignment_info", "post", reverse("floorplan:assignment-info"), {"name": name}),
+        ]
+        rows = []
+        try:
+            for label, max_age in (("per-request", 0), ("persistent", persistent_max_age)):
+                connections.close_all()
+                settings_dict["CONN_MAX_AGE"] = max_age
+                client = Client(HTTP_HOST=_request_host())
+                for endpoint, method, url, data in endpoints:
+                    samples = self._measure(client, method, url, data, count)
+                    rows.append((endpoint, label, samples))
+        finally:
+            settings_dict["CONN_MAX_AGE"] = original_max_age
+            connections.close_all()
+
+        self.stdout.write(f"{count} request(s) per endpoint and mode")
+        self.stdout.write(f"{'endpoint':<18}{'connections':<14}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}")
+        means: dict[tuple[str, str], float] = {}
+        for endpoint, label, samples in rows:
+            mean = statistics.fmean(samples)
+            means[(endpoint, label)] = mean
+            self.stdout.write(
+                f"{endpoint:<18}{label:<14}{mean:>9.3f}"
+                f"{_percentile(samples, 0.5):>9.3f}{_percentile(samples, 0.95):>9.3f}"
+            )
+        for endpoint, *_ in endpoints:
+            saved = means[(endpoint, "per-request")] - means[(endpoint, "persistent")]
+            self.stdout.write(f"{endpoint}: {saved:.3f} ms saved per request")
+
+    def _measure(self, client: Client, method: str, url: str, data, count: int) -> list[float]:
+        call = getattr(client, method)
+        # Warm up URL resolution, templates and the first connection.
+        call(url, data) if data else call(url)
+        samples = []
+        for _ in range(count):
+            started = time.perf_counter()
+            # The test client skips the request_started/request_finished
+            # connection bookkeeping a real server performs, so run it here.
+            close_old_connections()
+            response = call(url, data) if data else call(url)
+            close_old_connections()
+            samples.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 500:
+                raise CommandError(f"{url} returned HTTP {response.status_code}.")
+        return samples
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import gzip
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from floorplan.assets import minify_css, minify_js
+
+MINIFIERS = {".js": minify_js, ".css": minify_css}
+
+
+class Command(BaseCommand):
+    help = (
+        "Mirror static/ into ASSET_BUILD_DIR with JavaScript and CSS minified. "
+        "Enable DJANGO_USE_BUILT_ASSETS so collectstatic picks the mirror up."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            default=str(settings.BASE_DIR / "static"),
+            help="Directory holding the hand-written assets.",
+        )
+        parser.add_argument(
+            "--collectstatic",
+            action="store_true",
+            help="Run collectstatic --noinput once the bundles are built.",
+        )
+
+    def handle(self, *args, **options):
+        source = Path(options["source"])
+        if not source.is_dir():
+            raise CommandError(f"{source} is not a directory.")
+        target = Path(settings.ASSET_BUILD_DIR)
+        # Rebuild from scratch so files deleted from the sources do not linger.
+        if target.exists():
+            shutil.rmtree(target)
+
+        total_before = total_after = 0
+        for path in sorted(source.rglob("*")):
+            if not path.is_file():
+                continue
+            destination = target / path.relative_to(source)
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            minify = MINIFIERS.get(path.suffix)
+            if minify is None:
+                shutil.copy2(path, destination)
+                continue
+            original = path.read_text(encoding="utf-8")
+            minified = minify(original)
+            destination.write_text(minified, encoding="utf-8")
+
+            before = len(gzip.compress(original.encode("utf-8")))
+            after = len(gzip.compress(minified.encode("utf-8")))
+            total_before += before
+            total_after += after
+            self.stdout.write(
+                f"{path.relative_to(source)}: {len(original):,} -> {len(minified):,} bytes "
+                f"({before:,} -> {after:,} gzipped)"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Gzipped total {total_before:,} -> {total_after:,} bytes.")
+        )
+
+        if options["collectstatic"]:
+            if not settings.USE_BUILT_ASSETS:
+                raise CommandError(
+                    "Set DJANGO_USE_BUILT_ASSETS=1 so collectstatic uses the built assets."
+                )
+            call_command("collectstatic", interactive=False, verbosity=options["verbosity"])
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from floorplan.layout_io import FORMATS, format_for_path, write_layout
+
+
+class Command(BaseCommand):
+    help = "Stream departments and desks as JSON Lines or CSV for import_layout."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", "-o", help="File to write (defaults to stdout).")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Output format (defaults to csv for .csv files, otherwise jsonl).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["output"]
+        fmt = options["format"] or format_for_path(path)
+        if not path:
+            # write_layout ends each record itself; OutputWrapper would add a blank line.
+            self.stdout.ending = ""
+            write_layout(self.stdout, fmt)
+            return
+        with open(path, "w", encoding="utf-8", newline="") as stream:
+            count = write_layout(stream, fmt)
+        self.stderr.write(f"Wrote {count} record(s) to {path}.")
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from floorplan.layout_io import (
+    FORMATS,
+    LayoutImportError,
+    format_for_path,
+    import_layout,
+    read_layout,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply a layout written by export_layout as a diff against the current floor, "
+        "in one transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="JSON Lines or CSV file to import, or - for stdin.")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Input format (defaults to csv for .csv files, otherwise jsonl).",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Delete desks and departments that are not in the file, with their assignments.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change and roll back.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or format_for_path(path)
+        try:
+            if path == "-":
+                result = import_layout(
+                    read_layout(sys.stdin, fmt),
+                    prune=options["prune"],
+                    dry_run=options["dry_run"],
+                )
+            else:
+                with open(path, encoding="utf-8", newline="") as stream:
+                    result = import_layout(
+                        read_layout(stream, fmt),
+                        prune=options["prune"],
+                        dry_run=options["dry_run"],
+                    )
+        except OSError as exc:
+            raise CommandError(f"Unable to read {path}: {exc}") from exc
+        except LayoutImportError as exc:
+            raise CommandError(str(exc)) from exc
+
+        prefix = "Dry run — no changes saved. " if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(f"{prefix}{result.summary()}"))
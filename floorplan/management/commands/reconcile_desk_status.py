@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from floorplan.status import reconcile_desk_status
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the stored status of desks whose reservation or block-out "
+        "transition has passed, or of every desk with --all."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Seconds between runs. Runs once and exits when 0 (the default).",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            dest="everything",
+            help="Recompute every desk, repairing drift from writes made outside the app.",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        if interval < 0:
+            raise CommandError("--interval cannot be negative.")
+
+        while True:
+            self.reconcile(options["everything"], options["verbosity"])
+            if not interval:
+                return
+            try:
+                time.sleep(interval)
+            except KeyboardInterrupt:
+                return
+
+    def reconcile(self, everything: bool, verbosity: int) -> None:
+        close_old_connections()
+        now = timezone.now()
+        with transaction.atomic():
+            refreshed = reconcile_desk_status(now, everything=everything)
+        close_old_connections()
+        if refreshed or verbosity > 1:
+            self.stdout.write(
+                f"{timezone.localtime(now):%Y-%m-%d %H:%M:%S} refreshed the status of "
+                f"{refreshed} desk(s)."
+            )
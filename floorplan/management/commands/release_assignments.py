@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+
+from floorplan.reservations import release_expired_reservations, release_no_show_reservations
+
+
+class Command(BaseCommand):
+    help = (
+        "Close self-service reservations that have ended and, optionally, release "
+        "reservations nobody checked in to."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Seconds between runs. Runs once and exits when 0 (the default).",
+        )
+        parser.add_argument(
+            "--no-show-grace",
+            type=int,
+            default=None,
+            metavar="MINUTES",
+            help=(
+                "Release reservations and advance bookings not checked in to this many "
+                "minutes after they start."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        grace_minutes = options["no_show_grace"]
+        if interval < 0:
+            raise CommandError("--interval cannot be negative.")
+        if grace_minutes is not None and grace_minutes < 0:
+            raise CommandError("--no-show-grace cannot be negative.")
+        grace = timedelta(minutes=grace_minutes) if grace_minutes is not None else None
+
+        while True:
+            self.release(grace, options["verbosity"])
+            if not interval:
+                return
+            try:
+                time.sleep(interval)
+            except KeyboardInterrupt:
+                return
+
+    def release(self, grace: timedelta | None, verbosity: int) -> None:
+        close_old_connections()
+        now = timezone.now()
+        expired = release_expired_reservations(now)
+        no_shows = release_no_show_reservations(grace, now) if grace is not None else 0
+        close_old_connections()
+        if expired or no_shows or verbosity > 1:
+            self.stdout.write(
+                f"{timezone.localtime(now):%Y-%m-%d %H:%M:%S} closed {expired} expired and "
+                f"released {no_shows} no-show reservation(s)."
+            )
@@ -0,0 +1,443 @@
+from __future__ import annotations
+
+import asyncio
+import http
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import unquote, urlencode
+from urllib.request import HTTPCookieProcessor, ProxyHandler, Request, build_opener
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import (
+    ThreadedWSGIServer,
+    WSGIRequestHandler,
+    get_internal_wsgi_application,
+)
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from floorplan.database import scratch_database
+from floorplan.employees import load_employee_records
+from floorplan.models import Assignment
+
+STEPS = ("index", "employee_auth", "assignment_info", "desk_detail", "assign")
+REQUEST_TIMEOUT = 30
+
+
+def _request_host() -> str:
+    for host in settings.ALLOWED_HOSTS:
+        if host and host != "*" and not host.startswith("."):
+            return host
+    return "localhost"
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+@dataclass
+class SimulationResult:
+    latencies: dict[str, list[float]] = field(
+        default_factory=lambda: {step: [] for step in STEPS}
+    )
+    errors: dict[str, int] = field(default_factory=lambda: dict.fromkeys(STEPS, 0))
+    reservations: int = 0
+    conflicts: int = 0
+    journeys: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, step: str, elapsed: float, ok: bool) -> None:
+        with self.lock:
+            self.latencies[step].append(elapsed * 1000)
+            if not ok:
+                self.errors[step] += 1
+
+    def count(self, **counts: int) -> None:
+        with self.lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+
+class _QuietWSGIRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class _WSGIServer:
+    """Serve the project's WSGI application from a thread per request."""
+
+    def __init__(self):
+        self.httpd = ThreadedWSGIServer(("127.0.0.1", 0), _QuietWSGIRequestHandler)
+        self.httpd.set_app(get_internal_wsgi_application())
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+
+class _ASGIServer:
+    """Just enough HTTP/1.1 to drive an ASGI application, one request per connection."""
+
+    def __init__(self):
+        self.app = import_string("workspace_manager.asgi.application")
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.server = None
+        self.port = 0
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.server = self.loop.run_until_complete(
+            asyncio.start_server(self._handle, "127.0.0.1", 0)
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.ready.set()
+        self.loop.run_forever()
+        self.server.close()
+        # Let responses that are still being finalised complete before closing.
+        pending = asyncio.all_tasks(self.loop)
+        if pending:
+            self.loop.run_until_complete(asyncio.wait(pending, timeout=5))
+        for task in pending:
+            task.cancel()
+        self.loop.run_until_complete(self.server.wait_closed())
+        self.loop.close()
+
+    def start(self) -> None:
+        self.thread.start()
+        self.ready.wait()
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    async def _handle(self, reader, writer) -> None:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        method, target, _ = request_line.split(" ", 2)
+        headers = []
+        for line in header_lines:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers.append((name.strip().lower().encode("latin-1"), value.strip().encode("latin-1")))
+        length = int(dict(headers).get(b"content-length", b"0"))
+        body = await reader.readexactly(length) if length else b""
+        path, _, query = target.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": unquote(path),
+            "raw_path": path.encode("latin-1"),
+            "query_string": query.encode("latin-1"),
+            "root_path": "",
+            "headers": headers,
+            "client": writer.get_extra_info("peername")[:2],
+            "server": writer.get_extra_info("sockname")[:2],
+        }
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Nothing else arrives on this connection; the app cancels the wait.
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                lines = [f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}"]
+                lines += [
+                    f"{name.decode('latin-1')}: {value.decode('latin-1')}"
+                    for name, value in message.get("headers", [])
+                ]
+                lines.append("Connection: close")
+                writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+            elif message["type"] == "http.response.body":
+                writer.write(message.get("body", b""))
+
+        try:
+            await self.app(scope, receive, send)
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+class _Kiosk:
+    """One employee's session: its own cookies, CSRF token and think times."""
+
+    def __init__(self, base_url: str, result: SimulationResult, rng: random.Random, think_time: float):
+        self.base_url = base_url
+        self.result = result
+        self.rng = rng
+        self.think_time = think_time
+        self.cookies = CookieJar()
+        self.opener = build_opener(ProxyHandler({}), HTTPCookieProcessor(self.cookies))
+
+    def think(self) -> None:
+        if self.think_time > 0:
+            time.sleep(min(self.rng.expovariate(1 / self.think_time), self.think_time * 5))
+
+    def csrf_token(self) -> str:
+        for cookie in self.cookies:
+            if cookie.name == settings.CSRF_COOKIE_NAME:
+                return cookie.value
+        return ""
+
+    def call(self, step: str, path: str, data: dict | None = None, expected=(200,)) -> tuple[int, dict]:
+        headers = {"Host": _request_host()}
+        payload = None
+        if data is not None:
+            payload = urlencode(data).encode("utf-8")
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+            headers["X-CSRFToken"] = self.csrf_token()
+        request = Request(self.base_url + path, data=payload, headers=headers)
+        started = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=REQUEST_TIMEOUT) as response:
+                status, body = response.status, response.read()
+        except HTTPError as exc:
+            status, body = exc.code, exc.read()
+        except (URLError, OSError):
+            status, body = 0, b""
+        self.result.record(step, time.perf_counter() - started, status in expected)
+        try:
+            return status, json.loads(body) if body and step != "index" else {}
+        except ValueError:
+            return status, {}
+
+    def run(self, employee, identifiers: list[str]) -> None:
+        status, _ = self.call("index", reverse("floorplan:index"))
+        if status != 200:
+            return
+        self.think()
+        status, _ = self.call(
+            "employee_auth",
+            reverse("floorplan:employee-auth"),
+            {"last_name": employee.last_name, "extension": employee.extension_last4},
+        )
+        if status != 200:
+            return
+        self.call("assignment_info", reverse("floorplan:assignment-info"), {"name": employee.full_name})
+        self.think()
+        identifier = self.rng.choice(identifiers)
+        self.call("desk_detail", reverse("floorplan:desk-detail", args=[identifier]))
+        self.think()
+        status, _ = self.call(
+            "assign",
+            reverse("floorplan:assign-to-desk", args=[identifier]),
+            {"assignee_name": employee.full_name},
+            expected=(200, 400, 409),
+        )
+        if status == 200:
+            self.result.count(reservations=1)
+        elif status in {400, 409}:
+            self.result.count(conflicts=1)
+        self.result.count(journeys=1)
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate a morning rush: concurrent kiosks walk employees through sign-in, "
+        "assignment lookup, desk detail and reservation against a local WSGI or ASGI "
+        "server, then report throughput, latency percentiles and error and conflict "
+        "rates. Local servers use a temporary copy of the configured database, "
+        "because a simulated reservation ends that employee's existing assignments; "
+        "--url writes to the remote server's database and needs "
+        "--i-understand-this-writes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kiosks", type=int, default=10, help="Concurrent kiosks.")
+        parser.add_argument(
+            "--employees",
+            type=int,
+            default=None,
+            help="Employees to walk through the journey (defaults to ten per kiosk).",
+        )
+        parser.add_argument(
+            "--interface",
+            choices=["wsgi", "asgi", "both"],
+            default="wsgi",
+            help="Entry point to serve the app from.",
+        )
+        parser.add_argument(
+            "--url",
+            help="Drive an already running server at this base URL instead of starting one.",
+        )
+        parser.add_argument(
+            "--i-understand-this-writes",
+            action="store_true",
+            help=(
+                "Allow --url: simulated reservations are written to that server's database "
+                "and end the real assignments of the employees picked from the roster."
+            ),
+        )
+        parser.add_argument(
+            "--think-time",
+            type=float,
+            default=2.0,
+            help="Mean seconds an employee pauses between steps (exponentially distributed).",
+        )
+        parser.add_argument(
+            "--keep-reservations",
+            action="store_true",
+            help="Leave the simulated reservations in the database the run used afterwards.",
+        )
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        kiosks = options["kiosks"]
+        if kiosks < 1:
+            raise CommandError("--kiosks must be positive.")
+        if options["think_time"] < 0:
+            raise CommandError("--think-time cannot be negative.")
+        if options["url"] and not options["i_understand_this_writes"]:
+            raise CommandError(
+                "--url drives a server that writes to its own database: each simulated "
+                "reservation ends that employee's real assignments. Pass "
+                "--i-understand-this-writes to run against it anyway."
+            )
+        if not options["url"] and connection.vendor != "sqlite":
+            raise CommandError("Local runs copy the database, which is only supported for SQLite.")
+        roster = list(load_employee_records())
+        if not roster:
+            raise CommandError("The employee roster is empty; set EMP_CSV_PATH to a CSV of employees.")
+        rng = random.Random(options["seed"])
+        count = min(options["employees"] or kiosks * 10, len(roster))
+        employees = rng.sample(roster, count)
+
+        if options["url"]:
+            interfaces = [("remote", None)]
+        elif options["interface"] == "both":
+            interfaces = [("wsgi", _WSGIServer), ("asgi", _ASGIServer)]
+        else:
+            servers = {"wsgi": _WSGIServer, "asgi": _ASGIServer}
+            interfaces = [(options["interface"], servers[options["interface"]])]
+
+        # Every conflict would otherwise be logged as a "django.request" warning.
+        request_logger = logging.getLogger("django.request")
+        original_level = request_logger.level
+        try:
+            for label, server_class in interfaces:
+                # Each local run gets a fresh copy, so every interface starts from the same floor.
+                with scratch_database() if server_class else nullcontext():
+                    result, elapsed = self._run_interface(server_class, employees, rng, options)
+                self._report(label, result, elapsed, kiosks, len(employees))
+        finally:
+            request_logger.setLevel(original_level)
+
+    def _run_interface(self, server_class, employees, rng, options):
+        started_at = timezone.now()
+        server = server_class() if server_class else None
+        # Loading the ASGI entry point runs django.setup(), which resets logging.
+        logging.getLogger("django.request").setLevel(logging.ERROR)
+        if server:
+            server.start()
+            base_url = f"http://127.0.0.1:{server.port}"
+        else:
+            base_url = options["url"].rstrip("/")
+        try:
+            return self._simulate(
+                base_url, employees, options["kiosks"], options["think_time"], rng.randrange(1 << 30)
+            )
+        finally:
+            if server:
+                server.stop()
+            if not options["keep_reservations"]:
+                Assignment.objects.filter(
+                    created_at__gte=started_at,
+                    assignee_name__in=[employee.full_name for employee in employees],
+                ).delete()
+
+    def _free_desks(self, base_url: str) -> list[str]:
+        request = Request(
+            base_url + reverse("floorplan:floor-snapshot"), headers={"Host": _request_host()}
+        )
+        try:
+            with build_opener(ProxyHandler({})).open(request, timeout=REQUEST_TIMEOUT) as response:
+                snapshot = json.loads(response.read())
+        except (URLError, OSError, ValueError) as exc:
+            raise CommandError(f"Could not load the floor from {base_url}: {exc}") from exc
+        return [
+            desk["identifier"]
+            for desk in snapshot["desks"]
+            if desk["is_assignable"] and desk["status"] == "free"
+        ]
+
+    def _simulate(self, base_url, employees, kiosks, think_time, seed):
+        identifiers = self._free_desks(base_url)
+        if not identifiers:
+            raise CommandError("No free, assignable desks are available to reserve.")
+        result = SimulationResult()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=kiosks) as pool:
+            futures = [
+                pool.submit(
+                    _Kiosk(base_url, result, random.Random(seed + index), think_time).run,
+                    employee,
+                    identifiers,
+                )
+                for index, employee in enumerate(employees)
+            ]
+            for future in futures:
+                future.result()
+        return result, time.perf_counter() - started
+
+    def _report(self, label, result: SimulationResult, elapsed, kiosks, employees) -> None:
+        elapsed = elapsed or 1e-9
+        requests = sum(len(samples) for samples in result.latencies.values())
+        errors = sum(result.errors.values())
+        attempts = result.reservations + result.conflicts
+        self.stdout.write(
+            f"{label}: {kiosks} kiosk(s), {employees} employee(s), {elapsed:.2f} s, "
+            f"{requests / elapsed:.1f} req/s, {result.journeys / elapsed:.2f} journeys/s"
+        )
+        self.stdout.write(
+            f"{'step':<18}{'count':>7}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errors':>8}"
+        )
+        for step in STEPS:
+            samples = result.latencies[step]
+            if not samples:
+                continue
+            self.stdout.write(
+                f"{step:<18}{len(samples):>7}{_percentile(samples, 0.5):>9.1f}"
+                f"{_percentile(samples, 0.9):>9.1f}{_percentile(samples, 0.99):>9.1f}"
+                f"{max(samples):>9.1f}{result.errors[step]:>8}"
+            )
+        self.stdout.write(
+            f"error rate {errors / max(requests, 1):.1%}, "
+            f"conflict rate {result.conflicts / max(attempts, 1):.1%} "
+            f"({result.reservations} booked, {result.conflicts} conflicts)"
+        )
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from floorplan import views
+from floorplan.database import scratch_database
+from floorplan.models import Assignment, Desk
+
+STRESS_NAME_PREFIX = "Stress Tester"
+
+# Django's stock SQLite behaviour: rollback journal, FULL sync, no mmap and the
+# five second timeout the sqlite3 module applies when none is configured.
+BASELINE_PRAGMAS = {
+    "journal_mode": "DELETE",
+    "busy_timeout": 5000,
+    "synchronous": "FULL",
+    "mmap_size": 0,
+}
+
+
+@dataclass
+class PhaseResult:
+    label: str
+    elapsed: float = 0.0
+    reads: int = 0
+    reservations: int = 0
+    conflicts: int = 0
+    lock_errors: int = 0
+    other_errors: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, **counts: int) -> None:
+        with self.lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent self-service reservations against a temporary copy of the "
+        "configured database and report throughput and lock errors. The configured "
+        "database is only read, to make the copy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=25,
+            help="Desk lookups and reservation attempts made by each thread.",
+        )
+        parser.add_argument(
+            "--desks",
+            type=int,
+            default=20,
+            help="Number of free desks the threads compete for.",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=["baseline", "tuned", "both"],
+            default="both",
+            help="Run with Django's default SQLite settings, the configured ones, or both.",
+        )
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("The reservation stress test only targets SQLite databases.")
+        if options["threads"] < 1 or options["iterations"] < 1:
+            raise CommandError("--threads and --iterations must be positive.")
+
+        with scratch_database():
+            identifiers = self._free_desk_identifiers(options["desks"])
+            if not identifiers:
+                raise CommandError("No free, assignable desks are available to reserve.")
+
+            phases = ["baseline", "tuned"] if options["mode"] == "both" else [options["mode"]]
+            rng = random.Random(options["seed"])
+            results = []
+            for phase in phases:
+                results.append(
+                    self._run_phase(
+                        phase,
+                        identifiers,
+                        options["threads"],
+                        options["iterations"],
+                        rng.randrange(1 << 30),
+                    )
+                )
+
+        self.stdout.write(
+            f"{len(identifiers)} desk(s), {options['threads']} thread(s), "
+            f"{options['iterations']} iteration(s) per thread"
+        )
+        self.stdout.write(
+            f"{'mode':<10}{'seconds':>9}{'reserve/s':>11}{'read/s':>9}"
+            f"{'booked':>8}{'conflict':>10}{'locked':>8}{'errors':>8}"
+        )
+        for result in results:
+            elapsed = result.elapsed or 1e-9
+            attempts = result.reservations + result.conflicts
+            self.stdout.write(
+                f"{result.label:<10}{result.elapsed:>9.2f}{attempts / elapsed:>11.1f}"
+                f"{result.reads / elapsed:>9.1f}{result.reservations:>8}"
+                f"{result.conflicts:>10}{result.lock_errors:>8}{result.other_errors:>8}"
+            )
+
+    def _free_desk_identifiers(self, limit: int) -> list[str]:
+        now = timezone.now()
+        desks = (
+            Desk.objects.select_related("department")
+            .prefetch_related("block_zones", "assignments")
+            .all()
+        )
+        identifiers = []
+        for desk in desks:
+            payload = views._desk_payload(desk, now)
+            if payload["is_assignable"] and payload["status"] == "free":
+                identifiers.append(desk.identifier)
+            if len(identifiers) >= limit:
+                break
+        return identifiers
+
+    def _run_phase(self, label, identifiers, thread_count, iterations, seed) -> PhaseResult:
+        result = PhaseResult(label=label)
+        baseline = label == "baseline"
+
+        settings_dict = connections["default"].settings_dict
+        original_options = dict(settings_dict.get("OPTIONS") or {})
+        connections.close_all()
+        try:
+            options = dict(original_options)
+            overrides = {}
+            if baseline:
+                options.pop("transaction_mode", None)
+                overrides["SQLITE_PRAGMAS"] = BASELINE_PRAGMAS
+            settings_dict["OPTIONS"] = options
+            with override_settings(**overrides):
+                threads = [
+                    threading.Thread(
+                        target=self._worker,
+                        args=(index, identifiers, iterations, seed + index, result),
+                    )
+                    for index in range(thread_count)
+                ]
+                started = time.perf_counter()
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                result.elapsed = time.perf_counter() - started
+                connections.close_all()
+        finally:
+            settings_dict["OPTIONS"] = original_options
+            # Clear the copy between phases so each starts from the same desks.
+            Assignment.objects.filter(assignee_name__startswith=STRESS_NAME_PREFIX).delete()
+            connections.close_all()
+        return result
+
+    def _worker(self, index, identifiers, iterations, seed, result: PhaseResult) -> None:
+        rng = random.Random(seed)
+        factory = RequestFactory()
+        profile = {"full_name": f"{STRESS_NAME_PREFIX} {index:03d}"}
+        try:
+            for _ in range(iterations):
+                identifier = rng.choice(identifiers)
+                try:
+                    request = factory.get(reverse("floorplan:desk-detail", args=[identifier]))
+                    views.desk_detail(request, identifier)
+                    result.record(reads=1)
+
+                    request = factory.post(
+                        reverse("floorplan:assign-to-desk", args=[identifier])
+                    )
+                    request.session = {views.SESSION_EMPLOYEE_PROFILE_KEY: profile}
+                    response = views.assign_to_desk(request, identifier)
+                except OperationalError as exc:
+                    if "locked" in str(exc) or "busy" in str(exc):
+                        result.record(lock_errors=1)
+                    else:
+                        result.record(other_errors=1)
+                    continue
+                if response.status_code == 200:
+                    result.record(reservations=1)
+                elif response.status_code in {400, 409}:
+                    result.record(conflicts=1)
+                else:
+                    result.record(other_errors=1)
+        finally:
+            connection.close()
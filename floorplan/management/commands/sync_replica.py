@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from contextlib import closing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database into the replica file, so replica "
+        "routing can be tried locally without a replicating server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Seconds between copies. Copies once and exits when 0 (the default).",
+        )
+        parser.add_argument(
+            "--target",
+            help="Replica file to write. Defaults to the configured replica database.",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        if interval < 0:
+            raise CommandError("--interval cannot be negative.")
+        target = options["target"]
+        if not target:
+            if not settings.REPLICA_DATABASE:
+                raise CommandError("Set DJANGO_DB_REPLICA_NAME or pass --target.")
+            target = settings.DATABASES[settings.REPLICA_DATABASE]["NAME"]
+        if connections[DEFAULT_DB_ALIAS].vendor != "sqlite":
+            raise CommandError("sync_replica only copies SQLite databases.")
+
+        while True:
+            self.sync(str(target), options["verbosity"])
+            if not interval:
+                return
+            try:
+                time.sleep(interval)
+            except KeyboardInterrupt:
+                return
+
+    def sync(self, target: str, verbosity: int) -> None:
+        close_old_connections()
+        primary = connections[DEFAULT_DB_ALIAS]
+        primary.ensure_connection()
+        started = time.perf_counter()
+        # The backup API copies a consistent snapshot page by page into the
+        # existing file, so replica connections that stay open see the update.
+        with closing(sqlite3.connect(target)) as replica:
+            primary.connection.backup(replica)
+        elapsed = time.perf_counter() - started
+        if verbosity:
+            self.stdout.write(f"Copied the primary database to {target} in {elapsed * 1000:.1f} ms.")
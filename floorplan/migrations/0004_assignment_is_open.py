@@ -0,0 +1,39 @@
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("floorplan", "0003_desk_grid_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="assignment",
+            name="is_open",
+            field=models.BooleanField(
+                default=False,
+                help_text=(
+                    "Set while a self-service reservation holds its desk. The database allows "
+                    "one open reservation per desk and one per person."
+                ),
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="assignment",
+            constraint=models.UniqueConstraint(
+                fields=("desk",),
+                condition=models.Q(("assignment_type", "desk"), ("is_open", True)),
+                name="floorplan_one_open_reservation_per_desk",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="assignment",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("assignee_name"),
+                condition=models.Q(("assignment_type", "desk"), ("is_open", True)),
+                name="floorplan_one_open_reservation_per_person",
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+def check_in_self_service_reservations(apps, schema_editor):
+    # Kiosk reservations made before check-ins were recorded were all claimed
+    # in person. 0004 left the older ones with is_open=False, so match them
+    # by who created them as well.
+    Assignment = apps.get_model("floorplan", "Assignment")
+    Assignment.objects.filter(
+        models.Q(is_open=True) | models.Q(created_by="Self-service")
+    ).update(checked_in_at=models.F("start"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("floorplan", "0004_assignment_is_open"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="assignment",
+            name="checked_in_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the assignee confirmed the reservation at a kiosk.",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(check_in_self_service_reservations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("floorplan", "0005_assignment_checked_in_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="assignment",
+            name="recurrence_days",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                help_text=(
+                    "Weekdays the assignment repeats on, as a bitmask with Monday as 1. Start and "
+                    "end describe the first occurrence; 0 means it does not repeat."
+                ),
+            ),
+        ),
+        migrations.AddField(
+            model_name="assignment",
+            name="recurrence_until",
+            field=models.DateField(
+                blank=True,
+                help_text="Last day a recurring assignment can occur on.",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("floorplan", "0006_assignment_recurrence"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="assignment",
+            index=models.Index(fields=["desk", "start"], name="floorplan_assign_desk_start"),
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("floorplan", "0007_assignment_desk_start_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="desk",
+            name="current_status",
+            field=models.CharField(
+                choices=[("free", "Free"), ("occupied", "Occupied"), ("blocked", "Blocked")],
+                default="free",
+                editable=False,
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="desk",
+            name="current_assignee",
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name="desk",
+            name="blocking_zone_names",
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name="desk",
+            name="status_checked_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="When the stored status was computed.",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="desk",
+            name="status_valid_until",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="When the stored status next changes on its own and must be recomputed.",
+                null=True,
+            ),
+        ),
+    ]
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+from datetime import timedelta
+
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 
+from . import recurrence
+
 
 class Department(models.Model):
     """Represents an area or functional group in the building."""
@@ -24,6 +29,15 @@ class Department(models.Model):
 class Desk(models.Model):
     """Single seating location rendered on the floor plan."""
 
+    STATUS_FREE = "free"
+    STATUS_OCCUPIED = "occupied"
+    STATUS_BLOCKED = "blocked"
+    STATUS_CHOICES = [
+        (STATUS_FREE, "Free"),
+        (STATUS_OCCUPIED, "Occupied"),
+        (STATUS_BLOCKED, "Blocked"),
+    ]
+
     identifier = models.SlugField(
         unique=True,
         help_text="Unique slug used to identify the desk in URLs and the UI.",
@@ -62,6 +76,28 @@ class Desk(models.Model):
         help_text="Height (0-100) relative to the floor plan container.",
     )
     notes = models.TextField(blank=True)
+    # Written alongside every assignment and block-out change so reads can skip
+    # recomputing them; see floorplan.status.
+    current_status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_FREE,
+        editable=False,
+    )
+    current_assignee = models.CharField(max_length=200, blank=True, editable=False)
+    blocking_zone_names = models.JSONField(default=list, blank=True, editable=False)
+    status_checked_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        editable=False,
+        help_text="When the stored status was computed.",
+    )
+    status_valid_until = models.DateTimeField(
+        blank=True,
+        null=True,
+        editable=False,
+        help_text="When the stored status next changes on its own and must be recomputed.",
+    )
 
     class Meta:
         ordering = ["row_index", "column_index", "label"]
@@ -79,24 +115,77 @@ class Desk(models.Model):
         """Return the current assignment for the desk, if any."""
 
         reference_time = reference_time or timezone.now()
-        return (
-            self.assignments.filter(
-                assignment_type=Assignment.TYPE_DESK,
-                start__lte=reference_time,
-            )
-            .filter(
-                models.Q(is_permanent=True)
-                | models.Q(end__isnull=True)
-                | models.Q(end__gte=reference_time)
+        if "assignments" in getattr(self, "_prefetched_objects_cache", {}):
+            # Floor-wide views prefetch every assignment; pick from those
+            # instead of running one query per desk.
+            current = [
+                assignment
+                for assignment in self.assignments.all()
+                if assignment.assignment_type == Assignment.TYPE_DESK
+                and assignment.is_active(reference_time)
+            ]
+            return max(
+                current,
+                key=lambda assignment: (assignment.start, assignment.created_at),
+                default=None,
             )
+        candidates = (
+            self.assignments.filter(assignment_type=Assignment.TYPE_DESK)
+            .filter(active_assignment_q(reference_time))
             .order_by("-start", "-created_at")
-            .first()
+        )
+        return next(
+            (assignment for assignment in candidates if assignment.is_active(reference_time)),
+            None,
+        )
+
+    def has_current_status(self, reference_time) -> bool:
+        """Whether the stored status columns describe the desk at ``reference_time``."""
+
+        return (
+            self.status_checked_at is not None
+            and self.status_valid_until is not None
+            and self.status_checked_at <= reference_time < self.status_valid_until
         )
 
     def is_blocked(self, reference_time=None) -> bool:
         reference_time = reference_time or timezone.now()
         return any(zone.is_active(reference_time) for zone in self.block_zones.all())
 
+    def first_blocked_time(self, start, end):
+        """The earliest moment in ``[start, end)`` a block-out zone covers this desk, if any."""
+
+        overlaps = [
+            max(zone.start, start) for zone in self.block_zones.all() if zone.overlaps(start, end)
+        ]
+        return min(overlaps, default=None)
+
+
+def active_assignment_q(reference_time) -> models.Q:
+    """Match assignments that may be active at ``reference_time``.
+
+    One-off and permanent rows match exactly. Recurring rows match whenever
+    the recurrence has not run out, so callers confirm them with
+    ``Assignment.is_active``.
+    """
+
+    # An occurrence that began on the previous day can still be running.
+    earliest_day = timezone.localtime(reference_time).date() - timedelta(days=1)
+    return models.Q(start__lte=reference_time) & (
+        (
+            models.Q(recurrence_days=0)
+            & (
+                models.Q(is_permanent=True)
+                | models.Q(end__isnull=True)
+                | models.Q(end__gte=reference_time)
+            )
+        )
+        | (
+            models.Q(recurrence_days__gt=0)
+            & (models.Q(recurrence_until__isnull=True) | models.Q(recurrence_until__gte=earliest_day))
+        )
+    )
+
 
 class Assignment(models.Model):
     """Represents a user occupying a desk or working remotely."""
@@ -127,18 +216,89 @@ class Assignment(models.Model):
     note = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.CharField(max_length=200, blank=True)
+    is_open = models.BooleanField(
+        default=False,
+        help_text=(
+            "Set while a self-service reservation holds its desk. The database allows "
+            "one open reservation per desk and one per person."
+        ),
+    )
+    checked_in_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="When the assignee confirmed the reservation at a kiosk.",
+    )
+    recurrence_days = models.PositiveSmallIntegerField(
+        default=0,
+        help_text=(
+            "Weekdays the assignment repeats on, as a bitmask with Monday as 1. Start and "
+            "end describe the first occurrence; 0 means it does not repeat."
+        ),
+    )
+    recurrence_until = models.DateField(
+        blank=True,
+        null=True,
+        help_text="Last day a recurring assignment can occur on.",
+    )
 
     class Meta:
         ordering = ["-start", "assignee_name"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["desk"],
+                condition=models.Q(is_open=True, assignment_type="desk"),
+                name="floorplan_one_open_reservation_per_desk",
+            ),
+            models.UniqueConstraint(
+                Lower("assignee_name"),
+                condition=models.Q(is_open=True, assignment_type="desk"),
+                name="floorplan_one_open_reservation_per_person",
+            ),
+        ]
+        indexes = [
+            # Overlap checks read a desk's bookings starting before a given
+            # time, earliest first; open-ended rows have no end to index.
+            models.Index(fields=["desk", "start"], name="floorplan_assign_desk_start"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - helper
         target = self.desk.label if self.desk else "WFH"
         return f"{self.assignee_name} -> {target}"
 
+    @property
+    def is_recurring(self) -> bool:
+        return bool(self.recurrence_days)
+
+    def occurrences(self, window_start, window_end):
+        """Yield ``(start, end)`` for each occurrence overlapping the window."""
+
+        if not self.is_recurring:
+            open_ended = self.is_permanent or self.end is None
+            if self.start <= window_end and (open_ended or self.end >= window_start):
+                yield self.start, None if open_ended else self.end
+            return
+        yield from recurrence.occurrences(
+            self.start,
+            self.end,
+            self.recurrence_days,
+            self.recurrence_until,
+            window_start,
+            window_end,
+        )
+
+    def next_occurrence_start(self, after):
+        if not self.is_recurring:
+            return self.start if self.start > after else None
+        return recurrence.next_occurrence_start(
+            self.start, self.end, self.recurrence_days, self.recurrence_until, after
+        )
+
     def is_active(self, reference_time=None) -> bool:
         reference_time = reference_time or timezone.now()
         if self.start and self.start > reference_time:
             return False
+        if self.is_recurring:
+            return next(self.occurrences(reference_time, reference_time), None) is not None
         if self.is_permanent:
             return True
         if self.end is None:
@@ -147,6 +307,11 @@ class Assignment(models.Model):
 
     @property
     def duration_display(self) -> str:
+        if self.is_recurring:
+            local_start = timezone.localtime(self.start)
+            local_end = local_start + recurrence.occurrence_length(self.start, self.end)
+            hours = f"{local_start.strftime('%I:%M %p')} - {local_end.strftime('%I:%M %p')}"
+            return f"{recurrence.describe(self.recurrence_days, self.recurrence_until)}, {hours}"
         if self.is_permanent:
             return "Permanent"
         if self.end:
@@ -181,3 +346,10 @@ class BlockOutZone(models.Model):
         if self.end is None:
             return True
         return self.end >= reference_time
+
+    def overlaps(self, start, end) -> bool:
+        """Whether the zone covers any of ``[start, end)``."""
+
+        if self.start >= end:
+            return False
+        return self.is_permanent or self.end is None or self.end > start
@@ -0,0 +1,172 @@
+"""On-demand request profiling for staff.
+
+Add ``?profile=1`` to a URL, or send an ``X-Profile: 1`` header, while signed
+in as staff and the request runs under cProfile with every SQL statement
+recorded. The stats are written to ``settings.PROFILES_DIR`` as a ``.prof``
+file (readable with ``pstats`` or snakeviz) next to a ``.txt`` report, and the
+response carries an ``X-Profile-Id`` header naming them. Requests without the
+flag pass straight through.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import re
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from django.utils.text import slugify
+
+PROFILE_QUERY_PARAMETER = "profile"
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_RETENTION = 100
+PROFILE_STATS_LIMIT = 40
+PROFILE_NAME_PATTERN = re.compile(r"^[\w-]+\.(prof|txt)$")
+
+
+@dataclass(frozen=True)
+class SavedProfile:
+    stem: str
+    created_at: datetime
+    size: int
+
+    @property
+    def stats_name(self) -> str:
+        return f"{self.stem}.prof"
+
+    @property
+    def report_name(self) -> str:
+        return f"{self.stem}.txt"
+
+
+def profiles_dir() -> Path:
+    return Path(settings.PROFILES_DIR)
+
+
+def _flag_enabled(value: str | None) -> bool:
+    return (value or "").lower() in {"1", "true", "yes", "on"}
+
+
+def profiling_requested(request) -> bool:
+    # Look at the raw query string first so unflagged requests never parse it.
+    if PROFILE_QUERY_PARAMETER in request.META.get("QUERY_STRING", ""):
+        if _flag_enabled(request.GET.get(PROFILE_QUERY_PARAMETER)):
+            return True
+    return _flag_enabled(request.META.get(PROFILE_HEADER))
+
+
+class _QueryLog:
+    def __init__(self):
+        self.entries: list[tuple[str, float, str]] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            alias = context["connection"].alias
+            self.entries.append((alias, time.perf_counter() - started, sql))
+
+
+def _write_report(path: Path, request, response, elapsed: float, profiler, queries: _QueryLog):
+    stats_output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stats_output)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_STATS_LIMIT)
+    query_time = sum(duration for _, duration, _ in queries.entries)
+    with path.open("w", encoding="utf-8") as report:
+        report.write(f"{request.method} {request.get_full_path()}\n")
+        report.write(f"User: {request.user.get_username()}\n")
+        report.write(f"Status: {response.status_code}\n")
+        report.write(f"Wall time: {elapsed * 1000:.1f} ms\n")
+        report.write(f"Queries: {len(queries.entries)} ({query_time * 1000:.1f} ms)\n\n")
+        report.write(stats_output.getvalue())
+        report.write("\nSQL log\n")
+        for index, (alias, duration, sql) in enumerate(queries.entries, start=1):
+            report.write(f"\n#{index} [{alias}] {duration * 1000:.2f} ms\n{sql}\n")
+
+
+def _prune_profiles(directory: Path) -> None:
+    stems = sorted({path.stem for path in directory.glob("*.prof")})
+    for stem in stems[:-PROFILE_RETENTION]:
+        for suffix in (".prof", ".txt"):
+            (directory / f"{stem}{suffix}").unlink(missing_ok=True)
+
+
+def profile_request(request, get_response):
+    """Run ``get_response`` under cProfile and save the stats and SQL log."""
+
+    directory = profiles_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = timezone.now().strftime("%Y%m%dT%H%M%S%f")
+    stem = f"{stamp}-{request.method.lower()}-{slugify(request.path) or 'root'}"[:120]
+
+    queries = _QueryLog()
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(queries))
+        profiler.enable()
+        try:
+            response = get_response(request)
+        finally:
+            profiler.disable()
+    elapsed = time.perf_counter() - started
+
+    profiler.dump_stats(directory / f"{stem}.prof")
+    _write_report(directory / f"{stem}.txt", request, response, elapsed, profiler, queries)
+    _prune_profiles(directory)
+    response["X-Profile-Id"] = stem
+    return response
+
+
+def saved_profiles() -> list[SavedProfile]:
+    """Profiles on disk, newest first."""
+
+    directory = profiles_dir()
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for path in directory.glob("*.prof"):
+        stat = path.stat()
+        profiles.append(
+            SavedProfile(
+                stem=path.stem,
+                created_at=datetime.fromtimestamp(stat.st_mtime, tz=timezone.get_current_timezone()),
+                size=stat.st_size,
+            )
+        )
+    profiles.sort(key=lambda profile: profile.stem, reverse=True)
+    return profiles
+
+
+def profile_file(name: str) -> Path | None:
+    """Resolve a download name to a file in the profiles directory, if it exists."""
+
+    if not PROFILE_NAME_PATTERN.match(name):
+        return None
+    path = profiles_dir() / name
+    return path if path.is_file() else None
+
+
+class RequestProfilingMiddleware:
+    """Profile staff requests that ask for it; everything else passes through."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profiling_requested(request):
+            return self.get_response(request)
+        user = getattr(request, "user", None)
+        if user is None or not (user.is_active and user.is_staff):
+            return self.get_response(request)
+        return profile_request(request, self.get_response)
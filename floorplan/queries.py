@@ -0,0 +1,139 @@
+"""Spot repeated queries, the usual sign of an N+1 loop.
+
+:class:`QueryCapture` records every statement run while it is active and
+groups them by a normalized template, so ``SELECT ... WHERE desk_id = 4`` and
+``... desk_id = 9`` count as the same query. :class:`QueryInspectionMiddleware`
+applies it to each request when ``settings.QUERY_INSPECTION`` is ``"warn"`` or
+``"raise"`` and reports templates that ran ``QUERY_REPEAT_THRESHOLD`` times or
+more.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+INSPECTION_MODES = ("off", "warn", "raise")
+
+_STRING_LITERAL = re.compile(r"'(?:''|[^'])*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class RepeatedQueryError(Exception):
+    """Raised when a block of code runs the same query template too many times."""
+
+
+def normalize_sql(sql: str) -> str:
+    """Reduce ``sql`` to a template with literals and placeholders replaced by ``?``."""
+
+    template = _STRING_LITERAL.sub("?", sql)
+    template = _NUMBER_LITERAL.sub("?", template)
+    template = _PLACEHOLDER.sub("?", template)
+    # IN lists vary in length with the data; treat them as one placeholder.
+    template = _PLACEHOLDER_LIST.sub("(?)", template)
+    return _WHITESPACE.sub(" ", template).strip()
+
+
+@dataclass
+class QueryTemplate:
+    sql: str
+    count: int = 0
+    duration: float = 0.0
+
+
+class QueryCapture:
+    """Context manager recording the queries run on every database connection."""
+
+    def __init__(self):
+        self.templates: dict[str, QueryTemplate] = {}
+        self.total = 0
+        self._stack: ExitStack | None = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            template = normalize_sql(sql)
+            entry = self.templates.get(template)
+            if entry is None:
+                entry = self.templates[template] = QueryTemplate(template)
+            entry.count += 1
+            entry.duration += time.perf_counter() - started
+            self.total += 1
+
+    def __enter__(self) -> QueryCapture:
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        self._stack = None
+        return False
+
+    def repeated(self, threshold: int) -> list[QueryTemplate]:
+        """Templates executed at least ``threshold`` times, most frequent first."""
+
+        return sorted(
+            (entry for entry in self.templates.values() if entry.count >= threshold),
+            key=lambda entry: entry.count,
+            reverse=True,
+        )
+
+    def report(self, threshold: int) -> str:
+        lines = [
+            f"{entry.count}x ({entry.duration * 1000:.1f} ms) {entry.sql}"
+            for entry in self.repeated(threshold)
+        ]
+        return "\n".join(lines)
+
+    def check(self, threshold: int, label: str = "") -> None:
+        """Raise :class:`RepeatedQueryError` if any template reached ``threshold``."""
+
+        if self.repeated(threshold):
+            prefix = f"{label}: " if label else ""
+            raise RepeatedQueryError(
+                f"{prefix}repeated queries out of {self.total}:\n{self.report(threshold)}"
+            )
+
+
+class QueryInspectionMiddleware:
+    """Report requests that repeat a query template; unused when inspection is off."""
+
+    def __init__(self, get_response):
+        self.mode = settings.QUERY_INSPECTION
+        if self.mode not in INSPECTION_MODES:
+            raise ValueError(f"QUERY_INSPECTION must be one of {', '.join(INSPECTION_MODES)}.")
+        if self.mode == "off":
+            raise MiddlewareNotUsed
+        self.threshold = settings.QUERY_REPEAT_THRESHOLD
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryCapture() as capture:
+            response = self.get_response(request)
+        label = f"{request.method} {request.path}"
+        if self.mode == "raise":
+            capture.check(self.threshold, label)
+        elif capture.repeated(self.threshold):
+            logger.warning(
+                "%s repeated queries out of %d:\n%s",
+                label,
+                capture.total,
+                capture.report(self.threshold),
+            )
+        return response
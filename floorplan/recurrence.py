@@ -0,0 +1,92 @@
+"""Weekly recurrence for assignments.
+
+A recurring assignment is stored once: ``start``/``end`` describe its first
+occurrence, a weekday bitmask says which days it repeats on (Monday is bit 0)
+and an optional last date bounds it. Occurrences are generated on demand for
+the window being asked about and never written to the database.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Iterator
+
+from django.utils import timezone
+
+WEEKDAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+WEEKDAY_CHOICES = [(str(day), name) for day, name in enumerate(WEEKDAY_NAMES)]
+
+
+def weekday_mask(days: Iterable[int | str]) -> int:
+    mask = 0
+    for day in days:
+        mask |= 1 << int(day)
+    return mask
+
+
+def mask_weekdays(mask: int) -> list[int]:
+    return [day for day in range(7) if mask & (1 << day)]
+
+
+def describe(mask: int, until: date | None = None) -> str:
+    days = ", ".join(WEEKDAY_NAMES[day] for day in mask_weekdays(mask))
+    if until:
+        return f"Every {days} until {until.strftime('%b %d, %Y')}"
+    return f"Every {days}"
+
+
+def occurrence_length(start: datetime, end: datetime | None) -> timedelta:
+    """How long each occurrence lasts: the first one's length, or to the end of its day."""
+
+    if end is not None and end > start:
+        return end - start
+    local_start = timezone.localtime(start)
+    day_end = timezone.make_aware(
+        datetime.combine(local_start.date(), time.max), local_start.tzinfo
+    )
+    return day_end - local_start
+
+
+def occurrences(
+    start: datetime,
+    end: datetime | None,
+    mask: int,
+    until: date | None,
+    window_start: datetime,
+    window_end: datetime,
+) -> Iterator[tuple[datetime, datetime]]:
+    """Yield the ``(start, end)`` occurrences that overlap ``[window_start, window_end]``.
+
+    Only days inside the window (plus one occurrence length before it) are
+    visited, so the cost depends on the window and not on how long the
+    recurrence runs.
+    """
+
+    if not mask:
+        return
+    local_start = timezone.localtime(start)
+    length = occurrence_length(start, end)
+    zone = timezone.get_current_timezone()
+    day = max(local_start.date(), timezone.localtime(window_start - length).date())
+    last_day = timezone.localtime(window_end).date()
+    if until is not None:
+        last_day = min(last_day, until)
+    while day <= last_day:
+        if mask & (1 << day.weekday()):
+            occurrence_start = timezone.make_aware(datetime.combine(day, local_start.time()), zone)
+            occurrence_end = occurrence_start + length
+            if start <= occurrence_start <= window_end and occurrence_end >= window_start:
+                yield occurrence_start, occurrence_end
+        day += timedelta(days=1)
+
+
+def next_occurrence_start(
+    start: datetime, end: datetime | None, mask: int, until: date | None, after: datetime
+) -> datetime | None:
+    """Return the first occurrence start later than ``after``, if the recurrence has one."""
+
+    window_end = after + timedelta(days=7)
+    for occurrence_start, _ in occurrences(start, end, mask, until, after, window_end):
+        if occurrence_start > after:
+            return occurrence_start
+    return None
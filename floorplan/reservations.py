@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+from .models import Assignment, Desk
+from .status import refresh_desk_status
+from .versions import bump_floor_version
+
+# How far ahead a kiosk may book a desk.
+ADVANCE_BOOKING_DAYS = 30
+
+# ``created_by`` of rows made at a kiosk rather than by an admin.
+SELF_SERVICE = "Self-service"
+
+# Stands in for the missing end of permanent and open-ended assignments.
+_OPEN_ENDED = datetime.max.replace(tzinfo=dt_timezone.utc)
+
+
+class ReservationConflict(Exception):
+    """Raised when a desk or person already holds an open reservation."""
+
+
+def desk_bookings(
+    desk: Desk,
+    window_start: datetime,
+    window_end: datetime | None = None,
+    *,
+    exclude_pk: int | None = None,
+) -> models.QuerySet:
+    """The desk's bookings that may share time with the window, earliest start first.
+
+    One-off and permanent rows match exactly; recurring rows match while the
+    recurrence has not run out, so callers confirm them with their
+    occurrences. Without ``window_end`` the window is open-ended, as for a
+    permanent assignment.
+    """
+
+    last_recurring_day = timezone.localtime(window_start).date() - timedelta(days=1)
+    bookings = Assignment.objects.filter(
+        desk=desk, assignment_type=Assignment.TYPE_DESK
+    ).filter(
+        models.Q(recurrence_days=0)
+        & (
+            models.Q(end__gt=window_start)
+            | models.Q(end__isnull=True)
+            | models.Q(is_permanent=True)
+        )
+        | models.Q(recurrence_days__gt=0)
+        & (
+            models.Q(recurrence_until__isnull=True)
+            | models.Q(recurrence_until__gte=last_recurring_day)
+        )
+    )
+    if window_end is not None:
+        bookings = bookings.filter(start__lt=window_end)
+    if exclude_pk is not None:
+        bookings = bookings.exclude(pk=exclude_pk)
+    return bookings.order_by("start")
+
+
+def booked_intervals(
+    booking: Assignment, window_start: datetime, window_end: datetime | None = None
+) -> list[tuple[datetime, datetime]]:
+    """The ``[start, end)`` stretches of ``booking`` that share time with the window."""
+
+    window_end = window_end or _OPEN_ENDED
+    if not booking.is_recurring:
+        booking_end = _OPEN_ENDED if booking.is_permanent or booking.end is None else booking.end
+        if booking.start < window_end and booking_end > window_start:
+            return [(booking.start, booking_end)]
+        return []
+    # Any week holds every weekday, so a week of occurrences is enough to tell
+    # whether a recurrence ever meets an open-ended window.
+    expand_to = min(window_end, max(window_start, booking.start) + timedelta(days=7))
+    return [
+        (occurrence_start, occurrence_end)
+        for occurrence_start, occurrence_end in booking.occurrences(window_start, expand_to)
+        if occurrence_start < window_end and occurrence_end > window_start
+    ]
+
+
+def first_booking(
+    desk: Desk,
+    start: datetime,
+    end: datetime | None = None,
+    *,
+    exclude_pk: int | None = None,
+) -> tuple[datetime, Assignment] | None:
+    """The earliest booking sharing time with ``[start, end)`` and when that shared time begins."""
+
+    earliest = None
+    for booking in desk_bookings(desk, start, end, exclude_pk=exclude_pk):
+        # Rows arrive by start, and no booking overlaps before it starts.
+        if earliest is not None and booking.start >= earliest[0]:
+            break
+        intervals = booked_intervals(booking, start, end)
+        if intervals:
+            overlap_start = max(intervals[0][0], start)
+            if earliest is None or overlap_start < earliest[0]:
+                earliest = (overlap_start, booking)
+    return earliest
+
+
+def _lock_desk(desk: Desk) -> None:
+    # Serializes overlap checks on one desk on backends with row locks. SQLite
+    # has none and ignores this; there the IMMEDIATE transactions configured
+    # in settings take the database write lock before the check instead.
+    list(Desk.objects.select_for_update().filter(pk=desk.pk).values_list("pk", flat=True))
+
+
+def reserve_desk(
+    desk: Desk,
+    assignee_name: str,
+    start,
+    end,
+    *,
+    note: str = "Self-service assignment",
+    created_by: str = SELF_SERVICE,
+) -> Assignment:
+    """Open a self-service reservation without locking the assignment table.
+
+    A desk booked later in the window is still reserved, with ``end`` moved
+    back to that booking's start; callers compare the returned end with the
+    one they asked for to tell the user.
+
+    The partial unique constraints on ``Assignment.is_open`` decide the race:
+    when two kiosks claim the same desk, or one person claims two desks, only
+    one insert succeeds and the other raises ``ReservationConflict``.
+    """
+
+    # Recurring assignments are an admin's standing arrangement; a kiosk
+    # reservation for the day does not cut them short.
+    person_desk_assignments = Assignment.objects.filter(
+        assignee_name__iexact=assignee_name,
+        assignment_type=Assignment.TYPE_DESK,
+        recurrence_days=0,
+    )
+    try:
+        with transaction.atomic():
+            # Reservations that ran out without being replaced no longer hold the desk.
+            Assignment.objects.filter(desk=desk, is_open=True, end__lt=start).update(
+                is_open=False
+            )
+            _lock_desk(desk)
+            # The person's own bookings for later stay put.
+            vacated = person_desk_assignments.filter(start__lte=start).filter(
+                models.Q(is_permanent=True)
+                | models.Q(end__isnull=True)
+                | models.Q(end__gte=start)
+            )
+            vacated_desk_ids = list(vacated.values_list("desk_id", flat=True))
+            vacated.update(end=start, is_permanent=False, is_open=False)
+            person_desk_assignments.filter(is_open=True).update(is_open=False)
+            booked = first_booking(desk, start, end)
+            if booked and booked[0] <= start:
+                raise ReservationConflict(_booked_message(booked[0]))
+            if booked:
+                # The desk is free now: stop short of its next booking rather
+                # than turning the walk-up away.
+                end = booked[0]
+            # Bulk updates skip the signals that keep stored desk status current.
+            refresh_desk_status(vacated_desk_ids)
+            return Assignment.objects.create(
+                desk=desk,
+                assignment_type=Assignment.TYPE_DESK,
+                assignee_name=assignee_name,
+                start=start,
+                end=end,
+                is_permanent=False,
+                is_open=True,
+                # Claiming a desk at a kiosk for right now is itself a check-in.
+                checked_in_at=start if start <= timezone.now() else None,
+                note=note,
+                created_by=created_by,
+            )
+    except IntegrityError as exc:
+        if Assignment.objects.filter(desk=desk, is_open=True).exists():
+            raise ReservationConflict("This desk was just reserved by someone else.") from exc
+        raise ReservationConflict(
+            "You already have a reservation in progress. Refresh and try again."
+        ) from exc
+
+
+def _booked_message(booked_from: datetime) -> str:
+    booked_from = timezone.localtime(booked_from)
+    return f"This desk is booked from {booked_from.strftime('%b %d, %I:%M %p')}."
+
+
+def book_desk(
+    desk: Desk,
+    assignee_name: str,
+    start: datetime,
+    end: datetime,
+    *,
+    note: str = "Advance booking",
+    created_by: str = SELF_SERVICE,
+) -> Assignment:
+    """Book ``desk`` for a future window that overlaps none of its other bookings.
+
+    The desk row is locked for the check and the insert, so two kiosks cannot
+    both pass the check for the same time; on SQLite the IMMEDIATE
+    transactions do the same job. The booking is not an open reservation; it
+    holds the desk through its ``start`` and ``end`` alone.
+    """
+
+    with transaction.atomic():
+        _lock_desk(desk)
+        booked = first_booking(desk, start, end)
+        if booked:
+            raise ReservationConflict(_booked_message(booked[0]))
+        person_booked = Assignment.objects.filter(
+            assignee_name__iexact=assignee_name,
+            assignment_type=Assignment.TYPE_DESK,
+            recurrence_days=0,
+            start__lt=end,
+        ).filter(
+            models.Q(end__gt=start) | models.Q(end__isnull=True) | models.Q(is_permanent=True)
+        )
+        if person_booked.exists():
+            raise ReservationConflict("You already have a desk booked for part of that time.")
+        return Assignment.objects.create(
+            desk=desk,
+            assignment_type=Assignment.TYPE_DESK,
+            assignee_name=assignee_name,
+            start=start,
+            end=end,
+            is_permanent=False,
+            note=note,
+            created_by=created_by,
+        )
+
+
+def _awaiting_check_in(now: datetime) -> models.QuerySet:
+    # Open reservations, and kiosk bookings made in advance once they start:
+    # both hold a desk the person has not been seen at yet.
+    return Assignment.objects.filter(
+        models.Q(is_open=True)
+        | models.Q(created_by=SELF_SERVICE, recurrence_days=0, is_permanent=False),
+        checked_in_at__isnull=True,
+        start__lte=now,
+    ).filter(models.Q(end__isnull=True) | models.Q(end__gt=now))
+
+
+def check_in(assignee_name: str, now: datetime | None = None) -> int:
+    """Mark the person's started reservation or advance booking as claimed in person."""
+
+    now = now or timezone.now()
+    return (
+        _awaiting_check_in(now)
+        .filter(assignee_name__iexact=assignee_name)
+        .update(checked_in_at=now)
+    )
+
+
+def walk_up_end(start: datetime) -> datetime:
+    """When a kiosk reservation made at ``start`` without an end runs out: 23:59 that day."""
+
+    local_start = timezone.localtime(start)
+    end = local_start.replace(hour=23, minute=59, second=0, microsecond=0)
+    if end <= start:
+        end += timedelta(days=1)
+    return end
+
+
+def release_expired_reservations(now: datetime | None = None) -> int:
+    """Close open reservations that are over.
+
+    Those whose end has passed are closed in one UPDATE. An open reservation
+    without an end runs until the end of the day it started, like one made at
+    a kiosk, so those from earlier days are given that end and closed too;
+    otherwise they would hold their desk, and match every "no end" predicate,
+    forever.
+    """
+
+    now = now or timezone.now()
+    today = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    with transaction.atomic():
+        released = Assignment.objects.filter(is_open=True, end__lt=now).update(is_open=False)
+        unended = list(
+            Assignment.objects.filter(is_open=True, end__isnull=True, start__lt=today)
+        )
+        for assignment in unended:
+            assignment.end = walk_up_end(assignment.start)
+            assignment.is_open = False
+        if unended:
+            Assignment.objects.bulk_update(unended, ["end", "is_open"])
+            # The desks are free again; bulk updates skip the model signals.
+            refresh_desk_status({assignment.desk_id for assignment in unended}, now)
+            bump_floor_version()
+    return released + len(unended)
+
+
+def release_no_show_reservations(grace: timedelta, now: datetime | None = None) -> int:
+    """End reservations and advance bookings nobody checked in to within ``grace`` of their start."""
+
+    now = now or timezone.now()
+    with transaction.atomic():
+        no_shows = _awaiting_check_in(now).filter(start__lte=now - grace)
+        desk_ids = list(no_shows.values_list("desk_id", flat=True))
+        released = no_shows.update(end=now, is_permanent=False, is_open=False)
+        if released:
+            # The desks are free again; bulk updates skip the model signals.
+            refresh_desk_status(desk_ids, now)
+            bump_floor_version()
+    return released
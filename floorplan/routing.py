@@ -0,0 +1,92 @@
+"""Send kiosk reads to a read replica.
+
+Views decorated with :func:`replica_read` read from
+``settings.REPLICA_DATABASE`` while everything else, and every write, uses the
+primary. A client that writes gets a short-lived pin cookie so its next
+requests read from the primary too and see their own changes before the
+replica catches up. Without a replica configured the middleware removes
+itself and the router routes everything to the primary.
+"""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+
+
+@dataclass
+class _RoutingState:
+    pinned: bool
+    use_replica: bool = False
+    wrote: bool = False
+
+
+_routing: ContextVar[_RoutingState | None] = ContextVar("floorplan_db_routing", default=None)
+
+
+def replica_read(view):
+    """Mark ``view`` as only reading, so it may be served from the replica."""
+
+    view.replica_read = True
+    return view
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is not None and state.use_replica and settings.REPLICA_DATABASE:
+            return settings.REPLICA_DATABASE
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state.wrote = True
+        # Always name the primary: left to Django, an object read from the
+        # replica would be saved back to it.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if settings.REPLICA_DATABASE and db == settings.REPLICA_DATABASE:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Route ``replica_read`` views to the replica unless the client recently wrote."""
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = _RoutingState(pinned=settings.REPLICA_PIN_COOKIE in request.COOKIES)
+        token = _routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if state.wrote:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _routing.get()
+        if state is not None and not state.pinned and getattr(view_func, "replica_read", False):
+            state.use_replica = True
+        return None
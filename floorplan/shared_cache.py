@@ -0,0 +1,80 @@
+"""A cache shared by every worker process on one host.
+
+Django's file-based cache already gives each entry one file that any process
+can read, versioned keys and culling past ``MAX_ENTRIES``. What it lacks is
+coordination between writers: ``add`` and ``incr`` are a read followed by a
+write, and every worker that misses a key rebuilds it at the same time.
+:class:`SharedFileCache` serializes those under file locks, so version
+counters never lose a bump and ``get_or_set`` runs its builder in one worker
+while the others wait for the result.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+from hashlib import md5
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.files import locks
+
+# Keys hash onto a fixed set of lock files so they never pile up; unrelated
+# keys that share a stripe only wait on each other while one is rebuilt.
+LOCK_STRIPES = 64
+
+
+class SharedFileCache(FileBasedCache):
+    lock_suffix = ".lock"
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._held = threading.local()
+
+    def _lock_path(self, key, version) -> str:
+        made_key = self.make_and_validate_key(key, version=version)
+        stripe = int(md5(made_key.encode(), usedforsecurity=False).hexdigest(), 16) % LOCK_STRIPES
+        return os.path.join(self._dir, f"stripe-{stripe:02d}{self.lock_suffix}")
+
+    @contextmanager
+    def _key_lock(self, key, version=None):
+        path = self._lock_path(key, version)
+        held = self._held.__dict__.setdefault("paths", set())
+        if path in held:
+            # A builder that touches another key on the same stripe already
+            # holds its lock; locking again from this thread would deadlock.
+            yield
+            return
+        self._createdir()
+        with open(path, "ab") as lock_file:
+            locks.lock(lock_file, locks.LOCK_EX)
+            held.add(path)
+            try:
+                yield
+            finally:
+                held.discard(path)
+                locks.unlock(lock_file)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._key_lock(key, version):
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        with self._key_lock(key, version):
+            return super().incr(key, delta, version)
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        """Return ``key``, building it from ``default`` in one process at a time on a miss."""
+
+        value = self.get(key, self._missing_key, version=version)
+        if value is not self._missing_key:
+            return value
+        with self._key_lock(key, version):
+            # Another worker may have built it while this one waited.
+            value = self.get(key, self._missing_key, version=version)
+            if value is self._missing_key:
+                value = default() if callable(default) else default
+                if value is not None:
+                    self.set(key, value, timeout, version)
+        return value
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Assignment, BlockOutZone, Department, Desk
+from .status import refresh_desk_status
+from .versions import bump_floor_version, bump_layout_version
+
+
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+@receiver(post_save, sender=BlockOutZone)
+@receiver(post_delete, sender=BlockOutZone)
+@receiver(post_save, sender=Desk)
+@receiver(post_delete, sender=Desk)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(m2m_changed, sender=BlockOutZone.desks.through)
+def floor_changed(sender, **kwargs):
+    bump_floor_version()
+    # Bump again after commit so anything rebuilt from pre-commit rows in the
+    # meantime is not served under the final version.
+    transaction.on_commit(bump_floor_version)
+
+
+@receiver(post_save, sender=Desk)
+@receiver(post_delete, sender=Desk)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def layout_changed(sender, **kwargs):
+    bump_layout_version()
+    transaction.on_commit(bump_layout_version)
+
+
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+def assignment_status_changed(sender, instance, **kwargs):
+    if instance.desk_id:
+        refresh_desk_status([instance.desk_id])
+
+
+@receiver(post_save, sender=BlockOutZone)
+def block_zone_status_changed(sender, instance, created, **kwargs):
+    # A new zone has no desks yet; they arrive through m2m_changed.
+    if not created:
+        refresh_desk_status(instance.desks.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=BlockOutZone)
+def remember_blocked_desks(sender, instance, **kwargs):
+    # The through rows are gone by post_delete, and cascades send no m2m_changed.
+    instance._blocked_desk_ids = list(instance.desks.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=BlockOutZone)
+def block_zone_removed(sender, instance, **kwargs):
+    refresh_desk_status(getattr(instance, "_blocked_desk_ids", ()))
+
+
+@receiver(m2m_changed, sender=BlockOutZone.desks.through)
+def block_zone_desks_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        if reverse:
+            instance._cleared_desk_ids = [instance.pk]
+        else:
+            instance._cleared_desk_ids = list(instance.desks.values_list("pk", flat=True))
+    elif action == "post_clear":
+        refresh_desk_status(getattr(instance, "_cleared_desk_ids", ()))
+    elif action in {"post_add", "post_remove"}:
+        refresh_desk_status([instance.pk] if reverse else pk_set)
@@ -0,0 +1,75 @@
+"""Materialized desk status.
+
+Kiosks read desk status far more often than anyone changes it, so each desk
+stores its current status, assignee and blocking zone names, together with
+the moment that status next changes on its own (a reservation ending, a
+block-out starting). Writes refresh the desks they touch inside their own
+transaction; reads trust the stored columns until ``status_valid_until`` and
+recompute otherwise. ``reconcile_desk_status`` catches desks whose time-based
+transition has passed.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from django.db import models
+from django.utils import timezone
+
+from .models import Desk
+from .timeline import desk_timelines
+
+# How far ahead a refresh looks for the next transition; a desk with none
+# inside the horizon is rechecked when it runs out.
+STATUS_HORIZON = timedelta(days=1)
+
+STATUS_FIELDS = (
+    "current_status",
+    "current_assignee",
+    "blocking_zone_names",
+    "status_checked_at",
+    "status_valid_until",
+)
+
+
+def refresh_desk_status(desk_ids: Iterable[int] | None = None, now: datetime | None = None) -> int:
+    """Recompute the stored status of ``desk_ids`` (every desk when omitted).
+
+    Costs a fixed four queries however many desks are refreshed.
+    """
+
+    now = now or timezone.now()
+    desks = Desk.objects.only("pk", *STATUS_FIELDS)
+    if desk_ids is not None:
+        desk_ids = {desk_id for desk_id in desk_ids if desk_id is not None}
+        if not desk_ids:
+            return 0
+        desks = desks.filter(pk__in=desk_ids)
+    desks = list(desks)
+    if not desks:
+        return 0
+
+    timelines = desk_timelines(now, now + STATUS_HORIZON, [desk.pk for desk in desks])
+    for desk in desks:
+        current = timelines[desk.pk][0]
+        desk.current_status = current.status
+        desk.current_assignee = current.assignee
+        desk.blocking_zone_names = list(current.zones)
+        desk.status_checked_at = now
+        desk.status_valid_until = current.end
+    # bulk_update skips the Desk signals: the layout has not changed.
+    Desk.objects.bulk_update(desks, STATUS_FIELDS)
+    return len(desks)
+
+
+def reconcile_desk_status(now: datetime | None = None, *, everything: bool = False) -> int:
+    """Refresh desks whose stored status has run out, or every desk with ``everything``."""
+
+    now = now or timezone.now()
+    if everything:
+        return refresh_desk_status(now=now)
+    stale = Desk.objects.filter(
+        models.Q(status_valid_until__isnull=True) | models.Q(status_valid_until__lte=now)
+    ).values_list("pk", flat=True)
+    return refresh_desk_status(list(stale), now)
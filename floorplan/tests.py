@@ -1,16 +1,51 @@
+import csv
+import gzip
 import json
+import os
+import sqlite3
 import tempfile
-from datetime import datetime, time, timedelta
+import threading
+from contextlib import closing
+from datetime import date, datetime, time, timedelta
+from io import StringIO
 from pathlib import Path
+from time import time_ns
+from unittest import mock
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import TestCase, override_settings
+from django.core.cache import cache, caches
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connection, connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
-from .employees import clear_employee_cache, normalize_extension_input
+from .assets import minify_css, minify_js
+from .employees import clear_employee_cache, normalize_extension_input, suggest_employees
+from .grid import FloorGrid, GridDesk, LayoutConflict, floor_grid, unavailable_desk_ids
 from .models import Assignment, BlockOutZone, Department, Desk
-from .views import _desk_payload
+from .queries import QueryCapture, RepeatedQueryError
+from .recurrence import weekday_mask
+from .layout_io import read_layout, write_layout
+from .forms import AssignmentForm
+from .reservations import (
+    ReservationConflict,
+    book_desk,
+    check_in,
+    first_booking,
+    release_expired_reservations,
+    release_no_show_reservations,
+    reserve_desk,
+)
+from .shared_cache import SharedFileCache
+from .routing import PrimaryReplicaRouter, ReplicaRoutingMiddleware, replica_read
+from .status import reconcile_desk_status, refresh_desk_status
+from .timeline import desk_timelines
+from .versions import check_shared_cache, floor_version
+from .views import SESSION_EMPLOYEE_PROFILE_KEY, _desk_payload
 
 
 class EmployeeAuthenticationTests(TestCase):
@@ -62,6 +97,43 @@ class EmployeeAuthenticationTests(TestCase):
         self.assertIn("error", payload)
 
 
+class EmployeeSuggestionTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+        self.csv_path = Path(self.tempdir.name) / "employees.csv"
+        self.csv_path.write_text(
+            "First,Last,Extension\nJohn,Doe,1234\nJane,Dobson,2345\nDora,Smith,3456\n",
+            encoding="utf-8",
+        )
+        self.override = override_settings(EMP_CSV_PATH=str(self.csv_path))
+        self.override.enable()
+        self.addCleanup(self.override.disable)
+        clear_employee_cache()
+        self.addCleanup(clear_employee_cache)
+
+    def test_prefix_matches_last_names_before_first_names(self):
+        response = self.client.get(reverse("floorplan:employee-suggest"), {"q": "Do"})
+
+        self.assertEqual(response.status_code, 200)
+        names = [item["full_name"] for item in response.json()["results"]]
+        self.assertEqual(names, ["Jane Dobson", "John Doe", "Dora Smith"])
+        self.assertNotIn("extension_last4", response.json()["results"][0])
+
+    def test_index_is_rebuilt_when_directory_changes(self):
+        self.assertEqual(suggest_employees("nguyen"), [])
+
+        self.csv_path.write_text(
+            "First,Last,Extension\nTaylor,Nguyen,5562\n", encoding="utf-8"
+        )
+        os.utime(self.csv_path, ns=(time_ns() + 10**9, time_ns() + 10**9))
+
+        self.assertEqual(
+            [record.full_name for record in suggest_employees("nguyen")], ["Taylor Nguyen"]
+        )
+
+
 class DeskPayloadTests(TestCase):
     def setUp(self):
         super().setUp()
@@ -233,3 +305,1789 @@ class AdminConsoleScheduleTests(TestCase):
         active_assignments = response.context["active_assignments"]
         self.assertIn(assignment, active_assignments)
         self.assertEqual(response.context["view_date"], target_date)
+
+    @override_settings(
+        STORAGES={
+            "staticfiles": {
+                "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+            }
+        }
+    )
+    def test_repeat_views_reuse_cached_sections_until_the_floor_changes(self):
+        cache.clear()
+        assignment = Assignment.objects.create(
+            desk=self.desk,
+            assignee_name="Cached Teammate",
+            start=timezone.now() - timedelta(days=1),
+        )
+        url = reverse("floorplan:admin-console")
+        self.assertContains(self.client.get(url), "Cached Teammate")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertContains(response, "Cached Teammate")
+        self.assertFalse(
+            [query for query in queries if "floorplan_" in query["sql"]],
+            "Cached sections should not query floor plan tables.",
+        )
+
+        assignment.delete()
+        self.assertNotContains(self.client.get(url), "Cached Teammate")
+
+
+# Queries each floor-wide endpoint may run, whatever the number of desks.
+QUERY_BUDGETS = {
+    "floorplan:index": 4,
+    "floorplan:floor-snapshot": 3,
+    "floorplan:admin-console": 9,
+    "floorplan:locate-people": 2,
+}
+
+
+@override_settings(
+    QUERY_INSPECTION="raise",
+    QUERY_REPEAT_THRESHOLD=3,
+    STORAGES={
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        }
+    },
+)
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.department = Department.objects.create(name="Operations", color="#123456")
+        user_model = get_user_model()
+        self.staff = user_model.objects.create_user(
+            username="staff", password="pass1234", is_staff=True
+        )
+
+    def _add_desks(self, count):
+        now = timezone.now()
+        start = Desk.objects.count()
+        for offset in range(start, start + count):
+            desk = Desk.objects.create(
+                identifier=f"ops-{offset}",
+                label=f"Ops {offset}",
+                department=self.department,
+                row_index=1 + offset // 30,
+                column_index=1 + offset % 30,
+                left_percentage=0,
+                top_percentage=0,
+                width_percentage=1,
+                height_percentage=1,
+            )
+            Assignment.objects.create(
+                desk=desk, assignee_name=f"Teammate {offset}", start=now - timedelta(hours=1)
+            )
+            zone = BlockOutZone.objects.create(name=f"Zone {offset}", start=now - timedelta(hours=1))
+            zone.desks.add(desk)
+
+    def _query_count(self, url_name, **params):
+        cache.clear()
+        with QueryCapture() as capture:
+            response = self.client.get(reverse(url_name), params)
+        self.assertEqual(response.status_code, 200)
+        return capture.total
+
+    def test_floor_wide_endpoints_stay_within_budget(self):
+        self.client.force_login(self.staff)
+        for url_name, budget in QUERY_BUDGETS.items():
+            with self.subTest(url_name):
+                self._add_desks(4)
+                self.assertLessEqual(self._query_count(url_name, q="team"), budget)
+                self._add_desks(4)
+                self.assertLessEqual(self._query_count(url_name, q="team"), budget)
+
+    def test_repeated_queries_are_grouped_and_reported(self):
+        self._add_desks(3)
+        with QueryCapture() as capture:
+            for desk in Desk.objects.all():
+                desk.active_assignment()
+
+        repeated = capture.repeated(3)
+        self.assertEqual(len(repeated), 1)
+        self.assertEqual(repeated[0].count, 3)
+        self.assertIn("WHERE", repeated[0].sql)
+        with self.assertRaises(RepeatedQueryError):
+            capture.check(3, "desk loop")
+
+
+class SQLiteConnectionTests(TestCase):
+    def test_configured_pragmas_are_applied_to_connections(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite specific configuration.")
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            synchronous = cursor.fetchone()[0]
+            cursor.execute("PRAGMA busy_timeout")
+            busy_timeout = cursor.fetchone()[0]
+        self.assertEqual(synchronous, 1)  # NORMAL
+        self.assertEqual(busy_timeout, 5000)
+
+
+class DeskReservationTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.department = Department.objects.create(name="Claims", color="#336699")
+        self.desks = [
+            Desk.objects.create(
+                identifier=f"claims-{column}",
+                label=f"Claims {column}",
+                department=self.department,
+                row_index=1,
+                column_index=column,
+                left_percentage=0,
+                top_percentage=0,
+                width_percentage=10,
+                height_percentage=10,
+            )
+            for column in (1, 2)
+        ]
+
+    def _login_employee(self, full_name):
+        session = self.client.session
+        session[SESSION_EMPLOYEE_PROFILE_KEY] = {"full_name": full_name}
+        session.save()
+
+    def test_reservation_opens_a_single_claim(self):
+        self._login_employee("Jordan Smith")
+        response = self.client.post(reverse("floorplan:assign-to-desk", args=["claims-1"]))
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(reverse("floorplan:assign-to-desk", args=["claims-2"]))
+        self.assertEqual(response.status_code, 200)
+
+        open_claims = Assignment.objects.filter(assignee_name="Jordan Smith", is_open=True)
+        self.assertEqual([claim.desk for claim in open_claims], [self.desks[1]])
+
+    def test_reservation_response_shows_the_desk_as_taken(self):
+        refresh_desk_status()
+        self._login_employee("Jordan Smith")
+        response = self.client.post(reverse("floorplan:assign-to-desk", args=["claims-1"]))
+
+        desk = response.json()["desk"]
+        self.assertEqual(desk["status"], Desk.STATUS_OCCUPIED)
+        self.assertEqual(desk["assignment"]["assignee"], "Jordan Smith")
+
+    def test_reserved_desk_returns_conflict(self):
+        self._login_employee("Jordan Smith")
+        self.client.post(reverse("floorplan:assign-to-desk", args=["claims-1"]))
+
+        self._login_employee("Taylor Nguyen")
+        response = self.client.post(reverse("floorplan:assign-to-desk", args=["claims-1"]))
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["desk"]["assignment"]["assignee"], "Jordan Smith")
+
+    def test_concurrent_claims_on_one_desk_conflict(self):
+        now = timezone.now()
+        end = now + timedelta(hours=4)
+        reserve_desk(self.desks[0], "Jordan Smith", now, end)
+
+        # A second kiosk that passed the availability check at the same moment.
+        with self.assertRaises(ReservationConflict):
+            reserve_desk(self.desks[0], "Taylor Nguyen", now, end)
+        self.assertEqual(Assignment.objects.filter(desk=self.desks[0]).count(), 1)
+
+    def test_expired_claim_is_released_for_the_next_reservation(self):
+        now = timezone.now()
+        reserve_desk(self.desks[0], "Jordan Smith", now - timedelta(days=1), now - timedelta(hours=1))
+
+        assignment = reserve_desk(self.desks[0], "Taylor Nguyen", now, now + timedelta(hours=4))
+
+        self.assertTrue(assignment.is_open)
+        self.assertEqual(Assignment.objects.filter(is_open=True).count(), 1)
+
+    def test_database_rejects_second_open_claim_for_a_person(self):
+        now = timezone.now()
+        Assignment.objects.create(
+            desk=self.desks[0], assignee_name="Jordan Smith", start=now, is_open=True
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Assignment.objects.create(
+                desk=self.desks[1], assignee_name="jordan smith", start=now, is_open=True
+            )
+
+
+class AdvanceBookingTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        department = Department.objects.create(name="Claims", color="#336699")
+        self.desk = Desk.objects.create(
+            identifier="claims-1",
+            label="Claims 1",
+            department=department,
+            row_index=1,
+            column_index=1,
+            left_percentage=0,
+            top_percentage=0,
+            width_percentage=10,
+            height_percentage=10,
+        )
+        self.tomorrow = timezone.localtime() + timedelta(days=1)
+
+    def _at(self, hour, days=0):
+        return (self.tomorrow + timedelta(days=days)).replace(
+            hour=hour, minute=0, second=0, microsecond=0
+        )
+
+    def _book(self, full_name, start, end):
+        session = self.client.session
+        session[SESSION_EMPLOYEE_PROFILE_KEY] = {"full_name": full_name}
+        session.save()
+        return self.client.post(
+            reverse("floorplan:assign-to-desk", args=["claims-1"]),
+            {"start": start.isoformat(), "end": end.isoformat()},
+        )
+
+    def test_kiosk_books_future_windows_without_overlaps(self):
+        response = self._book("Jordan Smith", self._at(9), self._at(12))
+        self.assertEqual(response.status_code, 200)
+        booking = Assignment.objects.get(assignee_name="Jordan Smith")
+        self.assertFalse(booking.is_open)
+        self.assertIsNone(self.desk.active_assignment())
+
+        self.assertEqual(self._book("Taylor Nguyen", self._at(11), self._at(14)).status_code, 409)
+        self.assertEqual(self._book("Taylor Nguyen", self._at(12), self._at(14)).status_code, 200)
+        too_far = self._book("Taylor Nguyen", self._at(9, days=31), self._at(12, days=31))
+        self.assertEqual(too_far.status_code, 400)
+        self.assertIn("up to 30 days ahead", too_far.json()["error"])
+
+    def test_booking_is_refused_when_a_block_out_starts_inside_it(self):
+        zone = BlockOutZone.objects.create(name="Painting", start=self._at(11), end=self._at(13))
+        zone.desks.add(self.desk)
+
+        self.assertEqual(self._book("Jordan Smith", self._at(9), self._at(12)).status_code, 400)
+        self.assertEqual(self._book("Jordan Smith", self._at(13), self._at(15)).status_code, 200)
+
+    def test_immediate_reservation_stops_short_of_a_later_booking(self):
+        now = timezone.now()
+        later = book_desk(self.desk, "Jordan Smith", now + timedelta(hours=1), now + timedelta(hours=2))
+        session = self.client.session
+        session[SESSION_EMPLOYEE_PROFILE_KEY] = {"full_name": "Taylor Nguyen"}
+        session.save()
+
+        response = self.client.post(
+            reverse("floorplan:assign-to-desk", args=["claims-1"]),
+            {"end": (now + timedelta(hours=4)).isoformat()},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("your reservation ends then", response.json()["notice"])
+        walk_up = Assignment.objects.get(assignee_name="Taylor Nguyen")
+        self.assertEqual(walk_up.end, later.start)
+
+        with self.assertRaises(ReservationConflict):
+            reserve_desk(self.desk, "Pat Lee", later.start, later.end)
+
+    def test_overlap_check_expands_recurring_assignments(self):
+        recurring = Assignment.objects.create(
+            desk=self.desk,
+            assignee_name="Hybrid Teammate",
+            start=self._at(9),
+            end=self._at(17),
+            recurrence_days=weekday_mask([self._at(9).weekday()]),
+        )
+
+        with self.assertNumQueries(1):
+            found = first_booking(self.desk, self._at(16, days=7), self._at(18, days=7))
+        self.assertEqual(found, (self._at(16, days=7), recurring))
+        self.assertEqual(first_booking(self.desk, self._at(8, days=6)), (self._at(9, days=7), recurring))
+        self.assertIsNone(first_booking(self.desk, self._at(17, days=7), self._at(18, days=7)))
+        self.assertIsNone(first_booking(self.desk, self._at(10, days=3), self._at(12, days=3)))
+
+    def test_admin_assignment_keeps_later_bookings(self):
+        later = book_desk(self.desk, "Jordan Smith", self._at(9, days=2), self._at(17, days=2))
+
+        def form(start, end):
+            return AssignmentForm(
+                data={
+                    "assignee_name": "Pat Lee",
+                    "desk": self.desk.pk,
+                    "assignment_type": Assignment.TYPE_DESK,
+                    "start": start.strftime("%Y-%m-%dT%H:%M"),
+                    "end": end.strftime("%Y-%m-%dT%H:%M"),
+                    "duration_choice": "temporary",
+                }
+            )
+
+        overlapping = form(self._at(9), self._at(12, days=2))
+        self.assertFalse(overlapping.is_valid())
+        self.assertIn("Jordan Smith", overlapping.errors["start"][0])
+
+        before = form(self._at(9), self._at(17))
+        self.assertTrue(before.is_valid(), before.errors)
+        before.save()
+        later.refresh_from_db()
+        self.assertEqual(later.end, self._at(17, days=2))
+
+    def test_admin_assignment_leaves_finished_assignments_alone(self):
+        finished = Assignment.objects.create(
+            desk=self.desk,
+            assignee_name="Jordan Smith",
+            start=self._at(9, days=-5),
+            end=self._at(17, days=-5),
+        )
+        form = AssignmentForm(
+            data={
+                "assignee_name": "Pat Lee",
+                "desk": self.desk.pk,
+                "assignment_type": Assignment.TYPE_DESK,
+                "start": self._at(9).strftime("%Y-%m-%dT%H:%M"),
+                "end": self._at(17).strftime("%Y-%m-%dT%H:%M"),
+                "duration_choice": "temporary",
+            }
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+
+        finished.refresh_from_db()
+        self.assertEqual(finished.end, self._at(17, days=-5))
+
+
+class BookingRaceTests(TransactionTestCase):
+    # Needs real transactions: each thread books through its own connection.
+    # The in-memory test database uses shared-cache table locks, which fail at
+    # once instead of waiting, so the kiosks share a file copy of it instead.
+    def _file_database(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = str(Path(directory.name) / "race.sqlite3")
+        with closing(sqlite3.connect(path)) as target:
+            connection.ensure_connection()
+            connection.connection.backup(target)
+        return path
+
+    def test_two_kiosks_cannot_book_the_same_window(self):
+        department = Department.objects.create(name="Claims", color="#336699")
+        desk = Desk.objects.create(
+            identifier="claims-1",
+            label="Claims 1",
+            department=department,
+            row_index=1,
+            column_index=1,
+            left_percentage=0,
+            top_percentage=0,
+            width_percentage=10,
+            height_percentage=10,
+        )
+        start = timezone.now() + timedelta(days=1)
+        path = self._file_database()
+        outcomes = []
+        checked = threading.Barrier(2, timeout=1)
+
+        def slow_first_booking(*args, **kwargs):
+            found = first_booking(*args, **kwargs)
+            # Give the other kiosk every chance to run its check meanwhile;
+            # when the lock makes it wait, the barrier simply times out.
+            try:
+                checked.wait()
+            except threading.BrokenBarrierError:
+                pass
+            return found
+
+        def kiosk(name):
+            kiosk_connection = connections[DEFAULT_DB_ALIAS]
+            kiosk_connection.settings_dict = {**kiosk_connection.settings_dict, "NAME": path}
+            try:
+                book_desk(desk, name, start, start + timedelta(hours=2))
+                outcomes.append("booked")
+            except ReservationConflict:
+                outcomes.append("conflict")
+            except Exception as exc:  # a lost race surfaces as a database error
+                outcomes.append(f"{type(exc).__name__}: {exc}")
+            finally:
+                connection.close()
+
+        with mock.patch("floorplan.reservations.first_booking", slow_first_booking):
+            threads = [
+                threading.Thread(target=kiosk, args=(name,))
+                for name in ("Jordan Smith", "Taylor Nguyen")
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(sorted(outcomes), ["booked", "conflict"])
+        with closing(sqlite3.connect(path)) as kiosk_database:
+            bookings = kiosk_database.execute("SELECT COUNT(*) FROM floorplan_assignment")
+            self.assertEqual(bookings.fetchone(), (1,))
+
+
+class PeopleLocatorTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        department = Department.objects.create(name="Finance", color="#224466")
+        self.desk = Desk.objects.create(
+            identifier="finance-1",
+            label="Finance 1",
+            department=department,
+            row_index=3,
+            column_index=4,
+            left_percentage=0,
+            top_percentage=0,
+            width_percentage=10,
+            height_percentage=10,
+        )
+        now = timezone.now()
+        Assignment.objects.create(
+            desk=self.desk,
+            assignee_name="Jordan Smith",
+            start=now - timedelta(hours=1),
+            end=now + timedelta(hours=4),
+        )
+        Assignment.objects.create(
+            assignment_type=Assignment.TYPE_WFH,
+            assignee_name="Taylor Nguyen",
+            start=now - timedelta(hours=1),
+            is_permanent=True,
+        )
+
+    def _locate(self, query):
+        response = self.client.get(reverse("floorplan:locate-people"), {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def test_locates_by_last_name_prefix(self):
+        results = self._locate("smi")
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["assignee"], "Jordan Smith")
+        self.assertEqual(results[0]["desk_identifier"], "finance-1")
+
+    def test_locates_by_partial_name(self):
+        self.assertEqual([item["assignee"] for item in self._locate("guy")], ["Taylor Nguyen"])
+
+    def test_index_reflects_new_assignments(self):
+        self.assertEqual(self._locate("lovelace"), [])
+
+        Assignment.objects.create(
+            desk=self.desk,
+            assignee_name="Ada Lovelace",
+            start=timezone.now() - timedelta(minutes=1),
+        )
+
+        results = self._locate("lovelace")
+        self.assertEqual(results[0]["desk_identifier"], "finance-1")
+
+
+class OfflineKioskTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        department = Department.objects.create(name="Finance", color="#224466")
+        self.desk = Desk.objects.create(
+            identifier="finance-1",
+            label="Finance 1",
+            department=department,
+            row_index=3,
+            column_index=4,
+            left_percentage=0,
+            top_percentage=0,
+            width_percentage=10,
+            height_percentage=10,
+        )
+
+    @override_settings(
+        STORAGES={
+            "staticfiles": {
+                "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+            }
+        }
+    )
+    def test_service_worker_is_served_from_the_site_root(self):
+        response = self.client.get("/service-worker.js")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/javascript")
+        self.assertEqual(response["Service-Worker-Allowed"], "/")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        body = response.content.decode()
+        self.assertIn('"/static/js/floorplan.js"', body)
+        self.assertIn(reverse("floorplan:floor-snapshot"), body)
+
+    def test_floor_snapshot_reports_current_desk_status(self):
+        snapshot = self.client.get(reverse("floorplan:floor-snapshot")).json()
+        self.assertEqual([desk["status"] for desk in snapshot["desks"]], ["free"])
+
+        Assignment.objects.create(
+            desk=self.desk,
+            assignee_name="Jordan Smith",
+            start=timezone.now() - timedelta(minutes=1),
+        )
+
+        refreshed = self.client.get(reverse("floorplan:floor-snapshot")).json()
+        self.assertEqual(refreshed["desks"][0]["status"], "occupied")
+        self.assertGreater(refreshed["floor_version"], snapshot["floor_version"])
+
+    def test_queued_reservation_is_not_booked_for_someone_else(self):
+        session = self.client.session
+        session[SESSION_EMPLOYEE_PROFILE_KEY] = {"full_name": "Taylor Nguyen"}
+        session.save()
+        url = reverse("floorplan:assign-to-desk", args=["finance-1"])
+
+        response = self.client.post(url, {"assignee_name": "Jordan Smith"})
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Assignment.objects.exists())
+        self.assertEqual(self.client.post(url, {"assignee_name": "taylor nguyen"}).status_code, 200)
+
+
+class NearestFreeDeskTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.claims = Department.objects.create(name="Claims", color="#336699")
+        self.finance = Department.objects.create(name="Finance", color="#993366")
+        self.walkway = Department.objects.create(name="Walkway", color="#FFFFFF")
+        self.origin = self._desk("claims-1", self.claims, 1, 1)
+        self.occupied = self._desk("claims-2", self.claims, 1, 2)
+        self._desk("walkway-1", self.walkway, 1, 3)
+        self.near_finance = self._desk("finance-1", self.finance, 1, 4)
+        self.wide = self._desk("claims-wide", self.claims, 2, 5, column_span=3)
+        now = timezone.now()
+        Assignment.objects.create(
+            desk=self.occupied, assignee_name="Jordan Smith", start=now - timedelta(hours=1)
+        )
+        self.zone = BlockOutZone.objects.create(name="Renovation", start=now - timedelta(hours=1))
+        self.zone.desks.add(self.origin)
+
+    def _desk(self, identifier, department, row, column, column_span=1):
+        return Desk.objects.create(
+            identifier=identifier,
+            label=identifier.title(),
+            department=department,
+            row_index=row,
+            column_index=column,
+            column_span=column_span,
+            left_percentage=0,
+            top_percentage=0,
+            width_percentage=10,
+            height_percentage=10,
+        )
+
+    def test_same_department_is_preferred_over_closer_desks(self):
+        response = self.client.get(reverse("floorplan:desk-nearest-free", args=["claims-1"]))
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(
+            [(item["identifier"], item["distance"]) for item in results],
+            [("claims-wide", 5), ("finance-1", 3)],
+        )
+
+    def test_any_department_orders_by_distance_across_spans(self):
+        response = self.client.get(
+            reverse("floorplan:desk-nearest-free", args=["finance-1"]),
+            {"department": "any"},
+        )
+
+        results = response.json()["results"]
+        self.assertEqual([item["identifier"] for item in results], ["claims-wide"])
+        self.assertEqual(results[0]["distance"], 2)
+
+    def test_blocked_assignment_suggests_nearby_desks(self):
+        Assignment.objects.create(
+            desk=self.origin,
+            assignee_name="Taylor Nguyen",
+            start=timezone.now() - timedelta(hours=1),
+        )
+
+        response = self.client.post(reverse("floorplan:assignment-info"), {"name": "Taylor Nguyen"})
+
+        payload = response.json()
+        self.assertTrue(payload["needs_action"])
+        self.assertEqual(payload["suggested_desks"][0]["identifier"], "claims-wide")
+
+
+class DeskBatchTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.claims = Department.objects.create(name="Claims", color="#336699")
+        self.sales = Department.objects.create(name="Sales", color="#993366")
+        for column in range(1, 7):
+            Desk.objects.create(
+                identifier=f"desk-{column}",
+                label=f"Desk {column}",
+                department=self.claims if column <= 3 else self.sales,
+                row_index=2,
+                column_index=column,
+                left_percentage=0,
+                top_percentage=0,
+                width_percentage=1,
+                height_percentage=1,
+            )
+            Assignment.objects.create(
+                desk=Desk.objects.get(identifier=f"desk-{column}"),
+                assignee_name=f"Teammate {column}",
+                start=timezone.now() - timedelta(hours=1),
+            )
+
+    def _batch(self, **params):
+        return self.client.get(reverse("floorplan:desk-batch"), params)
+
+    def test_identifiers_are_returned_in_request_order(self):
+        response = self._batch(ids="desk-3,missing,desk-1")
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual([desk["identifier"] for desk in payload["desks"]], ["desk-3", "desk-1"])
+        self.assertEqual(payload["desks"][0]["assignment"]["assignee"], "Teammate 3")
+        self.assertEqual(payload["missing"], ["missing"])
+
+    def test_rectangle_and_department_select_desks(self):
+        desks = self._batch(row=2, column=2, column_span=4, department=self.sales.pk).json()["desks"]
+
+        self.assertEqual([desk["identifier"] for desk in desks], ["desk-4", "desk-5"])
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        self._batch(ids="desk-1")
+        with QueryCapture() as small:
+            self._batch(ids="desk-1,desk-2")
+        with QueryCapture() as large:
+            self._batch(ids=",".join(f"desk-{column}" for column in range(1, 7)))
+
+        self.assertEqual(small.total, large.total)
+        self.assertLessEqual(large.total, 3)
+
+    def test_oversized_or_empty_requests_are_rejected(self):
+        too_many = ",".join(f"desk-{index}" for index in range(301))
+        self.assertEqual(self._batch(ids=too_many).status_code, 400)
+        self.assertEqual(self._batch().status_code, 400)
+        self.assertEqual(self._batch(row="x", column=1).status_code, 400)
+        self.assertEqual(self._batch(row=0, column=1).status_code, 400)
+        self.assertEqual(self._batch(row=1, column=31).status_code, 400)
+
+    def test_huge_spans_are_trimmed_to_the_grid(self):
+        response = self._batch(row=1, column=1, row_span=10**9, column_span=10**9)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["desks"]), 6)
+
+
+class FloorGridTests(TestCase):
+    def _grid_desk(self, pk, row, column, row_span=1, column_span=1):
+        return GridDesk(
+            pk=pk,
+            identifier=f"desk-{pk}",
+            label=f"Desk {pk}",
+            row=row,
+            column=column,
+            row_span=row_span,
+            column_span=column_span,
+            department_id=1,
+            department="Claims",
+            is_assignable=True,
+        )
+
+    def test_spanned_cells_resolve_to_their_desk(self):
+        grid = FloorGrid([self._grid_desk(1, 2, 2, row_span=2, column_span=3)])
+
+        self.assertEqual(grid.desk_at(3, 4).pk, 1)
+        self.assertIsNone(grid.desk_at(4, 4))
+        self.assertEqual([desk.pk for desk in grid.overlapping(1, 1, 2, 2)], [1])
+
+    def test_overlapping_only_walks_cells_on_the_grid(self):
+        grid = FloorGrid([self._grid_desk(1, 13, 30)])
+        cells = []
+        grid.select = lambda requested: cells.extend(requested) or []
+
+        grid.overlapping(-(10**9), -(10**9), 2 * 10**9, 2 * 10**9)
+
+        self.assertEqual(len(cells), grid.rows * grid.columns)
+
+    def test_place_rejects_overlaps_but_allows_resizing_in_place(self):
+        grid = FloorGrid([self._grid_desk(1, 1, 1), self._grid_desk(2, 1, 3)])
+
+        grid.place([(1, 1, 1, 1, 2)])
+        with self.assertRaises(LayoutConflict):
+            grid.place([(1, 1, 1, 1, 3)])
+        with self.assertRaises(LayoutConflict):
+            grid.place([(None, 5, 5, 1, 2), (None, 5, 6, 1, 1)])
+        with self.assertRaises(LayoutConflict):
+            grid.place([(None, 13, 30, 1, 2)])
+
+
+class DeskTimelineTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        user_model = get_user_model()
+        self.client.force_login(
+            user_model.objects.create_user(username="admin", password="pass1234", is_staff=True)
+        )
+        department = Department.objects.create(name="Claims", color="#336699")
+        self.desks = [
+            Desk.objects.create(
+                identifier=f"claims-{column}",
+                label=f"Claims {column}",
+                department=department,
+                row_index=1,
+                column_index=column,
+                left_percentage=0,
+                top_percentage=0,
+                width_percentage=10,
+                height_percentage=10,
+            )
+            for column in (1, 2, 3)
+        ]
+
+    def _local(self, value):
+        return timezone.make_aware(datetime.fromisoformat(value), timezone.get_current_timezone())
+
+    def _segments(self, payload, identifier):
+        desk = next(desk for desk in payload["desks"] if desk["identifier"] == identifier)
+        return [
+            (segment["start"][11:16], segment["end"][11:16], segment["status"], segment["label"])
+            for segment in desk["segments"]
+        ]
+
+    def test_day_is_split_into_free_occupied_and_blocked_segments(self):
+        Assignment.objects.create(
+            desk=self.desks[0],
+            assignee_name="Jordan Smith",
+            start=self._local("2030-01-08T09:00"),
+            end=self._local("2030-01-08T12:00"),
+        )
+        Assignment.objects.create(
+            desk=self.desks[0],
+            assignee_name="Taylor Nguyen",
+            start=self._local("2030-01-08T12:00"),
+            end=self._local("2030-01-08T17:00"),
+        )
+        zone = BlockOutZone.objects.create(
+            name="Painting",
+            start=self._local("2030-01-08T15:00"),
+            end=self._local("2030-01-08T18:00"),
+        )
+        zone.desks.add(self.desks[0])
+        Assignment.objects.create(
+            desk=self.desks[1],
+            assignee_name="Hybrid Teammate",
+            start=self._local("2030-01-01T08:00"),
+            end=self._local("2030-01-01T10:00"),
+            recurrence_days=weekday_mask([1]),
+        )
+
+        response = self.client.get(reverse("floorplan:desk-timeline"), {"date": "2030-01-08"})
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(
+            self._segments(payload, "claims-1"),
+            [
+                ("00:00", "09:00", "free", ""),
+                ("09:00", "12:00", "occupied", "Jordan Smith"),
+                ("12:00", "15:00", "occupied", "Taylor Nguyen"),
+                ("15:00", "17:00", "blocked", "Painting"),
+                ("17:00", "18:00", "blocked", "Painting"),
+                ("18:00", "00:00", "free", ""),
+            ],
+        )
+        # The block-out hides Taylor's booking without erasing it.
+        blocked = payload["desks"][0]["segments"][3]
+        self.assertEqual((blocked["assignee"], blocked["zones"]), ("Taylor Nguyen", ["Painting"]))
+        self.assertEqual(
+            self._segments(payload, "claims-2"),
+            [
+                ("00:00", "08:00", "free", ""),
+                ("08:00", "10:00", "occupied", "Hybrid Teammate"),
+                ("10:00", "00:00", "free", ""),
+            ],
+        )
+        self.assertEqual(self._segments(payload, "claims-3"), [("00:00", "00:00", "free", "")])
+
+        # Assignments and block-out zones are read in one query.
+        with self.assertNumQueries(1):
+            desk_timelines(
+                self._local("2030-01-08T00:00"),
+                self._local("2030-01-09T00:00"),
+                [desk.pk for desk in self.desks],
+            )
+
+    def test_week_queries_do_not_grow_with_bookings(self):
+        url = reverse("floorplan:desk-timeline")
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as empty:
+            self.client.get(url, {"date": "2030-01-07", "span": "week"})
+        for day in range(7, 14):
+            for desk in self.desks:
+                Assignment.objects.create(
+                    desk=desk,
+                    assignee_name=f"Person {desk.pk}",
+                    start=self._local(f"2030-01-{day:02d}T09:00"),
+                    end=self._local(f"2030-01-{day:02d}T17:00"),
+                )
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as busy:
+            response = self.client.get(url, {"date": "2030-01-07", "span": "week"})
+
+        self.assertEqual(len(busy), len(empty))
+        self.assertEqual(len(response.json()["desks"][0]["segments"]), 15)
+
+
+class LayoutSpanTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        user_model = get_user_model()
+        self.client.force_login(
+            user_model.objects.create_user(username="layout", password="pass1234", is_staff=True)
+        )
+        self.department = Department.objects.create(name="Claims", color="#336699")
+        self.wide = Desk.objects.create(
+            identifier="claims-wide",
+            label="Claims Wide",
+            department=self.department,
+            row_index=2,
+            column_index=2,
+            row_span=1,
+            column_span=3,
+            left_percentage=0,
+            top_percentage=0,
+            width_percentage=10,
+            height_percentage=10,
+        )
+
+    def _post(self, action, cells, data=None):
+        return self.client.post(
+            reverse("floorplan:layout-update"),
+            data=json.dumps(
+                {
+                    "action": action,
+                    "cells": [{"row": row, "column": column} for row, column in cells],
+                    "data": data or {},
+                }
+            ),
+            content_type="application/json",
+        )
+
+    def test_editing_a_covered_cell_keeps_the_desk_span(self):
+        response = self._post(
+            "assign", [(2, 3)], {"department": self.department.pk, "label": "Renamed"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.wide.refresh_from_db()
+        self.assertEqual((self.wide.label, self.wide.column_span), ("Renamed", 3))
+        self.assertFalse(Desk.objects.filter(row_index=2, column_index=3).exists())
+
+    def test_span_that_overlaps_another_desk_is_rejected(self):
+        response = self._post("assign", [(1, 3)], {"department": self.department.pk, "row_span": 2})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Claims Wide", response.json()["error"])
+        self.assertFalse(Desk.objects.filter(row_index=1, column_index=3).exists())
+
+    def test_clearing_a_covered_cell_removes_the_spanning_desk(self):
+        response = self._post("clear", [(2, 4)])
+
+        self.assertEqual(response.json()["cleared"], [{"row": 2, "column": 2}])
+        self.assertFalse(Desk.objects.filter(pk=self.wide.pk).exists())
+
+
+class BlockOutSelectionTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        user_model = get_user_model()
+        self.client.force_login(
+            user_model.objects.create_user(username="layout", password="pass1234", is_staff=True)
+        )
+        self.claims = Department.objects.create(name="Claims", color="#336699")
+        self.billing = Department.objects.create(name="Billing", color="#993366")
+        for row in range(1, 5):
+            for column in range(1, 7):
+                Desk.objects.create(
+                    identifier=f"desk-{row}-{column}",
+                    label=f"Desk {row}-{column}",
+                    department=self.claims if column <= 3 else self.billing,
+                    row_index=row,
+                    column_index=column,
+                    left_percentage=0,
+                    top_percentage=0,
+                    width_percentage=10,
+                    height_percentage=10,
+                )
+
+    def _block(self, **selection):
+        return self.client.post(
+            reverse("floorplan:layout-update"),
+            data=json.dumps({"action": "block", "data": {"name": "Renovation"}, **selection}),
+            content_type="application/json",
+        )
+
+    def _blocked_identifiers(self):
+        zone = BlockOutZone.objects.get()
+        return set(zone.desks.values_list("identifier", flat=True))
+
+    def test_department_blocks_every_desk_in_it(self):
+        version = floor_version()
+        response = self._block(department=self.billing.pk)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["message"], "Blocked 12 desk(s).")
+        self.assertEqual(
+            self._blocked_identifiers(),
+            set(Desk.objects.filter(department=self.billing).values_list("identifier", flat=True)),
+        )
+        self.assertNotEqual(floor_version(), version)
+
+    def test_rectangle_and_department_intersect(self):
+        response = self._block(
+            rectangle={"row": 2, "column": 2, "row_span": 2, "column_span": 4},
+            department=self.claims.pk,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self._blocked_identifiers(), {"desk-2-2", "desk-2-3", "desk-3-2", "desk-3-3"}
+        )
+
+    def test_block_queries_do_not_grow_with_the_selection(self):
+        floor_grid()
+
+        def queries_for(**selection):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self._block(**selection).status_code, 200)
+            BlockOutZone.objects.all().delete()
+            floor_grid()
+            return len(queries)
+
+        one = queries_for(rectangle={"row": 1, "column": 1})
+        whole_floor = queries_for(rectangle={"row": 1, "column": 1, "row_span": 4, "column_span": 6})
+        self.assertEqual(one, whole_floor)
+
+    def test_invalid_rectangle_is_rejected(self):
+        response = self._block(rectangle={"row": 0, "column": 1})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(BlockOutZone.objects.exists())
+
+
+class LayoutTransferTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.claims = Department.objects.create(name="Claims", color="#336699")
+        self.first = self._desk("claims-1", 1, 1, column_span=2)
+        self.second = self._desk("claims-2", 1, 3)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def _desk(self, identifier, row, column, column_span=1):
+        return Desk.objects.create(
+            identifier=identifier,
+            label=identifier.title(),
+            department=self.claims,
+            row_index=row,
+            column_index=column,
+            column_span=column_span,
+            left_percentage=0,
+            top_percentage=0,
+            width_percentage=10,
+            height_percentage=10,
+        )
+
+    def _write(self, name, records):
+        path = Path(self.directory.name) / name
+        with path.open("w", encoding="utf-8", newline="") as stream:
+            write_layout(stream, "csv" if name.endswith(".csv") else "jsonl", records)
+        return str(path)
+
+    def test_csv_export_round_trips_into_an_empty_floor(self):
+        path = str(Path(self.directory.name) / "floor.csv")
+        call_command("export_layout", output=path, stderr=StringIO())
+        Desk.objects.all().delete()
+
+        call_command("import_layout", path, stdout=StringIO())
+
+        desk = Desk.objects.get(identifier="claims-1")
+        self.assertEqual((desk.row_index, desk.column_index, desk.column_span), (1, 1, 2))
+        self.assertEqual(Desk.objects.count(), 2)
+
+    def test_stdout_export_matches_the_file_export(self):
+        for fmt in ("jsonl", "csv"):
+            output = StringIO()
+            call_command("export_layout", format=fmt, stdout=output)
+            expected = StringIO()
+            write_layout(expected, fmt)
+
+            self.assertEqual(output.getvalue(), expected.getvalue())
+            self.assertNotIn("", output.getvalue().splitlines())
+
+    def test_import_swaps_desks_and_prunes_missing_ones(self):
+        self._desk("claims-3", 2, 1)
+        with StringIO() as buffer:
+            write_layout(buffer)
+            records = [record for _, record in read_layout(StringIO(buffer.getvalue()))]
+        desks = {record.get("identifier"): record for record in records}
+        desks["claims-1"].update(column=3, column_span=1)
+        desks["claims-2"].update(column=1)
+        del desks["claims-3"]
+        path = self._write("floor.jsonl", desks.values())
+
+        call_command("import_layout", path, prune=True, stdout=StringIO())
+
+        self.assertEqual(
+            list(Desk.objects.order_by("column_index").values_list("identifier", "column_index")),
+            [("claims-2", 1), ("claims-1", 3)],
+        )
+
+    def test_overlapping_import_is_rejected_without_changes(self):
+        path = self._write(
+            "floor.jsonl",
+            [
+                {
+                    "record": "desk",
+                    "identifier": "claims-new",
+                    "department": "Claims",
+                    "row": 1,
+                    "column": 2,
+                }
+            ],
+        )
+
+        with self.assertRaisesMessage(CommandError, "already covered by Claims-1"):
+            call_command("import_layout", path, stdout=StringIO())
+        self.assertFalse(Desk.objects.filter(identifier="claims-new").exists())
+
+
+class RecurringAssignmentTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        department = Department.objects.create(name="Claims", color="#336699")
+        self.desk = Desk.objects.create(
+            identifier="claims-1",
+            label="Claims 1",
+            department=department,
+            row_index=1,
+            column_index=1,
+            left_percentage=0,
+            top_percentage=0,
+            width_percentage=10,
+            height_percentage=10,
+        )
+
+    def _local(self, value):
+        return timezone.make_aware(datetime.fromisoformat(value), timezone.get_current_timezone())
+
+    def test_occurrences_follow_weekdays_hours_and_end_date(self):
+        assignment = Assignment.objects.create(
+            desk=self.desk,
+            assignee_name="Hybrid Teammate",
+            start=self._local("2030-01-08T09:00"),
+            end=self._local("2030-01-08T17:00"),
+            recurrence_days=weekday_mask([1, 3]),
+            recurrence_until=date(2030, 1, 31),
+        )
+        thursday = self._local("2030-01-10T10:00")
+        wednesday = self._local("2030-01-09T10:00")
+
+        self.assertTrue(assignment.is_active(thursday))
+        self.assertFalse(assignment.is_active(wednesday))
+        self.assertFalse(assignment.is_active(self._local("2030-01-10T18:00")))
+        self.assertFalse(assignment.is_active(self._local("2030-02-05T10:00")))
+        fortnight = list(
+            assignment.occurrences(self._local("2030-01-07T00:00"), self._local("2030-01-20T23:59"))
+        )
+        self.assertEqual(len(fortnight), 4)
+
+        self.assertEqual(self.desk.active_assignment(thursday), assignment)
+        self.assertIsNone(self.desk.active_assignment(wednesday))
+        prefetched = Desk.objects.prefetch_related("assignments").get(pk=self.desk.pk)
+        self.assertEqual(prefetched.active_assignment(thursday), assignment)
+        self.assertIn(self.desk.pk, unavailable_desk_ids(thursday))
+        self.assertNotIn(self.desk.pk, unavailable_desk_ids(wednesday))
+
+    @override_settings(
+        STORAGES={
+            "staticfiles": {
+                "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+            }
+        }
+    )
+    def test_admin_creates_one_row_shown_only_on_its_days(self):
+        user_model = get_user_model()
+        self.client.force_login(
+            user_model.objects.create_user(username="admin", password="pass1234", is_staff=True)
+        )
+
+        response = self.client.post(
+            reverse("floorplan:layout-update"),
+            data=json.dumps(
+                {
+                    "action": "assignment",
+                    "cells": [{"row": 1, "column": 1}],
+                    "data": {
+                        "assignee_name": "Hybrid Teammate",
+                        "start": "2030-01-08T09:00",
+                        "end": "2030-01-08T17:00",
+                        "recurrence_weekdays": ["1", "3"],
+                    },
+                }
+            ),
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        recurring = Assignment.objects.get(assignee_name="Hybrid Teammate")
+        self.assertEqual(recurring.recurrence_days, weekday_mask([1, 3]))
+        console = reverse("floorplan:admin-console")
+        self.assertContains(self.client.get(console, {"view_date": "2030-01-10"}), "Every Tue, Thu")
+        self.assertNotContains(self.client.get(console, {"view_date": "2030-01-09"}), "Every Tue, Thu")
+
+
+    def test_recurring_assignment_cannot_overlap_an_earlier_booking(self):
+        Assignment.objects.create(
+            desk=self.desk,
+            assignee_name="Pat Lee",
+            start=self._local("2029-12-01T09:00"),
+            is_permanent=True,
+        )
+
+        form = AssignmentForm(
+            data={
+                "assignee_name": "Hybrid Teammate",
+                "desk": self.desk.pk,
+                "assignment_type": Assignment.TYPE_DESK,
+                "start": "2030-01-08T09:00",
+                "end": "2030-01-08T17:00",
+                "duration_choice": "temporary",
+                "recurrence_weekdays": ["1", "3"],
+            }
+        )
+
+        self.assertFalse(form.is_valid())
+        self.assertIn("Pat Lee", form.errors["start"][0])
+
+
+class AssignmentExportTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        user_model = get_user_model()
+        self.client.force_login(
+            user_model.objects.create_user(username="auditor", password="pass1234", is_staff=True)
+        )
+        self.claims = Department.objects.create(name="Claims", color="#336699")
+        self.finance = Department.objects.create(name="Finance", color="#993366")
+        self.claims_desk = self._desk("claims-1", self.claims, 1)
+        self.finance_desk = self._desk("finance-1", self.finance, 2)
+        self.tz = timezone.get_current_timezone()
+        self._assign(self.claims_desk, "Old Claim", datetime(2024, 1, 2, 9), datetime(2024, 1, 2, 17))
+        self._assign(self.claims_desk, "March Claim", datetime(2024, 3, 5, 9), datetime(2024, 3, 5, 17))
+        self._assign(self.finance_desk, "March Finance", datetime(2024, 3, 5, 9), None)
+        Assignment.objects.create(
+            assignment_type=Assignment.TYPE_WFH,
+            assignee_name="March Remote",
+            start=timezone.make_aware(datetime(2024, 3, 6, 9), self.tz),
+            end=timezone.make_aware(datetime(2024, 3, 6, 17), self.tz),
+        )
+
+    def _desk(self, identifier, department, row):
+        return Desk.objects.create(
+            identifier=identifier,
+            label=identifier.title(),
+            department=department,
+            row_index=row,
+            column_index=1,
+            left_percentage=0,
+            top_percentage=0,
+            width_percentage=10,
+            height_percentage=10,
+        )
+
+    def _assign(self, desk, name, start, end):
+        Assignment.objects.create(
+            desk=desk,
+            assignee_name=name,
+            start=timezone.make_aware(start, self.tz),
+            end=timezone.make_aware(end, self.tz) if end else None,
+        )
+
+    def _export(self, **params):
+        response = self.client.get(reverse("floorplan:export-assignments"), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        body = b"".join(response.streaming_content).decode("utf-8")
+        return list(csv.DictReader(StringIO(body)))
+
+    def test_date_range_includes_overlapping_and_open_ended_assignments(self):
+        rows = self._export(start="2024-03-01", end="2024-03-31")
+
+        self.assertEqual(
+            [row["assignee_name"] for row in rows],
+            ["March Claim", "March Finance", "March Remote"],
+        )
+        self.assertEqual(rows[1]["department"], "Finance")
+        self.assertEqual(rows[1]["end"], "")
+        self.assertEqual(rows[1]["recurrence_days"], "")
+
+    def test_recurring_rows_export_their_weekdays_and_last_date(self):
+        Assignment.objects.create(
+            desk=self.claims_desk,
+            assignee_name="Hybrid Claim",
+            start=timezone.make_aware(datetime(2024, 3, 12, 9), self.tz),
+            end=timezone.make_aware(datetime(2024, 3, 12, 17), self.tz),
+            recurrence_days=weekday_mask([1, 3]),
+            recurrence_until=date(2024, 4, 30),
+        )
+
+        row = self._export(start="2024-04-01")[-1]
+
+        self.assertEqual(row["assignee_name"], "Hybrid Claim")
+        self.assertEqual((row["recurrence_days"], row["recurrence_until"]), ("Tue Thu", "2024-04-30"))
+
+    def test_department_and_type_filters(self):
+        rows = self._export(department=self.claims.pk, type="desk")
+
+        self.assertEqual([row["assignee_name"] for row in rows], ["Old Claim", "March Claim"])
+        self.assertEqual(self._export(type="wfh")[0]["assignee_name"], "March Remote")
+
+    def test_invalid_filters_are_rejected(self):
+        response = self.client.get(reverse("floorplan:export-assignments"), {"start": "March"})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class RequestProfilingTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.profiles_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.profiles_dir.cleanup)
+        self.override = override_settings(
+            PROFILES_DIR=self.profiles_dir.name,
+            STORAGES={
+                "staticfiles": {
+                    "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+                }
+            },
+        )
+        self.override.enable()
+        self.addCleanup(self.override.disable)
+        Department.objects.create(name="Operations", color="#123456")
+        user_model = get_user_model()
+        self.staff = user_model.objects.create_user(
+            username="staff", password="pass1234", is_staff=True
+        )
+
+    def _locate(self, **extra):
+        return self.client.get(reverse("floorplan:locate-people"), {"q": "smi"}, **extra)
+
+    def test_unflagged_and_non_staff_requests_are_not_profiled(self):
+        self.assertNotIn("X-Profile-Id", self._locate())
+        self.assertNotIn("X-Profile-Id", self._locate(HTTP_X_PROFILE="1"))
+        self.assertEqual(os.listdir(self.profiles_dir.name), [])
+
+    def test_staff_profile_is_saved_and_downloadable(self):
+        self.client.force_login(self.staff)
+
+        response = self.client.get(reverse("floorplan:locate-people"), {"q": "smi", "profile": "1"})
+
+        stem = response["X-Profile-Id"]
+        self.assertEqual(
+            sorted(os.listdir(self.profiles_dir.name)), [f"{stem}.prof", f"{stem}.txt"]
+        )
+        listing = self.client.get(reverse("floorplan:profile-list"))
+        self.assertContains(listing, stem)
+        report = self.client.get(reverse("floorplan:download-profile", args=[f"{stem}.txt"]))
+        self.assertEqual(report.status_code, 200)
+        body = b"".join(report.streaming_content).decode()
+        self.assertIn("GET /api/people/locate/?q=smi&profile=1", body)
+        self.assertIn("SQL log", body)
+        missing = self.client.get(reverse("floorplan:download-profile", args=["settings.py"]))
+        self.assertEqual(missing.status_code, 404)
+
+
+class DeskStatusTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        department = Department.objects.create(name="Claims", color="#336699")
+        self.desks = [
+            Desk.objects.create(
+                identifier=f"claims-{column}",
+                label=f"Claims {column}",
+                department=department,
+                row_index=1,
+                column_index=column,
+                left_percentage=0,
+                top_percentage=0,
+                width_percentage=10,
+                height_percentage=10,
+            )
+            for column in (1, 2)
+        ]
+
+    def _status(self, desk):
+        desk.refresh_from_db()
+        return desk.current_status, desk.current_assignee, desk.blocking_zone_names
+
+    def test_writes_keep_the_stored_status_current(self):
+        session = self.client.session
+        session[SESSION_EMPLOYEE_PROFILE_KEY] = {"full_name": "Jordan Smith"}
+        session.save()
+        self.client.post(reverse("floorplan:assign-to-desk", args=["claims-1"]))
+        self.assertEqual(self._status(self.desks[0]), ("occupied", "Jordan Smith", []))
+
+        self.client.post(reverse("floorplan:assign-to-desk", args=["claims-2"]))
+        self.assertEqual(self._status(self.desks[0]), ("free", "", []))
+        self.assertEqual(self._status(self.desks[1]), ("occupied", "Jordan Smith", []))
+
+        zone = BlockOutZone.objects.create(name="Painting", start=timezone.now())
+        zone.desks.add(self.desks[1])
+        self.assertEqual(self._status(self.desks[1]), ("blocked", "Jordan Smith", ["Painting"]))
+        zone.delete()
+        self.assertEqual(self._status(self.desks[1]), ("occupied", "Jordan Smith", []))
+
+    def test_payload_trusts_the_stored_status_until_it_runs_out(self):
+        now = timezone.now()
+        Desk.objects.filter(pk=self.desks[0].pk).update(
+            current_status="blocked",
+            blocking_zone_names=["Painting"],
+            status_checked_at=now - timedelta(minutes=1),
+            status_valid_until=now + timedelta(hours=1),
+        )
+        desk = Desk.objects.select_related("department").get(pk=self.desks[0].pk)
+
+        with self.assertNumQueries(0):
+            payload = _desk_payload(desk, now)
+        self.assertEqual((payload["status"], payload["block_zones"]), ("blocked", ["Painting"]))
+        self.assertEqual(_desk_payload(desk, now + timedelta(hours=2))["status"], "free")
+
+        call_command("reconcile_desk_status", "--all", stdout=StringIO())
+        self.assertEqual(self._status(self.desks[0]), ("free", "", []))
+
+    def test_reconcile_refreshes_desks_whose_transition_passed(self):
+        now = timezone.now()
+        Assignment.objects.create(
+            desk=self.desks[0],
+            assignee_name="Jordan Smith",
+            start=now - timedelta(hours=3),
+            end=now - timedelta(hours=1),
+        )
+        refresh_desk_status(now=now - timedelta(hours=2))
+        self.assertEqual(self._status(self.desks[0]), ("occupied", "Jordan Smith", []))
+
+        refreshed = reconcile_desk_status(now)
+
+        self.assertEqual(refreshed, 1)
+        self.assertEqual(self._status(self.desks[0]), ("free", "", []))
+        self.assertEqual(self.desks[0].status_valid_until, now + timedelta(days=1))
+
+
+@override_settings(REPLICA_DATABASE="replica", REPLICA_PIN_SECONDS=10)
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+        self.router = PrimaryReplicaRouter()
+        self.read_from = None
+
+    def _middleware(self):
+        middleware = None
+
+        def get_response(request):
+            # Django calls process_view from inside the middleware chain.
+            middleware.process_view(request, request.view, (), {})
+            self.read_from = self.router.db_for_read(Desk)
+            if request.method == "POST":
+                self.router.db_for_write(Assignment)
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+
+        def handle(request, view):
+            request.view = view
+            return middleware(request)
+
+        return handle
+
+    def test_read_only_views_use_the_replica_until_the_client_writes(self):
+        handle = self._middleware()
+        read_view = replica_read(lambda request: None)
+
+        response = handle(self.factory.get("/"), read_view)
+        self.assertEqual(self.read_from, "replica")
+        self.assertNotIn("primary_pin", response.cookies)
+
+        handle(self.factory.get("/"), lambda request: None)
+        self.assertEqual(self.read_from, "default")
+
+        response = handle(self.factory.post("/"), lambda request: None)
+        self.assertEqual(response.cookies["primary_pin"]["max-age"], 10)
+
+        pinned = self.factory.get("/")
+        pinned.COOKIES["primary_pin"] = "1"
+        handle(pinned, read_view)
+        self.assertEqual(self.read_from, "default")
+
+    def test_floor_grid_built_from_the_replica_is_not_reused_on_the_primary(self):
+        grids = [object(), object()]
+        with mock.patch("floorplan.grid.load_floor_grid", side_effect=grids) as load, mock.patch(
+            "floorplan.grid.router"
+        ) as grid_router, mock.patch.dict("floorplan.grid._cached_grids", clear=True):
+            grid_router.db_for_read.return_value = "replica"
+            self.assertIs(floor_grid(), grids[0])
+            grid_router.db_for_read.return_value = "default"
+            self.assertIs(floor_grid(), grids[1])
+            self.assertIs(floor_grid(), grids[1])
+        self.assertEqual(load.call_count, 2)
+
+    def test_writes_and_migrations_stay_on_the_primary(self):
+        self.assertEqual(self.router.db_for_write(Desk), "default")
+        self.assertEqual(self.router.db_for_read(Desk), "default")
+        self.assertFalse(self.router.allow_migrate("replica", "floorplan"))
+        self.assertIsNone(self.router.allow_migrate("default", "floorplan"))
+
+
+class SyncReplicaTests(TransactionTestCase):
+    # SQLite cannot back up a database while a TestCase transaction holds it.
+    def test_sync_replica_copies_the_primary_file(self):
+        Department.objects.create(name="Claims", color="#336699")
+        with tempfile.TemporaryDirectory() as directory:
+            target = Path(directory) / "replica.sqlite3"
+            call_command("sync_replica", "--target", str(target), stdout=StringIO())
+            with closing(sqlite3.connect(target)) as replica:
+                names = replica.execute("SELECT name FROM floorplan_department").fetchall()
+        self.assertEqual(names, [("Claims",)])
+
+
+class SharedCacheCheckTests(TestCase):
+    def test_process_local_default_cache_is_reported(self):
+        self.assertEqual(check_shared_cache(None), [])
+        local = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        with override_settings(CACHES=local):
+            self.assertEqual([message.id for message in check_shared_cache(None)], ["floorplan.W001"])
+
+    def test_suite_does_not_use_the_servers_cache_directory(self):
+        self.assertIsInstance(caches["default"], SharedFileCache)
+        self.assertNotEqual(Path(caches["default"]._dir), Path(settings.BASE_DIR) / "cache")
+
+
+class SharedCacheTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = SharedFileCache(directory.name, {"KEY_PREFIX": "test"})
+
+    def _run_threads(self, target, count=8):
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_increments_from_concurrent_writers_are_not_lost(self):
+        self.cache.add("version", 0)
+
+        def bump():
+            for _ in range(20):
+                self.cache.incr("version")
+
+        self._run_threads(bump)
+        self.assertEqual(self.cache.get("version"), 160)
+
+    def test_get_or_set_builds_a_missing_value_once(self):
+        builds = []
+
+        def build():
+            builds.append(1)
+            threading.Event().wait(0.05)
+            return "payload"
+
+        results = []
+        self._run_threads(lambda: results.append(self.cache.get_or_set("floor", build)))
+        self.assertEqual(builds, [1])
+        self.assertEqual(results, ["payload"] * 8)
+
+    def test_floor_payloads_are_cached_per_floor_version(self):
+        cache.clear()
+        department = Department.objects.create(name="Claims", color="#336699")
+        desk = Desk.objects.create(
+            identifier="claims-1",
+            label="Claims 1",
+            department=department,
+            row_index=1,
+            column_index=1,
+            left_percentage=0,
+            top_percentage=0,
+            width_percentage=10,
+            height_percentage=10,
+        )
+        url = reverse("floorplan:floor-snapshot")
+        self.assertEqual(self.client.get(url).json()["desks"][0]["status"], "free")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertEqual(len(queries), 0)
+
+        Assignment.objects.create(desk=desk, assignee_name="Jordan Smith", start=timezone.now())
+        self.assertEqual(self.client.get(url).json()["desks"][0]["status"], "occupied")
+
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        department = Department.objects.create(name="Claims", color="#336699")
+        for column in (1, 2, 3):
+            Desk.objects.create(
+                identifier=f"claims-{column}",
+                label=f"Claims {column}",
+                department=department,
+                row_index=1,
+                column_index=column,
+                left_percentage=0,
+                top_percentage=0,
+                width_percentage=10,
+                height_percentage=10,
+            )
+
+    def test_floor_snapshot_serves_cached_compressed_bytes(self):
+        url = reverse("floorplan:floor-snapshot")
+        first = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(second["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", second["Vary"])
+        self.assertEqual(second.content, first.content)
+        snapshot = json.loads(gzip.decompress(second.content))
+        self.assertEqual(len(snapshot["desks"]), 3)
+
+        plain = self.client.get(url)
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertEqual(plain.json(), snapshot)
+
+    def test_desk_detail_is_compressed_only_when_accepted(self):
+        url = reverse("floorplan:desk-detail", args=["claims-1"])
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(int(response["Content-Length"]), len(response.content))
+        self.assertEqual(json.loads(gzip.decompress(response.content))["identifier"], "claims-1")
+
+        refused = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip;q=0, identity")
+        self.assertFalse(refused.has_header("Content-Encoding"))
+        self.assertEqual(refused.json()["identifier"], "claims-1")
+
+    @override_settings(
+        STORAGES={
+            "staticfiles": {
+                "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+            }
+        }
+    )
+    def test_floor_plan_page_is_gzipped(self):
+        response = self.client.get(reverse("floorplan:index"), HTTP_ACCEPT_ENCODING="br, gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn(b"claims-1", gzip.decompress(response.content))
+
+
+class ReleaseAssignmentsTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        department = Department.objects.create(name="Claims", color="#336699")
+        self.desks = [
+            Desk.objects.create(
+                identifier=f"claims-{column}",
+                label=f"Claims {column}",
+                department=department,
+                row_index=1,
+                column_index=column,
+                left_percentage=0,
+                top_percentage=0,
+                width_percentage=10,
+                height_percentage=10,
+            )
+            for column in (1, 2, 3)
+        ]
+        self.now = timezone.now()
+
+    def _reservation(self, desk, name, start, end, checked_in_at=None):
+        return Assignment.objects.create(
+            desk=desk,
+            assignee_name=name,
+            start=start,
+            end=end,
+            is_open=True,
+            checked_in_at=checked_in_at,
+        )
+
+    def test_expired_reservations_are_closed(self):
+        expired = self._reservation(
+            self.desks[0],
+            "Jordan Smith",
+            self.now - timedelta(hours=10),
+            self.now - timedelta(hours=1),
+            checked_in_at=self.now - timedelta(hours=10),
+        )
+
+        call_command("release_assignments", stdout=StringIO())
+
+        expired.refresh_from_db()
+        self.assertFalse(expired.is_open)
+        self.assertEqual(expired.end, self.now - timedelta(hours=1))
+
+    def test_open_reservations_without_an_end_are_closed_after_their_day(self):
+        today = timezone.localtime(self.now).replace(hour=9, minute=0, second=0, microsecond=0)
+        stale = self._reservation(
+            self.desks[0], "Jordan Smith", today - timedelta(days=3), None, checked_in_at=today
+        )
+        running = self._reservation(
+            self.desks[1], "Avery Lee", today, None, checked_in_at=today
+        )
+
+        released = release_expired_reservations(today + timedelta(hours=1))
+
+        self.assertEqual(released, 1)
+        stale.refresh_from_db()
+        running.refresh_from_db()
+        self.assertFalse(stale.is_open)
+        self.assertEqual(
+            timezone.localtime(stale.end),
+            (today - timedelta(days=3)).replace(hour=23, minute=59),
+        )
+        self.assertTrue(running.is_open)
+        self.assertIsNone(running.end)
+
+    def test_no_shows_are_released_only_with_a_grace_period(self):
+        start = self.now - timedelta(minutes=30)
+        end = self.now + timedelta(hours=6)
+        no_show = self._reservation(self.desks[0], "Jordan Smith", start, end)
+        present = self._reservation(self.desks[1], "Avery Lee", start, end, checked_in_at=start)
+        recent = self._reservation(
+            self.desks[2], "Taylor Nguyen", self.now - timedelta(minutes=5), end
+        )
+
+        call_command("release_assignments", stdout=StringIO())
+        no_show.refresh_from_db()
+        self.assertTrue(no_show.is_open)
+
+        call_command("release_assignments", no_show_grace=15, stdout=StringIO())
+
+        for assignment in (no_show, present, recent):
+            assignment.refresh_from_db()
+        self.assertFalse(no_show.is_open)
+        self.assertLessEqual(no_show.end, timezone.now())
+        self.assertIsNone(self.desks[0].active_assignment())
+        self.assertTrue(present.is_open)
+        self.assertTrue(recent.is_open)
+
+    def test_kiosk_bookings_nobody_checks_in_to_are_released(self):
+        start = self.now + timedelta(hours=1)
+        for name, identifier in (
+            ("Jordan Smith", "claims-1"),
+            ("Taylor Nguyen", "claims-2"),
+            ("Avery Lee", "claims-3"),
+        ):
+            session = self.client.session
+            session[SESSION_EMPLOYEE_PROFILE_KEY] = {"full_name": name}
+            session.save()
+            data = {"start": start.isoformat(), "end": (start + timedelta(hours=4)).isoformat()}
+            if name == "Avery Lee":
+                data = {}  # a walk-up reservation, made at the desk's kiosk
+            response = self.client.post(
+                reverse("floorplan:assign-to-desk", args=[identifier]), data
+            )
+            self.assertEqual(response.status_code, 200)
+
+        check_in("Taylor Nguyen", start + timedelta(minutes=5))
+        released = release_no_show_reservations(timedelta(minutes=15), start + timedelta(minutes=20))
+
+        self.assertEqual(released, 1)
+        no_show = Assignment.objects.get(assignee_name="Jordan Smith")
+        self.assertEqual(no_show.end, start + timedelta(minutes=20))
+        self.assertEqual(
+            Assignment.objects.get(assignee_name="Taylor Nguyen").end, start + timedelta(hours=4)
+        )
+        self.assertTrue(Assignment.objects.get(assignee_name="Avery Lee").is_open)
+
+
+@override_settings(
+    STORAGES={
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        }
+    }
+)
+class KioskSimulationTests(TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        csv_path = Path(tempdir.name) / "employees.csv"
+        csv_path.write_text(
+            "First,Last,Extension\nJohn,Doe,417-234-1234\nMiles,Howell,69-2853\n",
+            encoding="utf-8",
+        )
+        override = override_settings(EMP_CSV_PATH=str(csv_path))
+        override.enable()
+        self.addCleanup(override.disable)
+        clear_employee_cache()
+        self.addCleanup(clear_employee_cache)
+        department = Department.objects.create(name="Claims", color="#336699")
+        Desk.objects.create(
+            identifier="claims-1",
+            label="Claims 1",
+            department=department,
+            row_index=1,
+            column_index=1,
+            left_percentage=0,
+            top_percentage=0,
+            width_percentage=10,
+            height_percentage=10,
+        )
+
+    def test_journeys_report_reservations_and_conflicts(self):
+        output = StringIO()
+        call_command(
+            "simulate_kiosks",
+            kiosks=1,
+            think_time=0,
+            interface="wsgi",
+            seed=3,
+            stdout=output,
+        )
+
+        report = output.getvalue()
+        self.assertIn("wsgi: 1 kiosk(s), 2 employee(s)", report)
+        self.assertIn("error rate 0.0%, conflict rate 50.0% (1 booked, 1 conflicts)", report)
+        self.assertFalse(Assignment.objects.exists())
+
+    def test_remote_runs_need_explicit_permission_to_write(self):
+        with self.assertRaisesMessage(CommandError, "--i-understand-this-writes"):
+            call_command("simulate_kiosks", url="http://127.0.0.1:9", stdout=StringIO())
+
+
+class AssetMinifierTests(TestCase):
+    def test_javascript_literals_survive_and_comments_are_removed(self):
+        source = (
+            "// header\n"
+            "const pattern = /\\/0\\//; /* block */\n"
+            "const text = \"a // not a comment\";\n"
+            "const html = `\n  <div>${ items.map((item) => `${item}`).join(\" \") }</div>\n`;\n"
+            "let total = a - -b;\n"
+        )
+
+        minified = minify_js(source)
+
+        self.assertNotIn("header", minified)
+        self.assertNotIn("block", minified)
+        self.assertIn("/\\/0\\//", minified)
+        self.assertIn('"a // not a comment"', minified)
+        self.assertIn('`\n  <div>${ items.map((item) => `${item}`).join(" ") }</div>\n`', minified)
+        self.assertIn("a- -b", minified)
+
+    def test_javascript_line_breaks_that_end_statements_are_kept(self):
+        minified = minify_js("function f() {\n  return\n  value;\n}\ncount++\nnext()\n")
+
+        self.assertIn("return\nvalue", minified)
+        self.assertIn("count++\nnext()", minified)
+
+    def test_css_whitespace_and_comments_are_collapsed(self):
+        minified = minify_css("/* note */\n.a ,\n.b {\n  color: red;\n  content: \"a  b\";\n}\n")
+
+        self.assertEqual(minified, '.a,.b{color: red;content: "a  b"}\n')
@@ -0,0 +1,231 @@
+"""Per-desk schedules over a day or a week.
+
+Each desk's time is split into ``free``, ``occupied`` and ``blocked``
+segments. The assignments and block-out zones overlapping the window are
+read together in one query, turned into start and end events, sorted, and
+swept in a single pass, so the cost grows with the number of bookings
+rather than the number of desks times the number of instants checked.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Iterable, Iterator
+
+from django.db import models
+from django.utils import timezone
+
+from .models import Assignment, BlockOutZone, Desk
+
+STATUS_FREE = Desk.STATUS_FREE
+STATUS_OCCUPIED = Desk.STATUS_OCCUPIED
+STATUS_BLOCKED = Desk.STATUS_BLOCKED
+
+_KIND_ASSIGNMENT = 0
+_KIND_BLOCK = 1
+
+
+@dataclass(frozen=True)
+class TimelineSegment:
+    start: datetime
+    end: datetime
+    status: str
+    # The assignee shown on the desk, even under a block-out, and the names of
+    # the block-out zones covering it.
+    assignee: str = ""
+    zones: tuple[str, ...] = ()
+
+    @property
+    def label(self) -> str:
+        """The zone names of a blocked segment, or the assignee of an occupied one."""
+
+        if self.status == STATUS_BLOCKED:
+            return ", ".join(self.zones)
+        return self.assignee
+
+
+@dataclass(frozen=True)
+class _Interval:
+    desk_id: int
+    start: datetime
+    end: datetime
+    kind: int
+    key: tuple
+    label: str
+
+
+def _assignment_rows(window_start: datetime, window_end: datetime) -> models.QuerySet:
+    last_recurring_day = timezone.localtime(window_start).date() - timedelta(days=1)
+    return (
+        Assignment.objects.filter(
+            assignment_type=Assignment.TYPE_DESK,
+            desk__isnull=False,
+            start__lt=window_end,
+        )
+        .filter(
+            models.Q(recurrence_days=0)
+            & (
+                models.Q(is_permanent=True)
+                | models.Q(end__isnull=True)
+                | models.Q(end__gt=window_start)
+            )
+            | models.Q(recurrence_days__gt=0)
+            & (
+                models.Q(recurrence_until__isnull=True)
+                | models.Q(recurrence_until__gte=last_recurring_day)
+            )
+        )
+        .values(
+            row_kind=models.Value(_KIND_ASSIGNMENT),
+            row_desk=models.F("desk_id"),
+            row_pk=models.F("pk"),
+            row_label=models.F("assignee_name"),
+            row_start=models.F("start"),
+            row_end=models.F("end"),
+            row_permanent=models.F("is_permanent"),
+            row_created=models.F("created_at"),
+            row_days=models.F("recurrence_days"),
+            row_until=models.F("recurrence_until"),
+        )
+    )
+
+
+def _block_rows(window_start: datetime, window_end: datetime) -> models.QuerySet:
+    # Shaped like _assignment_rows, column for column, so the two can be combined.
+    return (
+        BlockOutZone.desks.through.objects.filter(blockoutzone__start__lt=window_end)
+        .filter(
+            models.Q(blockoutzone__is_permanent=True)
+            | models.Q(blockoutzone__end__isnull=True)
+            | models.Q(blockoutzone__end__gt=window_start)
+        )
+        .values(
+            row_kind=models.Value(_KIND_BLOCK),
+            row_desk=models.F("desk_id"),
+            row_pk=models.F("blockoutzone_id"),
+            row_label=models.F("blockoutzone__name"),
+            row_start=models.F("blockoutzone__start"),
+            row_end=models.F("blockoutzone__end"),
+            row_permanent=models.F("blockoutzone__is_permanent"),
+            row_created=models.F("blockoutzone__start"),
+            row_days=models.Value(0),
+            row_until=models.Value(None, output_field=models.DateField()),
+        )
+    )
+
+
+def _intervals(
+    window_start: datetime, window_end: datetime, desk_ids: list[int] | None
+) -> Iterator[_Interval]:
+    """Clip the assignments and block-out zones overlapping the window, read in one query."""
+
+    assignments = _assignment_rows(window_start, window_end)
+    blocks = _block_rows(window_start, window_end)
+    if desk_ids is not None:
+        assignments = assignments.filter(desk_id__in=desk_ids)
+        blocks = blocks.filter(desk_id__in=desk_ids)
+    # Compound statements cannot order their parts; the sweep sorts the events.
+    for row in assignments.order_by().union(blocks.order_by(), all=True):
+        desk_id, pk, label = row["row_desk"], row["row_pk"], row["row_label"]
+        if row["row_kind"] == _KIND_BLOCK:
+            start = max(row["row_start"], window_start)
+            end = row["row_end"]
+            end = window_end if row["row_permanent"] or end is None else min(end, window_end)
+            if end > start:
+                yield _Interval(desk_id, start, end, _KIND_BLOCK, (start, pk), label)
+            continue
+        assignment = Assignment(
+            pk=pk,
+            desk_id=desk_id,
+            assignee_name=label,
+            start=row["row_start"],
+            end=row["row_end"],
+            is_permanent=row["row_permanent"],
+            recurrence_days=row["row_days"],
+            recurrence_until=row["row_until"],
+        )
+        key = (assignment.start, row["row_created"], pk)
+        for start, end in assignment.occurrences(window_start, window_end):
+            start = max(start, window_start)
+            end = window_end if end is None else min(end, window_end)
+            if end > start:
+                yield _Interval(desk_id, start, end, _KIND_ASSIGNMENT, key, label)
+
+
+def _state(active: dict[int, dict[_Interval, int]]) -> tuple[str, str, tuple[str, ...]]:
+    # A block-out wins over an assignment, as it does on the floor plan; the
+    # most recently started assignment is the one shown.
+    zones = tuple(
+        interval.label for interval in sorted(active[_KIND_BLOCK], key=lambda item: item.key)
+    )
+    assignee = ""
+    if active[_KIND_ASSIGNMENT]:
+        assignee = max(active[_KIND_ASSIGNMENT], key=lambda item: item.key).label
+    if zones:
+        return STATUS_BLOCKED, assignee, zones
+    if assignee:
+        return STATUS_OCCUPIED, assignee, zones
+    return STATUS_FREE, "", zones
+
+
+def _append(segments: list[TimelineSegment], start: datetime, end: datetime, state) -> None:
+    if segments and (segments[-1].status, segments[-1].assignee, segments[-1].zones) == state:
+        segments[-1] = TimelineSegment(segments[-1].start, end, *state)
+    else:
+        segments.append(TimelineSegment(start, end, *state))
+
+
+def _sweep(
+    events: Iterable[tuple[datetime, int, _Interval]],
+    window_start: datetime,
+    window_end: datetime,
+) -> list[TimelineSegment]:
+    segments: list[TimelineSegment] = []
+    active: dict[int, dict[_Interval, int]] = {_KIND_ASSIGNMENT: {}, _KIND_BLOCK: {}}
+    cursor = window_start
+    for at, group in groupby(events, key=lambda event: event[0]):
+        if at > cursor:
+            _append(segments, cursor, at, _state(active))
+            cursor = at
+        for _, delta, interval in group:
+            bucket = active[interval.kind]
+            count = bucket.get(interval, 0) + delta
+            if count:
+                bucket[interval] = count
+            else:
+                bucket.pop(interval, None)
+    if window_end > cursor:
+        _append(segments, cursor, window_end, _state(active))
+    return segments
+
+
+def desk_timelines(
+    window_start: datetime, window_end: datetime, desk_ids: list[int] | None = None
+) -> dict[int, list[TimelineSegment]]:
+    """Map each desk pk to segments covering ``[window_start, window_end)`` end to end.
+
+    Desks in ``desk_ids`` with nothing booked get one free segment; without
+    ``desk_ids`` only desks with bookings in the window are returned.
+    """
+
+    events: list[tuple[int, datetime, int, _Interval]] = []
+    for interval in _intervals(window_start, window_end, desk_ids):
+        events.append((interval.desk_id, interval.start, 1, interval))
+        events.append((interval.desk_id, interval.end, -1, interval))
+    # Ends sort before starts at the same instant, so back-to-back bookings
+    # do not register as overlapping.
+    events.sort(key=lambda event: (event[0], event[1], event[2]))
+
+    timelines = {
+        desk_id: [TimelineSegment(window_start, window_end, STATUS_FREE)]
+        for desk_id in desk_ids or ()
+    }
+    for desk_id, desk_events in groupby(events, key=lambda event: event[0]):
+        timelines[desk_id] = _sweep(
+            ((at, delta, interval) for _, at, delta, interval in desk_events),
+            window_start,
+            window_end,
+        )
+    return timelines
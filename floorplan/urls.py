@@ -9,9 +9,23 @@ app_name = "floorplan"
 
 urlpatterns = [
     path("", views.index, name="index"),
+    path("service-worker.js", views.service_worker, name="service-worker"),
+    path("api/floor/", views.floor_snapshot, name="floor-snapshot"),
     path("api/assignment-info/", views.assignment_info, name="assignment-info"),
     path("api/employee-auth/", views.authenticate_employee, name="employee-auth"),
+    path(
+        "api/employees/suggest/",
+        views.employee_suggestions,
+        name="employee-suggest",
+    ),
+    path("api/people/locate/", views.locate_people, name="locate-people"),
+    path("api/desks/batch/", views.desk_batch, name="desk-batch"),
     path("api/desks/<slug:identifier>/", views.desk_detail, name="desk-detail"),
+    path(
+        "api/desks/<slug:identifier>/nearest-free/",
+        views.desk_nearest_free,
+        name="desk-nearest-free",
+    ),
     path(
         "api/desks/<slug:identifier>/assign/",
         views.assign_to_desk,
@@ -19,6 +33,18 @@ urlpatterns = [
     ),
     path("api/layout/update/", views.update_layout, name="layout-update"),
     path("admin-console/", views.admin_console, name="admin-console"),
+    path(
+        "admin-console/assignments/export/",
+        views.export_assignments,
+        name="export-assignments",
+    ),
+    path("admin-console/timeline/", views.desk_timeline, name="desk-timeline"),
+    path("admin-console/profiles/", views.profile_list, name="profile-list"),
+    path(
+        "admin-console/profiles/<str:name>/",
+        views.download_profile,
+        name="download-profile",
+    ),
     path(
         "admin-console/block-zone/<int:pk>/update/",
         views.update_block_zone,
@@ -0,0 +1,81 @@
+"""Floor and layout version counters.
+
+Every cached floor structure is keyed by one of these counters, so they must
+live in a cache all worker processes share (see ``settings.CACHES``). With a
+process-local backend each worker bumps only its own counter and the others
+keep serving what they cached before an edit; ``check_shared_cache`` warns
+about that at startup.
+"""
+
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+
+# Backends whose entries are visible only to the process that wrote them.
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+FLOOR_VERSION_KEY = "floorplan:floor-version"
+LAYOUT_VERSION_KEY = "floorplan:layout-version"
+
+
+def _fresh_version() -> int:
+    # Seeded from the clock so a counter lost to cache eviction never repeats
+    # a version an older cached entry was stored under.
+    return time.time_ns()
+
+
+def _current_version(key: str) -> int:
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _fresh_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _fresh_version(), timeout=None)
+
+
+def floor_version() -> int:
+    """Return the counter that changes whenever desks, assignments or block zones change."""
+
+    return _current_version(FLOOR_VERSION_KEY)
+
+
+def bump_floor_version() -> None:
+    _bump_version(FLOOR_VERSION_KEY)
+
+
+def layout_version() -> int:
+    """Return the counter that changes only when desks or departments change."""
+
+    return _current_version(LAYOUT_VERSION_KEY)
+
+
+def bump_layout_version() -> None:
+    _bump_version(LAYOUT_VERSION_KEY)
+
+
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        checks.Warning(
+            "The default cache is local to each process, so floor and layout version "
+            "changes made in one worker are not seen by the others.",
+            hint="Configure a cache shared between processes, such as "
+            "floorplan.shared_cache.SharedFileCache.",
+            id="floorplan.W001",
+        )
+    ]
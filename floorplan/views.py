@@ -1,25 +1,75 @@
 from __future__ import annotations
 
+import hashlib
 import json
 from datetime import datetime, time, timedelta
+from functools import partial
 
 from django.contrib import messages
-from django.db import models, transaction
-from django.http import JsonResponse, QueryDict
+from django.core.cache import cache
+from django.db import router, transaction
+from django.http import FileResponse, Http404, JsonResponse, QueryDict, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.templatetags.static import static
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.views.decorators.http import require_GET, require_POST
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 
-from .employees import match_employee, normalize_extension_input
-from .forms import AssignmentForm, BlockOutZoneForm
-from .layout import GRID_COLUMNS, GRID_ROWS, cell_identifier, grid_to_percentages
+from .compression import EncodedBody
+from .employees import match_employee, normalize_extension_input, suggest_employees
+from .exports import assignment_history, iter_assignment_csv
+from .forms import AssignmentForm, DeskSetBlockOutForm
+from .grid import FloorGrid, GridDesk, LayoutConflict, floor_grid, nearest_free_desks
+from .layout import (
+    GRID_COLUMNS,
+    GRID_ROWS,
+    NON_ASSIGNABLE_DEPARTMENTS,
+    cell_identifier,
+    grid_to_percentages,
+    is_assignable,
+    is_kiosk,
+)
+from .locator import people_locator
 from .models import Assignment, BlockOutZone, Department, Desk
+from .profiling import profile_file, saved_profiles
+from .recurrence import WEEKDAY_CHOICES
+from .reservations import (
+    ADVANCE_BOOKING_DAYS,
+    ReservationConflict,
+    book_desk,
+    check_in,
+    reserve_desk,
+    walk_up_end,
+)
+from .routing import replica_read
+from .timeline import desk_timelines
+from .versions import floor_version
 
 
 SESSION_EMPLOYEE_PROFILE_KEY = "floorplan_employee_profile"
+EMPLOYEE_SUGGESTION_LIMIT = 8
+MAX_EMPLOYEE_SUGGESTIONS = 20
+PEOPLE_LOCATE_LIMIT = 10
+NEAREST_FREE_DESK_LIMIT = 3
+MAX_NEAREST_FREE_DESKS = 20
+MAX_DESK_BATCH = 300
+ADMIN_CONSOLE_CACHE_TIMEOUT = 60 * 60
+# Longest a cached set of floor desk payloads is served for desks whose next
+# status change is unknown.
+FLOOR_PAYLOAD_CACHE_TIMEOUT = 60
+# Days covered by each timeline span.
+TIMELINE_SPANS = {"day": 1, "week": 7}
+# Static bundles the kiosk service worker keeps so the floor plan renders offline.
+SERVICE_WORKER_PRECACHE = (
+    "css/styles.css",
+    "js/csrf.js",
+    "js/lazy.js",
+    "js/floorplan.js",
+    "js/chunks/people_locator.js",
+)
 
 
 def _localized_datetime(value):
@@ -79,23 +129,26 @@ def _serialize_assignment(assignment: Assignment, now=None) -> dict | None:
 
 
 def _is_kiosk_desk(desk: Desk) -> bool:
-    identifier = (desk.identifier or "").strip().casefold()
-    label = (desk.label or "").strip().casefold()
-    notes = (desk.notes or "").strip().casefold()
-    return "kiosk" in identifier or "kiosk" in label or "kiosk" in notes
+    return is_kiosk(desk.identifier, desk.label, desk.notes)
 
 
 def _desk_payload(desk: Desk, now=None) -> dict:
     now = now or timezone.now()
-    active_assignment = desk.active_assignment(now)
-    block_zones = [zone for zone in desk.block_zones.all() if zone.is_active(now)]
-    status = "free"
-    if active_assignment:
-        status = "occupied"
-    if block_zones:
-        status = "blocked"
-    is_kiosk = _is_kiosk_desk(desk)
-    is_assignable = is_kiosk or desk.department.name not in {"Utility/Resource", "Walkway"}
+    if desk.has_current_status(now):
+        # The stored status spares free desks the assignment and zone lookups.
+        status = desk.current_status
+        block_zone_names = desk.blocking_zone_names
+        active_assignment = desk.active_assignment(now) if desk.current_assignee else None
+    else:
+        active_assignment = desk.active_assignment(now)
+        block_zone_names = [zone.name for zone in desk.block_zones.all() if zone.is_active(now)]
+        status = Desk.STATUS_FREE
+        if active_assignment:
+            status = Desk.STATUS_OCCUPIED
+        if block_zone_names:
+            status = Desk.STATUS_BLOCKED
+    kiosk = _is_kiosk_desk(desk)
+    assignable = is_assignable(desk.department.name, kiosk)
     left, top, width, height = grid_to_percentages(
         desk.row_index,
         desk.column_index,
@@ -109,8 +162,8 @@ def _desk_payload(desk: Desk, now=None) -> dict:
         "department_color": desk.department.color,
         "fill_color": desk.fill_color or desk.department.color,
         "notes": desk.notes,
-        "is_assignable": is_assignable,
-        "is_kiosk": is_kiosk,
+        "is_assignable": assignable,
+        "is_kiosk": kiosk,
         "row": desk.row_index,
         "column": desk.column_index,
         "row_span": desk.row_span,
@@ -122,13 +175,98 @@ def _desk_payload(desk: Desk, now=None) -> dict:
             "height": f"{height}%",
         },
         "status": status,
-        "is_blocked": bool(block_zones),
-        "block_zones": [zone.name for zone in block_zones],
+        "is_blocked": bool(block_zone_names),
+        "block_zones": block_zone_names,
         "assignment": _serialize_assignment(active_assignment, now),
         "department_id": desk.department_id,
     }
 
 
+def _nearest_free_payload(
+    grid: FloorGrid,
+    origin: GridDesk,
+    now,
+    limit: int = NEAREST_FREE_DESK_LIMIT,
+    preferred_department_id: int | None = None,
+) -> list[dict]:
+    return [
+        {
+            "identifier": desk.identifier,
+            "label": desk.label,
+            "department": desk.department,
+            "row": desk.row,
+            "column": desk.column,
+            "distance": distance,
+        }
+        for desk, distance in nearest_free_desks(
+            grid, origin, now, limit, preferred_department_id
+        )
+    ]
+
+
+def _scheduled_block_zones(evaluation_time) -> tuple[list[BlockOutZone], list[dict]]:
+    """Return zones active at or starting after ``evaluation_time``, with their editor payloads."""
+
+    scheduled_blocks: list[BlockOutZone] = []
+    block_zone_payload: list[dict] = []
+    for zone in BlockOutZone.objects.prefetch_related("desks").order_by("start", "name"):
+        is_active = zone.is_active(evaluation_time)
+        starts_in_future = bool(zone.start and zone.start > evaluation_time)
+        if not is_active and not starts_in_future:
+            continue
+        setattr(zone, "admin_is_active", is_active)
+        scheduled_blocks.append(zone)
+        block_zone_payload.append(
+            {
+                "id": zone.pk,
+                "name": zone.name,
+                "desk_count": len(zone.desks.all()),
+                "is_permanent": zone.is_permanent,
+                "duration_choice": "permanent" if zone.is_permanent else "temporary",
+                "reason": zone.reason or "",
+                "created_by": zone.created_by or "",
+                "start": _datetime_input_value(zone.start),
+                "end": "" if zone.is_permanent else _datetime_input_value(zone.end),
+                "start_display": _datetime_display_value(zone.start),
+                "end_display": _datetime_display_value(zone.end),
+                "is_active": is_active,
+                "duration_display": _block_zone_duration_display(zone),
+            }
+        )
+    return scheduled_blocks, block_zone_payload
+
+
+def _requested_span(data: dict, key: str) -> int | None:
+    """Return a requested desk span, or ``None`` to keep the desk's current span."""
+
+    value = data.get(key)
+    if value in (None, ""):
+        return None
+    span = int(value)
+    if span < 1:
+        raise ValueError(key)
+    return span
+
+
+def _block_selection(grid: FloorGrid, rectangle, department) -> list[GridDesk]:
+    """Desks covered by a block-out ``rectangle`` and/or belonging to ``department``."""
+
+    if rectangle:
+        row = int(rectangle["row"])
+        column = int(rectangle["column"])
+        row_span = min(_requested_span(rectangle, "row_span") or 1, GRID_ROWS)
+        column_span = min(_requested_span(rectangle, "column_span") or 1, GRID_COLUMNS)
+        if not (1 <= row <= GRID_ROWS and 1 <= column <= GRID_COLUMNS):
+            raise ValueError("rectangle")
+        selected = grid.overlapping(row, column, row_span, column_span)
+    else:
+        selected = list(grid.desks)
+    if department:
+        department_id = int(department)
+        selected = [grid_desk for grid_desk in selected if grid_desk.department_id == department_id]
+    return selected
+
+
 def _first_form_error(form, default_message: str) -> str:
     if not form.errors:
         return default_message
@@ -138,18 +276,55 @@ def _first_form_error(form, default_message: str) -> str:
     return default_message
 
 
-@ensure_csrf_cookie
-def index(request):
-    now = timezone.now()
+def _build_floor_payloads(now, version: int) -> tuple:
     desks = (
         Desk.objects.select_related("department")
         .prefetch_related("block_zones", "assignments")
         .all()
     )
-    desk_payloads = [_desk_payload(desk, now) for desk in desks]
+    payloads = [_desk_payload(desk, now) for desk in desks]
+    # Any write bumps the floor version, so the payloads only go stale when a
+    # desk's status changes with time; keep them until the first such change.
+    valid_until = now + timedelta(seconds=FLOOR_PAYLOAD_CACHE_TIMEOUT)
+    for desk in desks:
+        if desk.has_current_status(now):
+            valid_until = min(valid_until, desk.status_valid_until)
+    snapshot = {
+        "floor_version": version,
+        "now": timezone.localtime(now).isoformat(),
+        "desks": payloads,
+    }
+    return valid_until, json.dumps(payloads), EncodedBody.build(json.dumps(snapshot).encode())
+
+
+def _floor_payloads(now) -> tuple[str, EncodedBody]:
+    """The desks JSON the floor plan inlines and the compressed ``/api/floor/`` body.
+
+    Both are shared between worker processes per floor version. The database
+    read from is part of the key so payloads built from a lagging replica are
+    never served to clients reading from the primary.
+    """
+
+    version = floor_version()
+    key = f"floorplan:floor-desks:{router.db_for_read(Desk)}:{version}"
+    build = partial(_build_floor_payloads, now, version)
+    valid_until, desks_json, snapshot = cache.get_or_set(key, build, FLOOR_PAYLOAD_CACHE_TIMEOUT)
+    if valid_until <= now:
+        cache.delete(key)
+        valid_until, desks_json, snapshot = cache.get_or_set(
+            key, build, FLOOR_PAYLOAD_CACHE_TIMEOUT
+        )
+    return desks_json, snapshot
+
+
+@replica_read
+@ensure_csrf_cookie
+def index(request):
+    now = timezone.now()
     departments = Department.objects.all()
+    desks_json, _ = _floor_payloads(now)
     context = {
-        "desks": json.dumps(desk_payloads),
+        "desks": desks_json,
         "departments": departments,
         "now_iso": timezone.localtime(now).isoformat(),
         "grid_rows": GRID_ROWS,
@@ -158,6 +333,38 @@ def index(request):
     return render(request, "floorplan/index.html", context)
 
 
+@replica_read
+@require_GET
+def floor_snapshot(request):
+    """Every desk payload the floor plan renders, for kiosks revalidating a cached page.
+
+    ``now`` is the time the payloads were computed; they are served from the
+    cache, already compressed, until the floor version changes.
+    """
+
+    _, snapshot = _floor_payloads(timezone.now())
+    return snapshot.response(request)
+
+
+@require_GET
+def service_worker(request):
+    """Serve the kiosk service worker from the site root so it can control ``/``."""
+
+    precache_urls = [static(path) for path in SERVICE_WORKER_PRECACHE]
+    # Hashed static names change on every deploy, which retires the old cache.
+    cache_version = hashlib.sha1("\n".join(precache_urls).encode("utf-8")).hexdigest()[:12]
+    response = render(
+        request,
+        "floorplan/service_worker.js",
+        {"precache_urls": json.dumps(precache_urls), "cache_version": cache_version},
+        content_type="application/javascript",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["Service-Worker-Allowed"] = "/"
+    return response
+
+
+@replica_read
 @require_POST
 def assignment_info(request):
     name = request.POST.get("name", "").strip()
@@ -193,6 +400,12 @@ def assignment_info(request):
                 "Your workspace is under construction. Please select a new location."
             )
             response["assignment"]["blocked_zones"] = block_zones
+            grid = floor_grid()
+            origin = grid.get(desk.identifier)
+            if origin is not None:
+                response["suggested_desks"] = _nearest_free_payload(
+                    grid, origin, now, preferred_department_id=origin.department_id
+                )
         else:
             response["message"] = f"You are assigned to {desk.label} in {desk.department.name}."
 
@@ -236,9 +449,42 @@ def authenticate_employee(request):
         "full_name": employee.full_name,
     }
     request.session[SESSION_EMPLOYEE_PROFILE_KEY] = profile
+    check_in(employee.full_name)
     return JsonResponse(profile)
 
 
+@require_GET
+def employee_suggestions(request):
+    query = (request.GET.get("q") or "").strip()
+    try:
+        limit = int(request.GET.get("limit") or EMPLOYEE_SUGGESTION_LIMIT)
+    except ValueError:
+        return JsonResponse({"error": "Invalid limit."}, status=400)
+    limit = max(1, min(limit, MAX_EMPLOYEE_SUGGESTIONS))
+    results = [
+        {
+            "first_name": record.first_name,
+            "last_name": record.last_name,
+            "full_name": record.full_name,
+        }
+        for record in suggest_employees(query, limit)
+    ]
+    return JsonResponse({"query": query, "results": results})
+
+
+@replica_read
+@require_GET
+def locate_people(request):
+    query = (request.GET.get("q") or "").strip()
+    if not query:
+        return JsonResponse({"error": "Enter part of a name to search for."}, status=400)
+    results = [
+        location.as_dict() for location in people_locator().search(query, PEOPLE_LOCATE_LIMIT)
+    ]
+    return JsonResponse({"query": query, "results": results})
+
+
+@replica_read
 @require_GET
 def desk_detail(request, identifier: str):
     desk = get_object_or_404(
@@ -248,6 +494,129 @@ def desk_detail(request, identifier: str):
     return JsonResponse(_desk_payload(desk))
 
 
+def _batch_rectangle(params: QueryDict) -> tuple[int, int, int, int] | None:
+    """Return ``(row, column, row_span, column_span)`` from the query, if one was given."""
+
+    if params.get("row") in (None, "") and params.get("column") in (None, ""):
+        return None
+    row = int(params.get("row") or "")
+    column = int(params.get("column") or "")
+    row_span = min(_requested_span(params, "row_span") or 1, GRID_ROWS)
+    column_span = min(_requested_span(params, "column_span") or 1, GRID_COLUMNS)
+    if not (1 <= row <= GRID_ROWS and 1 <= column <= GRID_COLUMNS):
+        raise ValueError("rectangle")
+    return row, column, row_span, column_span
+
+
+@replica_read
+@require_GET
+def desk_batch(request):
+    """Payloads for many desks in one response, with a fixed number of queries.
+
+    Select desks by ``ids`` (comma separated or repeated), or by a rectangle
+    (``row``, ``column`` and optional ``row_span``/``column_span``) and/or a
+    ``department`` id. Desks are resolved against the cached floor grid, so the
+    payloads cost one desk query plus its two prefetches whatever the count.
+    """
+
+    grid = floor_grid()
+    identifiers = [
+        identifier.strip()
+        for value in request.GET.getlist("ids")
+        for identifier in value.split(",")
+        if identifier.strip()
+    ]
+    try:
+        rectangle = _batch_rectangle(request.GET)
+        department = request.GET.get("department")
+        department_id = int(department) if department else None
+    except ValueError:
+        return JsonResponse({"error": "Invalid rectangle or department."}, status=400)
+
+    missing: list[str] = []
+    if identifiers:
+        if rectangle or department_id is not None:
+            return JsonResponse(
+                {"error": "Request desks by ids or by rectangle and department, not both."},
+                status=400,
+            )
+        if len(identifiers) > MAX_DESK_BATCH:
+            return JsonResponse(
+                {"error": f"Request at most {MAX_DESK_BATCH} desks at a time."}, status=400
+            )
+        selected = []
+        for identifier in dict.fromkeys(identifiers):
+            grid_desk = grid.get(identifier)
+            if grid_desk is None:
+                missing.append(identifier)
+            else:
+                selected.append(grid_desk)
+    elif rectangle or department_id is not None:
+        if rectangle:
+            selected = grid.overlapping(*rectangle)
+        else:
+            selected = sorted(grid.desks, key=lambda grid_desk: (grid_desk.row, grid_desk.column))
+        if department_id is not None:
+            selected = [grid_desk for grid_desk in selected if grid_desk.department_id == department_id]
+        if len(selected) > MAX_DESK_BATCH:
+            return JsonResponse(
+                {"error": f"The selection covers more than {MAX_DESK_BATCH} desks."}, status=400
+            )
+    else:
+        return JsonResponse({"error": "Provide ids, a rectangle or a department."}, status=400)
+
+    now = timezone.now()
+    desks = (
+        Desk.objects.select_related("department")
+        .prefetch_related("block_zones", "assignments")
+        .in_bulk([grid_desk.pk for grid_desk in selected])
+    )
+    return JsonResponse(
+        {
+            "desks": [
+                _desk_payload(desks[grid_desk.pk], now)
+                for grid_desk in selected
+                if grid_desk.pk in desks
+            ],
+            "missing": missing,
+        }
+    )
+
+
+@replica_read
+@require_GET
+def desk_nearest_free(request, identifier: str):
+    grid = floor_grid()
+    origin = grid.get(identifier)
+    if origin is None:
+        raise Http404("Desk not found.")
+    try:
+        limit = int(request.GET.get("k") or NEAREST_FREE_DESK_LIMIT)
+    except ValueError:
+        return JsonResponse({"error": "Invalid number of desks requested."}, status=400)
+    limit = max(1, min(limit, MAX_NEAREST_FREE_DESKS))
+
+    department = (request.GET.get("department") or "").strip().lower()
+    if department == "any":
+        preferred_department_id = None
+    elif department:
+        try:
+            preferred_department_id = int(department)
+        except ValueError:
+            return JsonResponse({"error": "Invalid department."}, status=400)
+    else:
+        preferred_department_id = origin.department_id
+
+    return JsonResponse(
+        {
+            "origin": origin.identifier,
+            "results": _nearest_free_payload(
+                grid, origin, timezone.now(), limit, preferred_department_id
+            ),
+        }
+    )
+
+
 @require_POST
 def assign_to_desk(request, identifier: str):
     desk = get_object_or_404(Desk, identifier=identifier)
@@ -260,21 +629,37 @@ def assign_to_desk(request, identifier: str):
             },
             status=403,
         )
+    # Kiosks send the name the reservation was made under; a request queued
+    # offline by someone else must not be booked for whoever is signed in now.
+    requested_name = (request.POST.get("assignee_name") or "").strip()
+    if requested_name and requested_name.casefold() != assignee_name.casefold():
+        return JsonResponse(
+            {"error": f"This reservation was made for {requested_name}, not {assignee_name}."},
+            status=403,
+        )
 
     now = timezone.now()
-    if desk.is_blocked(now):
+    start_raw = request.POST.get("start")
+    parsed_start = now
+    if start_raw:
+        try:
+            parsed_start = datetime.fromisoformat(start_raw)
+            if timezone.is_naive(parsed_start):
+                parsed_start = timezone.make_aware(parsed_start, timezone.get_current_timezone())
+        except ValueError:
+            return JsonResponse({"error": "Invalid start date."}, status=400)
+        parsed_start = max(parsed_start, now)
+    advance = parsed_start > now
+    if advance and parsed_start > now + timedelta(days=ADVANCE_BOOKING_DAYS):
         return JsonResponse(
-            {
-                "error": "This desk is currently unavailable due to a block-out zone.",
-                "desk": _desk_payload(desk, now),
-            },
+            {"error": f"Desks can be booked up to {ADVANCE_BOOKING_DAYS} days ahead."},
             status=400,
         )
 
-    if desk.active_assignment(now):
+    if not advance and desk.active_assignment(now):
         return JsonResponse(
             {"error": "This desk is already assigned.", "desk": _desk_payload(desk, now)},
-            status=400,
+            status=409,
         )
 
     end_raw = request.POST.get("end")
@@ -285,38 +670,48 @@ def assign_to_desk(request, identifier: str):
                 parsed_end = timezone.make_aware(parsed_end, timezone.get_current_timezone())
         except ValueError:
             return JsonResponse({"error": "Invalid end date."}, status=400)
+        if parsed_end <= parsed_start:
+            return JsonResponse({"error": "End time must be after the start time."}, status=400)
     else:
-        local_now = timezone.localtime(now)
-        parsed_end = local_now.replace(hour=23, minute=59, second=0, microsecond=0)
-        if parsed_end <= now:
-            parsed_end += timedelta(days=1)
-
-    Assignment.objects.filter(
-        assignee_name__iexact=assignee_name,
-        assignment_type=Assignment.TYPE_DESK,
-    ).filter(
-        models.Q(is_permanent=True)
-        | models.Q(end__isnull=True)
-        | models.Q(end__gte=now)
-    ).update(end=now, is_permanent=False)
-
-    assignment = Assignment.objects.create(
-        desk=desk,
-        assignment_type=Assignment.TYPE_DESK,
-        assignee_name=assignee_name,
-        start=now,
-        end=parsed_end,
-        is_permanent=False,
-        note="Self-service assignment",
-        created_by="Self-service",
-    )
-    return JsonResponse(
-        {
-            "success": True,
-            "desk": _desk_payload(desk),
-            "assignment": _serialize_assignment(assignment),
-        }
-    )
+        parsed_end = walk_up_end(parsed_start)
+    requested_end = parsed_end
+
+    blocked_from = desk.first_blocked_time(parsed_start, parsed_end)
+    if blocked_from is not None and (advance or blocked_from <= parsed_start):
+        return JsonResponse(
+            {
+                "error": "This desk is unavailable then due to a block-out zone.",
+                "desk": _desk_payload(desk, now),
+            },
+            status=400,
+        )
+    if blocked_from is not None:
+        # As with a later booking, a walk-up keeps the desk until the block-out starts.
+        parsed_end = blocked_from
+
+    try:
+        if advance:
+            assignment = book_desk(desk, assignee_name, parsed_start, parsed_end)
+        else:
+            assignment = reserve_desk(desk, assignee_name, now, parsed_end)
+    except ReservationConflict as exc:
+        # The conflicting booking was written after this desk row was loaded.
+        desk.refresh_from_db()
+        return JsonResponse({"error": str(exc), "desk": _desk_payload(desk, now)}, status=409)
+    # Saving the assignment refreshed the stored status columns, not this instance.
+    desk.refresh_from_db()
+    result = {
+        "success": True,
+        "desk": _desk_payload(desk),
+        "assignment": _serialize_assignment(assignment),
+    }
+    if assignment.end and assignment.end < requested_end:
+        ends_at = timezone.localtime(assignment.end).strftime("%I:%M %p")
+        result["notice"] = (
+            f"{desk.label} is unavailable from {ends_at}, so your reservation ends then."
+        )
+    return JsonResponse(result)
+
 
 @staff_member_required
 def admin_console(request):
@@ -339,65 +734,162 @@ def admin_console(request):
     )
     localized_evaluation_time = timezone.localtime(evaluation_time)
 
-    assignments = (
-        Assignment.objects.select_related("desk", "desk__department")
-        .order_by("assignee_name", "-start")
-    )
-    active_assignments = [
-        assignment for assignment in assignments if assignment.is_active(evaluation_time)
-    ]
-    block_zone_queryset = (
-        BlockOutZone.objects.prefetch_related("desks").order_by("start", "name")
-    )
-    scheduled_blocks: list[BlockOutZone] = []
-    block_zone_payload: list[dict] = []
-    for zone in block_zone_queryset:
-        is_active = zone.is_active(evaluation_time)
-        starts_in_future = bool(zone.start and zone.start > evaluation_time)
-        if not is_active and not starts_in_future:
-            continue
-        setattr(zone, "admin_is_active", is_active)
-        scheduled_blocks.append(zone)
-        block_zone_payload.append(
-            {
-                "id": zone.pk,
-                "name": zone.name,
-                "desk_count": zone.desks.count(),
-                "is_permanent": zone.is_permanent,
-                "duration_choice": "permanent" if zone.is_permanent else "temporary",
-                "reason": zone.reason or "",
-                "created_by": zone.created_by or "",
-                "start": _datetime_input_value(zone.start),
-                "end": "" if zone.is_permanent else _datetime_input_value(zone.end),
-                "start_display": _datetime_display_value(zone.start),
-                "end_display": _datetime_display_value(zone.end),
-                "is_active": is_active,
-                "duration_display": _block_zone_duration_display(zone),
-            }
+    version = floor_version()
+    view_date_key = selected_date.isoformat()
+
+    def load_active_assignments():
+        assignments = Assignment.objects.select_related("desk", "desk__department").order_by(
+            "assignee_name", "-start"
         )
-    desks = (
-        Desk.objects.select_related("department")
-        .prefetch_related("block_zones", "assignments")
-        .all()
-    )
-    layout_desks = [_desk_payload(desk, evaluation_time) for desk in desks]
+        return [
+            assignment for assignment in assignments if assignment.is_active(evaluation_time)
+        ]
 
+    scheduled = SimpleLazyObject(lambda: _scheduled_block_zones(evaluation_time))
+
+    def layout_desks_json():
+        desks = (
+            Desk.objects.select_related("department")
+            .prefetch_related("block_zones", "assignments")
+            .all()
+        )
+        return json.dumps([_desk_payload(desk, evaluation_time) for desk in desks])
+
+    # Everything below depends only on the floor version and the evaluated
+    # date, so repeat views are served from the cache; the lazy objects are
+    # only evaluated when a template fragment misses.
+    cache_prefix = f"floorplan:admin-console:{version}:{view_date_key}"
     context = {
-        "active_assignments": active_assignments,
-        "block_zones": scheduled_blocks,
-        "block_zone_data": json.dumps(block_zone_payload),
+        "active_assignments": SimpleLazyObject(load_active_assignments),
+        "block_zones": SimpleLazyObject(lambda: scheduled[0]),
+        "block_zone_data": cache.get_or_set(
+            f"{cache_prefix}:block-zones",
+            lambda: json.dumps(scheduled[1]),
+            ADMIN_CONSOLE_CACHE_TIMEOUT,
+        ),
         "now": local_now,
         "view_datetime": localized_evaluation_time,
         "view_date": selected_date,
+        "view_date_key": view_date_key,
         "view_date_display": localized_evaluation_time.strftime("%B %d, %Y"),
         "is_today_selected": selected_date == today,
-        "layout_desks": json.dumps(layout_desks),
+        "layout_desks": cache.get_or_set(
+            f"{cache_prefix}:layout-desks", layout_desks_json, ADMIN_CONSOLE_CACHE_TIMEOUT
+        ),
         "grid_rows": GRID_ROWS,
         "grid_columns": GRID_COLUMNS,
         "departments": Department.objects.all(),
+        "weekday_choices": WEEKDAY_CHOICES,
+        "floor_version": version,
+        "fragment_cache_timeout": ADMIN_CONSOLE_CACHE_TIMEOUT,
     }
     return render(request, "floorplan/admin_console.html", context)
 
+
+@staff_member_required
+@require_GET
+def export_assignments(request):
+    filters = {}
+    for key in ("start", "end"):
+        value = (request.GET.get(key) or "").strip()
+        if value:
+            try:
+                filters[f"{key}_date"] = datetime.strptime(value, "%Y-%m-%d").date()
+            except ValueError:
+                return JsonResponse({"error": f"Invalid {key} date."}, status=400)
+    department = (request.GET.get("department") or "").strip()
+    if department:
+        try:
+            filters["department_id"] = int(department)
+        except ValueError:
+            return JsonResponse({"error": "Invalid department."}, status=400)
+    assignment_type = (request.GET.get("type") or "").strip()
+    if assignment_type:
+        if assignment_type not in dict(Assignment.ASSIGNMENT_TYPE_CHOICES):
+            return JsonResponse({"error": "Invalid assignment type."}, status=400)
+        filters["assignment_type"] = assignment_type
+
+    response = StreamingHttpResponse(
+        iter_assignment_csv(assignment_history(**filters)),
+        content_type="text/csv; charset=utf-8",
+    )
+    filename = f"assignments-{timezone.localdate():%Y%m%d}.csv"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+@staff_member_required
+@require_GET
+def desk_timeline(request):
+    """Each desk's free, occupied and blocked segments for a day or the week from it."""
+
+    date_value = (request.GET.get("date") or "").strip()
+    try:
+        first_day = (
+            datetime.strptime(date_value, "%Y-%m-%d").date() if date_value else timezone.localdate()
+        )
+    except ValueError:
+        return JsonResponse({"error": "Invalid date."}, status=400)
+    span = request.GET.get("span") or "day"
+    if span not in TIMELINE_SPANS:
+        return JsonResponse({"error": "Span must be day or week."}, status=400)
+    department = (request.GET.get("department") or "").strip()
+    try:
+        department_id = int(department) if department else None
+    except ValueError:
+        return JsonResponse({"error": "Invalid department."}, status=400)
+
+    zone = timezone.get_current_timezone()
+    window_start = timezone.make_aware(datetime.combine(first_day, time.min), zone)
+    last_day = first_day + timedelta(days=TIMELINE_SPANS[span])
+    window_end = timezone.make_aware(datetime.combine(last_day, time.min), zone)
+
+    desks = sorted(floor_grid().desks, key=lambda grid_desk: (grid_desk.row, grid_desk.column))
+    if department_id is not None:
+        desks = [grid_desk for grid_desk in desks if grid_desk.department_id == department_id]
+    timelines = desk_timelines(window_start, window_end, [grid_desk.pk for grid_desk in desks])
+    return JsonResponse(
+        {
+            "start": timezone.localtime(window_start).isoformat(),
+            "end": timezone.localtime(window_end).isoformat(),
+            "desks": [
+                {
+                    "identifier": grid_desk.identifier,
+                    "label": grid_desk.label,
+                    "department": grid_desk.department,
+                    "segments": [
+                        {
+                            "start": timezone.localtime(segment.start).isoformat(),
+                            "end": timezone.localtime(segment.end).isoformat(),
+                            "status": segment.status,
+                            "label": segment.label,
+                            "assignee": segment.assignee,
+                            "zones": list(segment.zones),
+                        }
+                        for segment in timelines[grid_desk.pk]
+                    ],
+                }
+                for grid_desk in desks
+            ],
+        }
+    )
+
+
+@staff_member_required
+@require_GET
+def profile_list(request):
+    return render(request, "floorplan/profiles.html", {"profiles": saved_profiles()})
+
+
+@staff_member_required
+@require_GET
+def download_profile(request, name: str):
+    path = profile_file(name)
+    if path is None:
+        raise Http404("Profile not found.")
+    return FileResponse(path.open("rb"), as_attachment=True, filename=name)
+
+
 @staff_member_required
 @require_POST
 def delete_block_zone(request, pk: int):
@@ -475,10 +967,12 @@ def end_assignment(request, pk: int):
     assignment = get_object_or_404(Assignment, pk=pk)
     assignment.end = timezone.now()
     assignment.is_permanent = False
-    assignment.save(update_fields=["end", "is_permanent"])
+    assignment.is_open = False
+    assignment.save(update_fields=["end", "is_permanent", "is_open"])
     messages.success(request, f"Assignment for {assignment.assignee_name} has been ended.")
     return redirect("floorplan:admin-console")
 
+
 @staff_member_required
 @require_POST
 def update_layout(request):
@@ -489,7 +983,11 @@ def update_layout(request):
 
     action = payload.get("action", "assign").lower()
     cells = payload.get("cells") or []
-    if not isinstance(cells, list) or not cells:
+    # Block-outs can also cover a rectangle and/or a department instead of cells.
+    block_rectangle = payload.get("rectangle")
+    block_department = payload.get("department")
+    block_by_set = action == "block" and bool(block_rectangle or block_department)
+    if not isinstance(cells, list) or not (cells or block_by_set):
         return JsonResponse({"error": "Please select at least one cell."}, status=400)
 
     normalized_cells: list[tuple[int, int]] = []
@@ -517,6 +1015,9 @@ def update_layout(request):
     created_assignments: list[Assignment] = []
     blocked_count = 0
 
+    grid = floor_grid()
+    selected_desk_ids = [desk.pk for desk in grid.select(normalized_cells)]
+
     with transaction.atomic():
         if action == "assign":
             data = payload.get("data") or {}
@@ -527,31 +1028,67 @@ def update_layout(request):
                 department = Department.objects.get(pk=department_id)
             except Department.DoesNotExist:
                 return JsonResponse({"error": "Department not found."}, status=404)
+            try:
+                row_span = _requested_span(data, "row_span")
+                column_span = _requested_span(data, "column_span")
+            except (TypeError, ValueError):
+                return JsonResponse(
+                    {"error": "Desk spans must be whole numbers of at least 1."}, status=400
+                )
 
             label_value = (data.get("label") or "").strip()
             fill_color = (data.get("fill_color") or "").strip()
             notes_value = (data.get("notes") or "").strip()
 
+            # Cells covered by an existing desk edit that desk; the rest become new desks.
+            existing = Desk.objects.select_for_update().in_bulk(selected_desk_ids)
+            targets: list[tuple[Desk | None, int, int]] = []
+            for desk_id in selected_desk_ids:
+                desk = existing.get(desk_id)
+                if desk is not None:
+                    targets.append((desk, desk.row_index, desk.column_index))
             for row, column in normalized_cells:
-                left, top, width, height = grid_to_percentages(row, column)
-                desk, created = Desk.objects.select_for_update().get_or_create(
-                    row_index=row,
-                    column_index=column,
-                    defaults={
-                        "identifier": cell_identifier(row, column),
-                        "label": label_value or f"{department.name} r{row:02d}c{column:02d}",
-                        "department": department,
-                        "fill_color": fill_color,
-                        "notes": notes_value,
-                        "row_span": 1,
-                        "column_span": 1,
-                        "left_percentage": left,
-                        "top_percentage": top,
-                        "width_percentage": width,
-                        "height_percentage": height,
-                    },
+                if grid.desk_at(row, column) is None:
+                    targets.append((None, row, column))
+
+            placements = [
+                (
+                    desk.pk if desk else None,
+                    row,
+                    column,
+                    row_span or (desk.row_span if desk else 1),
+                    column_span or (desk.column_span if desk else 1),
+                )
+                for desk, row, column in targets
+            ]
+            try:
+                grid.place(placements)
+            except LayoutConflict as exc:
+                return JsonResponse({"error": str(exc)}, status=400)
+
+            for (desk, row, column), (_, _, _, desk_row_span, desk_column_span) in zip(
+                targets, placements
+            ):
+                left, top, width, height = grid_to_percentages(
+                    row, column, desk_row_span, desk_column_span
                 )
-                if not created:
+                if desk is None:
+                    desk = Desk.objects.create(
+                        identifier=cell_identifier(row, column),
+                        label=label_value or f"{department.name} r{row:02d}c{column:02d}",
+                        department=department,
+                        fill_color=fill_color,
+                        notes=notes_value,
+                        row_index=row,
+                        column_index=column,
+                        row_span=desk_row_span,
+                        column_span=desk_column_span,
+                        left_percentage=left,
+                        top_percentage=top,
+                        width_percentage=width,
+                        height_percentage=height,
+                    )
+                else:
                     desk.department = department
                     if label_value:
                         desk.label = label_value
@@ -559,40 +1096,37 @@ def update_layout(request):
                         desk.label = f"{department.name} r{row:02d}c{column:02d}"
                     desk.fill_color = fill_color
                     desk.notes = notes_value
-                    desk.row_index = row
-                    desk.column_index = column
-                    desk.row_span = 1
-                    desk.column_span = 1
+                    desk.row_span = desk_row_span
+                    desk.column_span = desk_column_span
                     desk.left_percentage = left
                     desk.top_percentage = top
                     desk.width_percentage = width
                     desk.height_percentage = height
                     desk.save()
-                else:
-                    updated_identifiers.add(desk.identifier)
-                    continue
                 updated_identifiers.add(desk.identifier)
         elif action == "clear":
-            for row, column in normalized_cells:
-                try:
-                    desk = Desk.objects.select_for_update().get(
-                        row_index=row, column_index=column
-                    )
-                except Desk.DoesNotExist:
-                    continue
-                cleared_cells.append({"row": row, "column": column})
+            for desk in Desk.objects.select_for_update().filter(pk__in=selected_desk_ids):
+                cleared_cells.append({"row": desk.row_index, "column": desk.column_index})
                 desk.delete()
         elif action == "block":
             data = payload.get("data") or {}
-            desks = []
-            for row, column in normalized_cells:
+            if block_by_set:
                 try:
-                    desk = Desk.objects.select_for_update().get(
-                        row_index=row, column_index=column
+                    block_grid_desks = _block_selection(grid, block_rectangle, block_department)
+                except (KeyError, TypeError, ValueError):
+                    return JsonResponse(
+                        {"error": "Invalid rectangle or department for the block-out zone."},
+                        status=400,
                     )
-                except Desk.DoesNotExist:
-                    continue
-                desks.append(desk)
+                block_desk_ids = [grid_desk.pk for grid_desk in block_grid_desks]
+            else:
+                block_desk_ids = selected_desk_ids
+            # One range query confirms the desks still exist and names them for the response.
+            desks = dict(
+                Desk.objects.select_for_update()
+                .filter(pk__in=block_desk_ids)
+                .values_list("pk", "identifier")
+            )
             if not desks:
                 return JsonResponse(
                     {"error": "Select desks with existing workspaces before blocking."},
@@ -609,33 +1143,28 @@ def update_layout(request):
                 form_data["reason"] = data["reason"]
             if data.get("created_by"):
                 form_data["created_by"] = data["created_by"]
-            form_data.setlist("desks", [str(desk.pk) for desk in desks])
 
-            block_form = BlockOutZoneForm(form_data)
+            block_form = DeskSetBlockOutForm(form_data)
             if not block_form.is_valid():
                 return JsonResponse(
                     {"error": _first_form_error(block_form, "Unable to save block-out zone.")},
                     status=400,
                 )
-            block = block_form.save()
-            blocked_count = block.desks.count()
-            updated_identifiers.update(block.desks.values_list("identifier", flat=True))
+            block_form.save_for_desks(desks)
+            blocked_count = len(desks)
+            updated_identifiers.update(desks.values())
         else:  # assignment
             data = payload.get("data") or {}
-            desks = []
-            for row, column in normalized_cells:
-                try:
-                    desk = Desk.objects.select_for_update().get(
-                        row_index=row, column_index=column
-                    )
-                except Desk.DoesNotExist:
-                    continue
-                desks.append(desk)
+            desks = list(
+                Desk.objects.select_for_update()
+                .select_related("department")
+                .filter(pk__in=selected_desk_ids)
+            )
 
             assignable_desks = [
                 desk
                 for desk in desks
-                if desk.department.name not in {"Utility/Resource", "Walkway"}
+                if desk.department.name not in NON_ASSIGNABLE_DEPARTMENTS
             ]
 
             if not assignable_desks:
@@ -667,6 +1196,12 @@ def update_layout(request):
                 form_data["start"] = start_value
                 if end_value:
                     form_data["end"] = end_value
+                form_data.setlist(
+                    "recurrence_weekdays",
+                    [str(day) for day in data.get("recurrence_weekdays") or []],
+                )
+                if data.get("recurrence_until"):
+                    form_data["recurrence_until"] = data["recurrence_until"]
                 if data.get("note"):
                     form_data["note"] = data["note"]
                 if data.get("created_by"):
@@ -1,4 +1,7 @@
 (function () {
+  const blockZoneChunkUrl = document.currentScript
+    ? document.currentScript.dataset.blockZoneChunk
+    : "";
   const canvas = document.getElementById("layout-canvas");
   const deskDataElement = document.getElementById("layout-desk-data");
   if (!canvas || !deskDataElement) {
@@ -146,6 +149,8 @@
   const labelInput = document.getElementById("layout-label");
   const fillInput = document.getElementById("layout-fill");
   const notesInput = document.getElementById("layout-notes");
+  const rowSpanInput = document.getElementById("layout-row-span");
+  const columnSpanInput = document.getElementById("layout-column-span");
   const selectionInfo = document.getElementById("layout-selection-info");
   const selectionList = document.getElementById("layout-selection-list");
   const layoutFeedback = document.getElementById("layout-feedback");
@@ -154,10 +159,12 @@
   const assignmentForm = document.getElementById("assignment-form");
   const assignmentSelectionInfo = document.getElementById("assignment-selection-info");
   const assignmentName = document.getElementById("assignment-name");
+  const assignmentNameOptions = document.getElementById("assignment-name-options");
   const assignmentType = document.getElementById("assignment-type");
   const assignmentDuration = document.getElementById("assignment-duration");
   const assignmentStart = document.getElementById("assignment-start");
   const assignmentEnd = document.getElementById("assignment-end");
+  const assignmentRecurrenceUntil = document.getElementById("assignment-recurrence-until");
   const assignmentNote = document.getElementById("assignment-note");
   const assignmentCreatedBy = document.getElementById("assignment-created-by");
   const assignmentFeedback = document.getElementById("assignment-feedback");
@@ -173,31 +180,6 @@
   const blockCreatedBy = document.getElementById("block-created-by");
   const blockFeedback = document.getElementById("block-feedback");
   const blockSubmit = document.getElementById("block-submit");
-  const blockZoneDataElement = document.getElementById("block-zone-data");
-  const blockZoneModal = document.getElementById("block-zone-modal");
-  const blockZoneForm = document.getElementById("block-zone-modal-form");
-  const blockZoneModalTitle = document.getElementById("block-zone-modal-title");
-  const blockZoneNameInput = document.getElementById("block-zone-modal-name");
-  const blockZoneDurationSelect = document.getElementById(
-    "block-zone-modal-duration",
-  );
-  const blockZoneStartInput = document.getElementById("block-zone-modal-start");
-  const blockZoneEndInput = document.getElementById("block-zone-modal-end");
-  const blockZoneReasonInput = document.getElementById("block-zone-modal-reason");
-  const blockZoneCreatedByInput = document.getElementById(
-    "block-zone-modal-created-by",
-  );
-  const blockZoneSchedule = document.getElementById("block-zone-modal-schedule");
-  const blockZoneDeskCount = document.getElementById("block-zone-modal-desk-count");
-  const blockZoneStatusBadge = document.getElementById("block-zone-modal-status");
-  const blockZoneCancelButton = document.getElementById("block-zone-modal-cancel");
-  const blockZoneDeleteForm = document.getElementById("block-zone-delete-form");
-  const blockZoneUpdateUrlTemplate = blockZoneModal
-    ? blockZoneModal.dataset.updateUrlTemplate || ""
-    : "";
-  const blockZoneDeleteUrlTemplate = blockZoneModal
-    ? blockZoneModal.dataset.deleteUrlTemplate || ""
-    : "";
 
   const modeButtons = document.querySelectorAll(".admin-mode-button");
   const modePanels = document.querySelectorAll(".mode-panel");
@@ -208,22 +190,6 @@
     block: blockFeedback,
   };
 
-  const blockZoneLookup = new Map();
-  if (blockZoneDataElement) {
-    try {
-      const parsedZones = JSON.parse(blockZoneDataElement.textContent || "[]");
-      if (Array.isArray(parsedZones)) {
-        parsedZones.forEach((zone) => {
-          if (zone && zone.id != null) {
-            blockZoneLookup.set(String(zone.id), zone);
-          }
-        });
-      }
-    } catch (error) {
-      console.error("Unable to parse block-out zone data", error);
-    }
-  }
-
   const SELECTION_DRAG_THRESHOLD_SQUARED = 9;
 
   function releaseSelectionPointer(pointerId) {
@@ -305,9 +271,31 @@
   canvas.style.setProperty("--grid-columns", String(columns));
 
   desks.forEach((desk) => {
-    deskByCell.set(cellKey(desk.row, desk.column), desk);
+    deskCellKeys(desk).forEach((key) => deskByCell.set(key, desk));
   });
 
+  function deskCellKeys(desk) {
+    const keys = [];
+    const lastRow = Math.min(desk.row + Math.max(desk.row_span || 1, 1) - 1, rows);
+    const lastColumn = Math.min(desk.column + Math.max(desk.column_span || 1, 1) - 1, columns);
+    for (let row = desk.row; row <= lastRow; row += 1) {
+      for (let column = desk.column; column <= lastColumn; column += 1) {
+        keys.push(cellKey(row, column));
+      }
+    }
+    return keys;
+  }
+
+  function removeDeskCells(identifier) {
+    [...deskByCell.entries()].forEach(([key, desk]) => {
+      if (desk.identifier === identifier) {
+        deskByCell.delete(key);
+        const { row, column } = parseKey(key);
+        renderCell(row, column);
+      }
+    });
+  }
+
   function cellKey(row, column) {
     return `${row}-${column}`;
   }
@@ -585,9 +573,16 @@
   });
 
   function getSelectedDesks() {
+    const seen = new Set();
     return [...selectedCells]
       .map((key) => deskByCell.get(key))
-      .filter((desk) => Boolean(desk));
+      .filter((desk) => {
+        if (!desk || seen.has(desk.identifier)) {
+          return false;
+        }
+        seen.add(desk.identifier);
+        return true;
+      });
   }
 
   function getAssignableDesks() {
@@ -653,6 +648,12 @@
           if (notesInput) {
             notesInput.value = desk.notes || "";
           }
+          if (rowSpanInput) {
+            rowSpanInput.value = String(desk.row_span || 1);
+          }
+          if (columnSpanInput) {
+            columnSpanInput.value = String(desk.column_span || 1);
+          }
         } else {
           layoutForm.reset();
         }
@@ -664,7 +665,7 @@
   function updateActionAvailability() {
     const desks = getSelectedDesks();
     const assignable = getAssignableDesks();
-    const ignoredCount = selectedCells.size - desks.length;
+    const ignoredCount = [...selectedCells].filter((key) => !deskByCell.has(key)).length;
 
     if (assignmentSelectionInfo) {
       if (assignable.length === 0) {
@@ -748,16 +749,20 @@
   function applyServerResult(result) {
     if (Array.isArray(result.updated)) {
       result.updated.forEach((desk) => {
-        const key = cellKey(desk.row, desk.column);
-        deskByCell.set(key, desk);
-        renderCell(desk.row, desk.column);
+        removeDeskCells(desk.identifier);
+        deskCellKeys(desk).forEach((key) => {
+          deskByCell.set(key, desk);
+          const { row, column } = parseKey(key);
+          renderCell(row, column);
+        });
       });
     }
     if (Array.isArray(result.cleared)) {
       result.cleared.forEach(({ row, column }) => {
-        const key = cellKey(row, column);
-        deskByCell.delete(key);
-        renderCell(row, column);
+        const desk = deskByCell.get(cellKey(row, column));
+        if (desk) {
+          removeDeskCells(desk.identifier);
+        }
       });
     }
     refreshSelectedStyles();
@@ -784,6 +789,8 @@
           label: labelInput ? labelInput.value.trim() : "",
           fill_color: fillInput ? fillInput.value.trim() : "",
           notes: notesInput ? notesInput.value.trim() : "",
+          row_span: rowSpanInput ? rowSpanInput.value.trim() : "",
+          column_span: columnSpanInput ? columnSpanInput.value.trim() : "",
         },
       };
       try {
@@ -860,6 +867,10 @@
           duration_choice: durationValue,
           start: startValue,
           end: endValue,
+          recurrence_weekdays: Array.from(
+            assignmentForm.querySelectorAll('input[name="recurrence_weekdays"]:checked'),
+          ).map((input) => input.value),
+          recurrence_until: assignmentRecurrenceUntil ? assignmentRecurrenceUntil.value : "",
           note: assignmentNote ? assignmentNote.value.trim() : "",
           created_by: assignmentCreatedBy ? assignmentCreatedBy.value.trim() : "",
         },
@@ -923,184 +934,75 @@
     });
   }
 
-  function applyIdToTemplate(template, id) {
-    if (!template) {
-      return "";
-    }
-    return template.replace(/\/0\//, `/${String(id)}/`);
-  }
-
-  function blockZoneScheduleSummary(zone) {
-    if (!zone) {
-      return "";
-    }
-    const parts = [];
-    if (zone.is_active) {
-      parts.push("Active now");
-    } else if (zone.start_display) {
-      parts.push(`Begins ${zone.start_display}`);
-    }
-    if (zone.is_permanent) {
-      parts.push("Permanent block");
-    } else if (zone.end_display) {
-      parts.push(`Ends ${zone.end_display}`);
-    }
-    if (parts.length === 0 && zone.duration_display) {
-      parts.push(zone.duration_display);
-    }
-    return parts.join(" • ");
-  }
-
-  function blockZoneDeskSummary(count) {
-    const deskCount = Number(count) || 0;
-    if (deskCount === 1) {
-      return "1 desk included in this zone.";
-    }
-    return `${deskCount} desks included in this zone.`;
-  }
-
-  function closeBlockZoneModal() {
-    if (!blockZoneModal) {
-      return;
-    }
-    blockZoneModal.classList.add("hidden");
-    blockZoneModal.setAttribute("aria-hidden", "true");
-    delete blockZoneModal.dataset.currentZoneId;
-    if (blockZoneForm) {
-      blockZoneForm.reset();
-      blockZoneForm.action = blockZoneUpdateUrlTemplate;
-    }
-    if (blockZoneEndInput) {
-      blockZoneEndInput.disabled = false;
-    }
-    if (blockZoneDeleteForm) {
-      blockZoneDeleteForm.action = blockZoneDeleteUrlTemplate;
-    }
-    if (blockZoneSchedule) {
-      blockZoneSchedule.textContent = "";
-    }
-    if (blockZoneDeskCount) {
-      blockZoneDeskCount.textContent = "";
-    }
-    if (blockZoneStatusBadge) {
-      blockZoneStatusBadge.textContent = "";
-      blockZoneStatusBadge.classList.remove("success", "warning");
-    }
-    if (blockZoneModalTitle) {
-      blockZoneModalTitle.textContent = "Edit block-out zone";
-    }
-  }
-
-  function openBlockZoneModal(zoneId) {
-    if (!blockZoneModal || !blockZoneForm) {
-      return;
-    }
-    const zone = blockZoneLookup.get(String(zoneId));
-    if (!zone) {
+  function initBlockZoneEditor() {
+    const blockZoneItems = document.querySelectorAll(".block-item[data-block-id]");
+    if (!blockZoneItems.length || typeof window.loadChunk !== "function") {
       return;
     }
-    blockZoneModal.classList.remove("hidden");
-    blockZoneModal.setAttribute("aria-hidden", "false");
-    blockZoneModal.dataset.currentZoneId = String(zoneId);
-    blockZoneForm.action = applyIdToTemplate(blockZoneUpdateUrlTemplate, zoneId);
-    if (blockZoneDeleteForm) {
-      blockZoneDeleteForm.action = applyIdToTemplate(
-        blockZoneDeleteUrlTemplate,
-        zoneId,
-      );
-    }
-    if (blockZoneModalTitle) {
-      blockZoneModalTitle.textContent = `Edit ${zone.name}`;
-    }
-    if (blockZoneNameInput) {
-      blockZoneNameInput.value = zone.name || "";
-    }
-    if (blockZoneDurationSelect) {
-      blockZoneDurationSelect.value = zone.is_permanent
-        ? "permanent"
-        : zone.duration_choice || "temporary";
-    }
-    if (blockZoneStartInput) {
-      blockZoneStartInput.value = zone.start || "";
-    }
-    if (blockZoneEndInput) {
-      blockZoneEndInput.value = zone.is_permanent ? "" : zone.end || "";
-    }
-    if (blockZoneReasonInput) {
-      blockZoneReasonInput.value = zone.reason || "";
-    }
-    if (blockZoneCreatedByInput) {
-      blockZoneCreatedByInput.value = zone.created_by || "";
-    }
-    if (blockZoneSchedule) {
-      blockZoneSchedule.textContent = blockZoneScheduleSummary(zone);
-    }
-    if (blockZoneDeskCount) {
-      blockZoneDeskCount.textContent = blockZoneDeskSummary(zone.desk_count);
-    }
-    if (blockZoneStatusBadge) {
-      blockZoneStatusBadge.textContent = zone.is_active ? "Active" : "Scheduled";
-      blockZoneStatusBadge.classList.remove("success", "warning");
-      blockZoneStatusBadge.classList.add(zone.is_active ? "success" : "warning");
-    }
-    bindDurationToggle(blockZoneDurationSelect, blockZoneEndInput);
-    if (blockZoneEndInput && blockZoneDurationSelect) {
-      blockZoneEndInput.disabled = blockZoneDurationSelect.value === "permanent";
-    }
-    window.setTimeout(() => {
-      if (blockZoneNameInput && typeof blockZoneNameInput.focus === "function") {
-        blockZoneNameInput.focus();
-        if (typeof blockZoneNameInput.select === "function") {
-          blockZoneNameInput.select();
-        }
-      }
-    }, 0);
-  }
-
-  const blockZoneItems = document.querySelectorAll(
-    ".block-item[data-block-id]",
-  );
-  blockZoneItems.forEach((item) => {
-    item.addEventListener("click", () => {
-      const zoneId = item.dataset.blockId;
-      if (zoneId != null) {
-        openBlockZoneModal(zoneId);
+    // Editing a scheduled zone is rare, so its dialog is fetched on first use.
+    let editor = null;
+    const openZone = (zoneId) => {
+      if (zoneId == null) {
+        return;
       }
-    });
-    item.addEventListener("keydown", (event) => {
-      if (event.key === "Enter" || event.key === " ") {
-        event.preventDefault();
-        const zoneId = item.dataset.blockId;
-        if (zoneId != null) {
-          openBlockZoneModal(zoneId);
+      window
+        .loadChunk("blockZoneEditor", blockZoneChunkUrl)
+        .then((init) => {
+          if (!editor) {
+            editor = init({ bindDurationToggle });
+          }
+          editor.open(zoneId);
+        })
+        .catch((error) => {
+          console.error("Unable to load the block-out zone editor", error);
+        });
+    };
+    blockZoneItems.forEach((item) => {
+      item.addEventListener("click", () => {
+        openZone(item.dataset.blockId);
+      });
+      item.addEventListener("keydown", (event) => {
+        if (event.key === "Enter" || event.key === " ") {
+          event.preventDefault();
+          openZone(item.dataset.blockId);
         }
-      }
-    });
-  });
-
-  if (blockZoneCancelButton) {
-    blockZoneCancelButton.addEventListener("click", () => {
-      closeBlockZoneModal();
+      });
     });
   }
 
-  if (blockZoneModal) {
-    blockZoneModal.addEventListener("click", (event) => {
-      if (event.target === blockZoneModal) {
-        closeBlockZoneModal();
+  if (assignmentName && assignmentNameOptions) {
+    let suggestionTimer = null;
+    let latestSuggestionQuery = "";
+    assignmentName.addEventListener("input", () => {
+      const query = assignmentName.value.trim();
+      latestSuggestionQuery = query;
+      window.clearTimeout(suggestionTimer);
+      if (!query) {
+        assignmentNameOptions.innerHTML = "";
+        return;
       }
+      suggestionTimer = window.setTimeout(async () => {
+        try {
+          const response = await fetch(
+            `/api/employees/suggest/?${new URLSearchParams({ q: query }).toString()}`,
+          );
+          if (!response.ok || query !== latestSuggestionQuery) {
+            return;
+          }
+          const payload = await response.json();
+          assignmentNameOptions.innerHTML = "";
+          (payload.results || []).forEach((employee) => {
+            const option = document.createElement("option");
+            option.value = employee.full_name;
+            assignmentNameOptions.appendChild(option);
+          });
+        } catch (error) {
+          // suggestions are optional; ignore network errors
+        }
+      }, 120);
     });
   }
 
-  document.addEventListener("keydown", (event) => {
-    if (event.key === "Escape" && blockZoneModal) {
-      const isHidden = blockZoneModal.classList.contains("hidden");
-      if (!isHidden) {
-        closeBlockZoneModal();
-      }
-    }
-  });
-
   modeButtons.forEach((button) => {
     button.addEventListener("click", () => {
       const mode = button.dataset.adminMode;
@@ -1117,6 +1019,6 @@
   setDefaultStart(blockForm, blockStart);
   bindDurationToggle(assignmentDuration, assignmentEnd);
   bindDurationToggle(blockDuration, blockEnd);
-  bindDurationToggle(blockZoneDurationSelect, blockZoneEndInput);
   updateActionAvailability();
+  initBlockZoneEditor();
 })();
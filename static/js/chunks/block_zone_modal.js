@@ -0,0 +1,207 @@
+(function () {
+  const registry = (window.WindowWorksChunks = window.WindowWorksChunks || {});
+
+  registry.blockZoneEditor = function ({ bindDurationToggle }) {
+    const blockZoneDataElement = document.getElementById("block-zone-data");
+    const blockZoneModal = document.getElementById("block-zone-modal");
+    const blockZoneForm = document.getElementById("block-zone-modal-form");
+    const blockZoneModalTitle = document.getElementById("block-zone-modal-title");
+    const blockZoneNameInput = document.getElementById("block-zone-modal-name");
+    const blockZoneDurationSelect = document.getElementById(
+      "block-zone-modal-duration",
+    );
+    const blockZoneStartInput = document.getElementById("block-zone-modal-start");
+    const blockZoneEndInput = document.getElementById("block-zone-modal-end");
+    const blockZoneReasonInput = document.getElementById("block-zone-modal-reason");
+    const blockZoneCreatedByInput = document.getElementById(
+      "block-zone-modal-created-by",
+    );
+    const blockZoneSchedule = document.getElementById("block-zone-modal-schedule");
+    const blockZoneDeskCount = document.getElementById("block-zone-modal-desk-count");
+    const blockZoneStatusBadge = document.getElementById("block-zone-modal-status");
+    const blockZoneCancelButton = document.getElementById("block-zone-modal-cancel");
+    const blockZoneDeleteForm = document.getElementById("block-zone-delete-form");
+    const blockZoneUpdateUrlTemplate = blockZoneModal
+      ? blockZoneModal.dataset.updateUrlTemplate || ""
+      : "";
+    const blockZoneDeleteUrlTemplate = blockZoneModal
+      ? blockZoneModal.dataset.deleteUrlTemplate || ""
+      : "";
+
+    const blockZoneLookup = new Map();
+    if (blockZoneDataElement) {
+      try {
+        const parsedZones = JSON.parse(blockZoneDataElement.textContent || "[]");
+        if (Array.isArray(parsedZones)) {
+          parsedZones.forEach((zone) => {
+            if (zone && zone.id != null) {
+              blockZoneLookup.set(String(zone.id), zone);
+            }
+          });
+        }
+      } catch (error) {
+        console.error("Unable to parse block-out zone data", error);
+      }
+    }
+
+    function applyIdToTemplate(template, id) {
+      if (!template) {
+        return "";
+      }
+      return template.replace(/\/0\//, `/${String(id)}/`);
+    }
+
+    function blockZoneScheduleSummary(zone) {
+      if (!zone) {
+        return "";
+      }
+      const parts = [];
+      if (zone.is_active) {
+        parts.push("Active now");
+      } else if (zone.start_display) {
+        parts.push(`Begins ${zone.start_display}`);
+      }
+      if (zone.is_permanent) {
+        parts.push("Permanent block");
+      } else if (zone.end_display) {
+        parts.push(`Ends ${zone.end_display}`);
+      }
+      if (parts.length === 0 && zone.duration_display) {
+        parts.push(zone.duration_display);
+      }
+      return parts.join(" • ");
+    }
+
+    function blockZoneDeskSummary(count) {
+      const deskCount = Number(count) || 0;
+      if (deskCount === 1) {
+        return "1 desk included in this zone.";
+      }
+      return `${deskCount} desks included in this zone.`;
+    }
+
+    function closeBlockZoneModal() {
+      if (!blockZoneModal) {
+        return;
+      }
+      blockZoneModal.classList.add("hidden");
+      blockZoneModal.setAttribute("aria-hidden", "true");
+      delete blockZoneModal.dataset.currentZoneId;
+      if (blockZoneForm) {
+        blockZoneForm.reset();
+        blockZoneForm.action = blockZoneUpdateUrlTemplate;
+      }
+      if (blockZoneEndInput) {
+        blockZoneEndInput.disabled = false;
+      }
+      if (blockZoneDeleteForm) {
+        blockZoneDeleteForm.action = blockZoneDeleteUrlTemplate;
+      }
+      if (blockZoneSchedule) {
+        blockZoneSchedule.textContent = "";
+      }
+      if (blockZoneDeskCount) {
+        blockZoneDeskCount.textContent = "";
+      }
+      if (blockZoneStatusBadge) {
+        blockZoneStatusBadge.textContent = "";
+        blockZoneStatusBadge.classList.remove("success", "warning");
+      }
+      if (blockZoneModalTitle) {
+        blockZoneModalTitle.textContent = "Edit block-out zone";
+      }
+    }
+
+    function openBlockZoneModal(zoneId) {
+      if (!blockZoneModal || !blockZoneForm) {
+        return;
+      }
+      const zone = blockZoneLookup.get(String(zoneId));
+      if (!zone) {
+        return;
+      }
+      blockZoneModal.classList.remove("hidden");
+      blockZoneModal.setAttribute("aria-hidden", "false");
+      blockZoneModal.dataset.currentZoneId = String(zoneId);
+      blockZoneForm.action = applyIdToTemplate(blockZoneUpdateUrlTemplate, zoneId);
+      if (blockZoneDeleteForm) {
+        blockZoneDeleteForm.action = applyIdToTemplate(
+          blockZoneDeleteUrlTemplate,
+          zoneId,
+        );
+      }
+      if (blockZoneModalTitle) {
+        blockZoneModalTitle.textContent = `Edit ${zone.name}`;
+      }
+      if (blockZoneNameInput) {
+        blockZoneNameInput.value = zone.name || "";
+      }
+      if (blockZoneDurationSelect) {
+        blockZoneDurationSelect.value = zone.is_permanent
+          ? "permanent"
+          : zone.duration_choice || "temporary";
+      }
+      if (blockZoneStartInput) {
+        blockZoneStartInput.value = zone.start || "";
+      }
+      if (blockZoneEndInput) {
+        blockZoneEndInput.value = zone.is_permanent ? "" : zone.end || "";
+      }
+      if (blockZoneReasonInput) {
+        blockZoneReasonInput.value = zone.reason || "";
+      }
+      if (blockZoneCreatedByInput) {
+        blockZoneCreatedByInput.value = zone.created_by || "";
+      }
+      if (blockZoneSchedule) {
+        blockZoneSchedule.textContent = blockZoneScheduleSummary(zone);
+      }
+      if (blockZoneDeskCount) {
+        blockZoneDeskCount.textContent = blockZoneDeskSummary(zone.desk_count);
+      }
+      if (blockZoneStatusBadge) {
+        blockZoneStatusBadge.textContent = zone.is_active ? "Active" : "Scheduled";
+        blockZoneStatusBadge.classList.remove("success", "warning");
+        blockZoneStatusBadge.classList.add(zone.is_active ? "success" : "warning");
+      }
+      bindDurationToggle(blockZoneDurationSelect, blockZoneEndInput);
+      if (blockZoneEndInput && blockZoneDurationSelect) {
+        blockZoneEndInput.disabled = blockZoneDurationSelect.value === "permanent";
+      }
+      window.setTimeout(() => {
+        if (blockZoneNameInput && typeof blockZoneNameInput.focus === "function") {
+          blockZoneNameInput.focus();
+          if (typeof blockZoneNameInput.select === "function") {
+            blockZoneNameInput.select();
+          }
+        }
+      }, 0);
+    }
+
+    if (blockZoneCancelButton) {
+      blockZoneCancelButton.addEventListener("click", () => {
+        closeBlockZoneModal();
+      });
+    }
+
+    if (blockZoneModal) {
+      blockZoneModal.addEventListener("click", (event) => {
+        if (event.target === blockZoneModal) {
+          closeBlockZoneModal();
+        }
+      });
+    }
+
+    document.addEventListener("keydown", (event) => {
+      if (event.key === "Escape" && blockZoneModal) {
+        const isHidden = blockZoneModal.classList.contains("hidden");
+        if (!isHidden) {
+          closeBlockZoneModal();
+        }
+      }
+    });
+
+    bindDurationToggle(blockZoneDurationSelect, blockZoneEndInput);
+    return { open: openBlockZoneModal };
+  };
+})();
@@ -0,0 +1,67 @@
+(function () {
+  const registry = (window.WindowWorksChunks = window.WindowWorksChunks || {});
+
+  registry.peopleLocator = function ({ locateInput, locateResults, focusKioskDesk }) {
+    let pendingTimer = null;
+    let latestQuery = "";
+
+    function renderResults(results) {
+      locateResults.innerHTML = "";
+      if (!results.length) {
+        const empty = document.createElement("li");
+        empty.className = "note-text";
+        empty.textContent = "Nobody with that name is assigned right now.";
+        locateResults.appendChild(empty);
+      }
+      results.forEach((person) => {
+        const listItem = document.createElement("li");
+        const button = document.createElement("button");
+        button.type = "button";
+        button.className = "kiosk-button";
+
+        const title = document.createElement("span");
+        title.className = "kiosk-title";
+        title.textContent = person.assignee;
+        const meta = document.createElement("span");
+        meta.className = "kiosk-meta";
+        if (person.desk_identifier) {
+          meta.textContent = `${person.desk} · ${person.department}`;
+          button.addEventListener("click", () => focusKioskDesk(person.desk_identifier));
+        } else {
+          meta.textContent = "Working from home";
+          button.disabled = true;
+        }
+        button.appendChild(title);
+        button.appendChild(meta);
+        listItem.appendChild(button);
+        locateResults.appendChild(listItem);
+      });
+      locateResults.classList.remove("hidden");
+    }
+
+    locateInput.addEventListener("input", () => {
+      const query = locateInput.value.trim();
+      latestQuery = query;
+      window.clearTimeout(pendingTimer);
+      if (!query) {
+        locateResults.innerHTML = "";
+        locateResults.classList.add("hidden");
+        return;
+      }
+      pendingTimer = window.setTimeout(async () => {
+        try {
+          const response = await fetch(
+            `/api/people/locate/?${new URLSearchParams({ q: query }).toString()}`,
+          );
+          if (!response.ok || query !== latestQuery) {
+            return;
+          }
+          const payload = await response.json();
+          renderResults(payload.results || []);
+        } catch (error) {
+          // ignore network errors
+        }
+      }, 150);
+    });
+  };
+})();
@@ -1,4 +1,8 @@
 (function () {
+  const scriptData = document.currentScript ? document.currentScript.dataset : {};
+  const locatorChunkUrl = scriptData.locatorChunk || "";
+  const floorSnapshotUrl = scriptData.floorSnapshot || "";
+  const serviceWorkerUrl = scriptData.serviceWorker || "";
   const deskDataElement = document.getElementById("desk-data");
   const floorplanCanvas = document.getElementById("floorplan-canvas");
   if (!deskDataElement || !floorplanCanvas) {
@@ -130,6 +134,9 @@
   const desks = JSON.parse(deskDataElement.textContent || "[]");
   const deskMap = new Map();
   desks.forEach((desk) => deskMap.set(desk.identifier, desk));
+  // The page may have come from the service worker cache; remember what it
+  // rendered so a fresh snapshot only redraws the grid when something changed.
+  let renderedSnapshot = JSON.stringify(desks);
 
   // Ensure “Available kiosks” renders immediately, even if floorplan rendering is delayed/aborted
   renderKioskList();
@@ -488,6 +495,9 @@
 
   const STORAGE_KEY = "workspaceEmployeeProfile";
   const LEGACY_KEY = "workspaceEmployeeName";
+  const RESERVATION_QUEUE_KEY = "workspaceQueuedReservations";
+  const RESERVATION_RETRY_INTERVAL_MS = 30000;
+  let isFlushingReservations = false;
 
   function normalizeUserProfile(rawValue) {
     if (!rawValue) {
@@ -525,13 +535,17 @@
 
   function setCurrentUser(user) {
     const normalized = normalizeUserProfile(user);
+    const previousName = getCurrentFullName();
     if (!normalized) {
       currentUser = null;
       localStorage.removeItem(STORAGE_KEY);
-      return;
+    } else {
+      currentUser = normalized;
+      localStorage.setItem(STORAGE_KEY, JSON.stringify(normalized));
+    }
+    if (getCurrentFullName() !== previousName) {
+      dropOtherReservations();
     }
-    currentUser = normalized;
-    localStorage.setItem(STORAGE_KEY, JSON.stringify(normalized));
   }
 
   function getCurrentFullName() {
@@ -758,6 +772,33 @@
     }
   }
 
+  function renderSuggestedDesks(suggestions) {
+    if (!suggestions || !suggestions.length) {
+      return;
+    }
+    const li = document.createElement("li");
+    li.className = "alert-item";
+    const intro = document.createElement("span");
+    intro.textContent = "Closest free desks: ";
+    li.appendChild(intro);
+    suggestions.forEach((desk, index) => {
+      const button = document.createElement("button");
+      button.type = "button";
+      button.className = "button secondary";
+      button.textContent = `${desk.label} (${desk.department})`;
+      button.addEventListener("click", () => {
+        focusKioskDesk(desk.identifier);
+        openDeskModal(desk.identifier);
+      });
+      if (index > 0) {
+        li.appendChild(document.createTextNode(" "));
+      }
+      li.appendChild(button);
+    });
+    alertList.appendChild(li);
+    alertList.classList.remove("hidden");
+  }
+
   function highlightDesk(identifier) {
     if (highlightedCellKey && cellMap.has(highlightedCellKey)) {
       const oldCell = cellMap.get(highlightedCellKey);
@@ -1066,15 +1107,20 @@
     assignForm.addEventListener("submit", async (event) => {
       event.preventDefault();
       assignError.classList.add("hidden");
+      let response;
+      try {
+        response = await postReservation(desk.identifier, safeName);
+      } catch (error) {
+        queueReservation(desk, safeName);
+        hideModal(deskModal);
+        setStatus(
+          "warning",
+          "Reservation queued",
+          `We couldn't reach the server. ${desk.label} will be reserved as soon as the connection returns.`
+        );
+        return;
+      }
       try {
-        const response = await fetch(`/api/desks/${desk.identifier}/assign/`, {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "X-CSRFToken": window.getCsrfToken(),
-          },
-          body: new URLSearchParams({ assignee_name: safeName }).toString(),
-        });
         if (!response.ok) {
           const payload = await response.json().catch(() => ({ error: "Unable to reserve seat." }));
           assignError.textContent = payload.error || "Unable to reserve seat.";
@@ -1108,6 +1154,9 @@
         }
         hideModal(deskModal);
         await loadAssignmentInfo();
+        if (result.notice) {
+          setStatus("warning", "Reservation shortened", result.notice);
+        }
       } catch (error) {
         assignError.textContent = "Network error. Please try again.";
         assignError.classList.remove("hidden");
@@ -1115,6 +1164,149 @@
     });
   }
 
+  function postReservation(identifier, assigneeName) {
+    return fetch(`/api/desks/${identifier}/assign/`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/x-www-form-urlencoded",
+        "X-CSRFToken": window.getCsrfToken(),
+      },
+      body: new URLSearchParams({ assignee_name: assigneeName }).toString(),
+    });
+  }
+
+  function localDayKey() {
+    const today = new Date();
+    return `${today.getFullYear()}-${today.getMonth() + 1}-${today.getDate()}`;
+  }
+
+  function readReservationQueue() {
+    try {
+      const queue = JSON.parse(localStorage.getItem(RESERVATION_QUEUE_KEY) || "[]");
+      return Array.isArray(queue) ? queue : [];
+    } catch (error) {
+      return [];
+    }
+  }
+
+  function writeReservationQueue(queue) {
+    if (queue.length) {
+      localStorage.setItem(RESERVATION_QUEUE_KEY, JSON.stringify(queue));
+    } else {
+      localStorage.removeItem(RESERVATION_QUEUE_KEY);
+    }
+  }
+
+  // Queued reservations belong to whoever made them; once someone else signs
+  // in at the kiosk they are discarded rather than booked for the new person.
+  function dropOtherReservations() {
+    const currentName = getCurrentFullName();
+    const queue = readReservationQueue();
+    const kept = queue.filter((entry) => currentName && entry.assigneeName === currentName);
+    if (kept.length !== queue.length) {
+      writeReservationQueue(kept);
+    }
+  }
+
+  function queueReservation(desk, assigneeName) {
+    const queue = readReservationQueue().filter((entry) => entry.assigneeName !== assigneeName);
+    queue.push({
+      identifier: desk.identifier,
+      label: desk.label,
+      assigneeName,
+      day: localDayKey(),
+    });
+    writeReservationQueue(queue);
+  }
+
+  async function flushReservationQueue() {
+    if (isFlushingReservations) {
+      return;
+    }
+    const queue = readReservationQueue();
+    if (!queue.length) {
+      return;
+    }
+    isFlushingReservations = true;
+    const today = localDayKey();
+    const currentName = getCurrentFullName();
+    const remaining = [];
+    let settled = false;
+    for (const entry of queue) {
+      // Reservations only last until the end of the day they were made, and
+      // are only sent on behalf of the person who made them.
+      if (entry.day !== today || !currentName || entry.assigneeName !== currentName) {
+        continue;
+      }
+      let response;
+      try {
+        response = await postReservation(entry.identifier, entry.assigneeName);
+      } catch (error) {
+        remaining.push(entry);
+        continue;
+      }
+      settled = true;
+      const payload = await response.json().catch(() => ({}));
+      if (payload.desk) {
+        deskMap.set(payload.desk.identifier, payload.desk);
+        updateCellForDesk(payload.desk);
+      }
+      if (response.ok) {
+        setStatus(
+          payload.notice ? "warning" : "success",
+          "Seat reserved",
+          payload.notice || `${entry.label} is reserved for ${entry.assigneeName}.`
+        );
+      } else {
+        setStatus(
+          "danger",
+          "Queued reservation failed",
+          payload.error || `We couldn't reserve ${entry.label}. Please choose another seat.`
+        );
+      }
+    }
+    writeReservationQueue(remaining);
+    isFlushingReservations = false;
+    if (settled && getCurrentFullName()) {
+      await loadAssignmentInfo();
+    }
+  }
+
+  async function revalidateFloor() {
+    if (!floorSnapshotUrl) {
+      return;
+    }
+    try {
+      const response = await fetch(floorSnapshotUrl, { cache: "no-store" });
+      if (!response.ok) {
+        return;
+      }
+      const snapshot = await response.json();
+      const serialized = JSON.stringify(snapshot.desks || []);
+      if (serialized === renderedSnapshot) {
+        return;
+      }
+      renderedSnapshot = serialized;
+      deskMap.clear();
+      (snapshot.desks || []).forEach((desk) => deskMap.set(desk.identifier, desk));
+      renderFloorplan();
+    } catch (error) {
+      // keep showing the cached floor plan while the server is unreachable
+    }
+  }
+
+  function initOfflineSupport() {
+    if (serviceWorkerUrl && "serviceWorker" in navigator) {
+      navigator.serviceWorker.register(serviceWorkerUrl).catch(() => {});
+    }
+    window.addEventListener("online", () => {
+      flushReservationQueue();
+      revalidateFloor();
+    });
+    window.setInterval(flushReservationQueue, RESERVATION_RETRY_INTERVAL_MS);
+    flushReservationQueue().then(revalidateFloor);
+  }
+
   async function refreshDesk(identifier) {
     try {
       const response = await fetch(`/api/desks/${identifier}/`);
@@ -1168,6 +1360,7 @@
         setStatus("success", "You're all set", data.message || "");
       }
       updateAssignmentDetails(data.assignment || null);
+      renderSuggestedDesks(data.suggested_desks);
     } catch (error) {
       setStatus("danger", "Network error", "We could not load your assignment right now. Please try again later.");
       updateAssignmentDetails(null);
@@ -1203,6 +1396,72 @@
     }
   }
 
+  function initLastNameSuggestions() {
+    const options = document.getElementById("employee-last-name-options");
+    if (!lastNameInput || !options) {
+      return;
+    }
+    let pendingTimer = null;
+    let latestQuery = "";
+    lastNameInput.addEventListener("input", () => {
+      const query = lastNameInput.value.trim();
+      latestQuery = query;
+      window.clearTimeout(pendingTimer);
+      if (!query) {
+        options.innerHTML = "";
+        return;
+      }
+      pendingTimer = window.setTimeout(async () => {
+        try {
+          const response = await fetch(
+            `/api/employees/suggest/?${new URLSearchParams({ q: query }).toString()}`,
+          );
+          if (!response.ok || query !== latestQuery) {
+            return;
+          }
+          const payload = await response.json();
+          const lastNames = [...new Set((payload.results || []).map((item) => item.last_name))];
+          options.innerHTML = "";
+          lastNames.forEach((lastName) => {
+            const option = document.createElement("option");
+            option.value = lastName;
+            options.appendChild(option);
+          });
+        } catch (error) {
+          // suggestions are optional; ignore network errors
+        }
+      }, 120);
+    });
+  }
+
+  function initPeopleLocator() {
+    const locateInput = document.getElementById("locate-query");
+    const locateResults = document.getElementById("locate-results");
+    if (!locateInput || !locateResults || typeof window.loadChunk !== "function") {
+      return;
+    }
+    // Most kiosk visitors never search for a coworker, so the search code is
+    // only fetched once someone starts using the box.
+    const loadLocator = () => {
+      locateInput.removeEventListener("focus", loadLocator);
+      locateInput.removeEventListener("input", loadLocator);
+      window
+        .loadChunk("peopleLocator", locatorChunkUrl)
+        .then((init) => {
+          init({ locateInput, locateResults, focusKioskDesk });
+          if (locateInput.value.trim()) {
+            locateInput.dispatchEvent(new Event("input"));
+          }
+        })
+        .catch(() => {
+          locateInput.addEventListener("focus", loadLocator);
+          locateInput.addEventListener("input", loadLocator);
+        });
+    };
+    locateInput.addEventListener("focus", loadLocator);
+    locateInput.addEventListener("input", loadLocator);
+  }
+
   function initNameModal() {
     if (!nameModal || !nameForm || !lastNameInput || !extensionInput) {
       return;
@@ -1281,5 +1540,8 @@
   renderFloorplan();
   adjustLegendColors();
   initNameModal();
+  initLastNameSuggestions();
+  initPeopleLocator();
   loadAssignmentInfo();
+  initOfflineSupport();
 })();
@@ -0,0 +1,39 @@
+(function () {
+  // Chunks register an init function under their name when their script runs.
+  const registry = (window.WindowWorksChunks = window.WindowWorksChunks || {});
+  const pending = new Map();
+
+  window.loadChunk = function (name, url) {
+    if (registry[name]) {
+      return Promise.resolve(registry[name]);
+    }
+    if (!url) {
+      return Promise.reject(new Error(`No URL configured for ${name}.`));
+    }
+    if (!pending.has(name)) {
+      pending.set(
+        name,
+        new Promise((resolve, reject) => {
+          const script = document.createElement("script");
+          script.src = url;
+          script.async = true;
+          script.addEventListener("load", () => {
+            if (registry[name]) {
+              resolve(registry[name]);
+            } else {
+              pending.delete(name);
+              reject(new Error(`${name} did not register itself.`));
+            }
+          });
+          script.addEventListener("error", () => {
+            pending.delete(name);
+            script.remove();
+            reject(new Error(`Unable to load ${name}.`));
+          });
+          document.head.appendChild(script);
+        }),
+      );
+    }
+    return pending.get(name);
+  };
+})();
@@ -0,0 +1,75 @@
+// Kiosk service worker: keeps the floor plan usable while the server is
+// restarting or the network drops out.
+const STATIC_CACHE = "window-works-static-{{ cache_version }}";
+const PAGE_CACHE = "window-works-pages";
+const PRECACHE_URLS = {{ precache_urls|safe }};
+const INDEX_URL = new URL("{% url 'floorplan:index' %}", self.location).href;
+const SNAPSHOT_URL = new URL("{% url 'floorplan:floor-snapshot' %}", self.location).href;
+const STATIC_URLS = new Set(PRECACHE_URLS.map((url) => new URL(url, self.location).href));
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    caches
+      .open(STATIC_CACHE)
+      .then((cache) => cache.addAll(PRECACHE_URLS))
+      .then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil(
+    caches
+      .keys()
+      .then((names) =>
+        Promise.all(
+          names
+            .filter((name) => name.startsWith("window-works-static-") && name !== STATIC_CACHE)
+            .map((name) => caches.delete(name))
+        )
+      )
+      .then(() => self.clients.claim())
+  );
+});
+
+function fetchAndStore(request, cacheName) {
+  return fetch(request).then((response) => {
+    if (!response.ok) {
+      return response;
+    }
+    const copy = response.clone();
+    return caches
+      .open(cacheName)
+      .then((cache) => cache.put(request, copy))
+      .then(() => response);
+  });
+}
+
+// Answer from the cache straight away and refresh the copy in the background.
+function staleWhileRevalidate(event, cacheName) {
+  const network = fetchAndStore(event.request, cacheName);
+  event.waitUntil(network.catch(() => undefined));
+  return caches.match(event.request).then((cached) => cached || network);
+}
+
+// Prefer live data, falling back to the last copy when the server is unreachable.
+function networkFirst(event, cacheName) {
+  return fetchAndStore(event.request, cacheName).catch(() =>
+    caches.match(event.request).then((cached) => cached || Response.error())
+  );
+}
+
+self.addEventListener("fetch", (event) => {
+  const { request } = event;
+  if (request.method !== "GET") {
+    return;
+  }
+  const url = new URL(request.url);
+  url.hash = "";
+  if (request.mode === "navigate" && url.href === INDEX_URL) {
+    event.respondWith(staleWhileRevalidate(event, PAGE_CACHE));
+  } else if (url.href === SNAPSHOT_URL) {
+    event.respondWith(networkFirst(event, PAGE_CACHE));
+  } else if (STATIC_URLS.has(url.href)) {
+    event.respondWith(staleWhileRevalidate(event, STATIC_CACHE));
+  }
+});
@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "workspace_manager.settings")
+# Django runs each ASGI request's synchronous code in a fresh thread, so a
+# persistent connection would be stranded when that thread exits. Persistent
+# connections default to off here; set DJANGO_DB_CONN_MAX_AGE to override.
+os.environ.setdefault("DJANGO_DB_CONN_MAX_AGE", "0")
 
 application = get_asgi_application()
@@ -60,12 +60,16 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "floorplan.compression.CompressionMiddleware",
+    "floorplan.queries.QueryInspectionMiddleware",
+    "floorplan.routing.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "floorplan.profiling.RequestProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "workspace_manager.urls"
@@ -95,7 +99,42 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Keep connections open between requests so PRAGMAs and other
+        # connection setup run once per connection instead of per request.
+        "CONN_MAX_AGE": int(os.environ.get("DJANGO_DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": os.environ.get("DJANGO_DB_CONN_HEALTH_CHECKS", "True").lower()
+        in {"1", "true", "yes", "on"},
+        "OPTIONS": {
+            # Take the write lock when a transaction begins so concurrent
+            # writers wait on the busy timeout instead of failing on upgrade.
+            "transaction_mode": "IMMEDIATE",
+        },
+    }
+}
+
+# Optional read replica for kiosk reads, see floorplan.routing. For local
+# testing point DJANGO_DB_REPLICA_NAME at a second SQLite file and keep it
+# current with `manage.py sync_replica`.
+REPLICA_DATABASE = None
+if os.environ.get("DJANGO_DB_REPLICA_NAME"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.environ["DJANGO_DB_REPLICA_NAME"],
+        "TEST": {"MIRROR": "default"},
     }
+    REPLICA_DATABASE = "replica"
+DATABASE_ROUTERS = ["floorplan.routing.PrimaryReplicaRouter"]
+# After a write, the client reads from the primary for this many seconds.
+REPLICA_PIN_SECONDS = int(os.environ.get("DJANGO_REPLICA_PIN_SECONDS", "10"))
+REPLICA_PIN_COOKIE = "primary_pin"
+
+# Applied to each new SQLite connection by floorplan.database. WAL lets kiosk
+# readers continue while a reservation or layout edit is being written.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.environ.get("DJANGO_SQLITE_JOURNAL_MODE", "WAL"),
+    "busy_timeout": int(os.environ.get("DJANGO_SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "synchronous": os.environ.get("DJANGO_SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.environ.get("DJANGO_SQLITE_MMAP_SIZE", str(64 * 1024 * 1024))),
 }
 
 
@@ -137,6 +176,49 @@ STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_DIRS = [BASE_DIR / "static"]
 
+# `python manage.py build_assets` mirrors static/ here with the JavaScript and
+# CSS minified. With DJANGO_USE_BUILT_ASSETS enabled the mirror replaces the
+# sources, so collectstatic fingerprints and compresses the minified files.
+ASSET_BUILD_DIR = BASE_DIR / "build" / "static"
+USE_BUILT_ASSETS = os.environ.get("DJANGO_USE_BUILT_ASSETS", "False").lower() in {
+    "1",
+    "true",
+    "yes",
+    "on",
+}
+if USE_BUILT_ASSETS:
+    STATICFILES_DIRS = [ASSET_BUILD_DIR]
+
+# Report requests that run one query template QUERY_REPEAT_THRESHOLD times or
+# more, the usual sign of an N+1 loop: "off", "warn" (log) or "raise".
+QUERY_INSPECTION = os.environ.get("DJANGO_QUERY_INSPECTION", "warn" if DEBUG else "off")
+QUERY_REPEAT_THRESHOLD = int(os.environ.get("DJANGO_QUERY_REPEAT_THRESHOLD", "5"))
+
+# Staff can add ?profile=1 (or an X-Profile: 1 header) to any request to save
+# a cProfile dump and SQL log here; browse them at /admin-console/profiles/.
+PROFILES_DIR = Path(os.environ.get("DJANGO_PROFILES_DIR", BASE_DIR / "profiles"))
+
+# One cache directory shared by every worker process on the host, so version
+# counters and computed floor payloads are the same whichever worker serves a
+# request. Bump DJANGO_CACHE_VERSION on deploy to retire every stored entry.
+CACHES = {
+    "default": {
+        "BACKEND": "floorplan.shared_cache.SharedFileCache",
+        "LOCATION": os.environ.get("DJANGO_CACHE_DIR", str(BASE_DIR / "cache")),
+        "TIMEOUT": 300,
+        "KEY_PREFIX": "window-works",
+        "VERSION": int(os.environ.get("DJANGO_CACHE_VERSION", "1")),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.environ.get("DJANGO_CACHE_MAX_ENTRIES", "2000")),
+            # Drop a quarter of the entries when MAX_ENTRIES is reached.
+            "CULL_FREQUENCY": 4,
+        },
+    }
+}
+
+# Tests get their own temporary cache directory, see workspace_manager.test_runner.
+TEST_RUNNER = "workspace_manager.test_runner.TestRunner"
+
 STORAGES = {
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
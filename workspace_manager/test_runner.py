@@ -0,0 +1,31 @@
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """Run the suite against caches that live only as long as the run.
+
+    The default cache is a file cache shared by every process on the host, so
+    without this a test's ``cache.clear()`` would wipe a running development
+    server's cache, and tests would share version counters and payload keys
+    with it and with other test runs.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._cache_directory = tempfile.TemporaryDirectory(prefix="floorplan-test-cache-")
+        caches = {
+            alias: {**config, "LOCATION": str(Path(self._cache_directory.name) / alias)}
+            for alias, config in settings.CACHES.items()
+        }
+        self._cache_override = override_settings(CACHES=caches)
+        self._cache_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._cache_override.disable()
+        self._cache_directory.cleanup()
+        super().teardown_test_environment(**kwargs)